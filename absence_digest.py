@@ -0,0 +1,70 @@
+"""
+Absence Digest — One Message per Absence Streak Window
+======================================================
+A chronically absent student used to trigger a WhatsApp message every
+single day. With digest mode:
+
+  • 1st absent day          → normal alert
+  • absent again within the
+    same streak             → no message if the parent was alerted less
+                              than DIGEST_EVERY days ago
+  • otherwise               → one digest: "absent N days in a row since …,
+                              X of the last Y marked days, Z% attendance"
+
+Streaks and percentages for every student come from a single grouped query
+(DatabaseManager.get_absence_stats). NotificationRouter applies this before
+queueing, so it covers every channel.
+"""
+
+DIGEST_ENABLED = True
+DIGEST_AFTER   = 2     # consecutive absent days before switching to digests
+DIGEST_EVERY   = 7     # days between messages while the streak continues
+STATS_WINDOW   = 30    # days of history for the attendance percentage
+
+
+def _digest(stats, day):
+    """Digest figures including today's absence."""
+    streak       = stats['streak'] + 1
+    absent_days  = stats['absent_days'] + 1
+    marked_days  = stats['marked_days'] + 1
+    return {
+        'streak':       streak,
+        'streak_start': stats['streak_start'] or day,
+        'absent_days':  absent_days,
+        'marked_days':  marked_days,
+        'attendance':   round((marked_days - absent_days) / marked_days * 100, 1),
+    }
+
+
+def plan_absent_alerts(db, students, day):
+    """
+    Split today's absentees into (to_alert, suppressed). Students in
+    to_alert get a 'digest' key: None for a plain alert, or the figures
+    for a digest message.
+    """
+    if not DIGEST_ENABLED:
+        return [{**s, 'digest': None} for s in students], []
+
+    stats = db.get_absence_stats(day, STATS_WINDOW)
+    to_alert, suppressed = [], []
+    for s in students:
+        st = stats.get(s['student_id'])
+        if not st or st['streak'] + 1 < DIGEST_AFTER:
+            to_alert.append({**s, 'digest': None})
+            continue
+
+        last_alert = st['last_alert']
+        in_streak  = last_alert and st['streak_start'] and last_alert >= st['streak_start']
+        if in_streak and (day - last_alert).days < DIGEST_EVERY:
+            suppressed.append(s)
+        else:
+            to_alert.append({**s, 'digest': _digest(st, day)})
+    return to_alert, suppressed
+
+
+def digest_text(digest):
+    """One-line summary used by the WhatsApp / SMS / email bodies."""
+    return (f"absent {digest['streak']} days in a row "
+            f"(since {digest['streak_start'].strftime('%d-%m-%Y')}); "
+            f"{digest['absent_days']} of the last {digest['marked_days']} days, "
+            f"attendance {digest['attendance']}%")
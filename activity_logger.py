@@ -0,0 +1,147 @@
+"""
+Buffered Activity Logger
+========================
+DatabaseManager.log_activity() used to open a connection and commit a
+single-row INSERT for every face match, alert and scheduler event. It now
+drops the entry into this in-process buffer instead; a background thread
+writes the buffer as multi-row INSERTs when either
+
+  • FLUSH_INTERVAL seconds have passed, or
+  • FLUSH_SIZE entries are waiting.
+
+Entries keep the time they were logged and are written strictly in
+logging order (one flusher at a time, failed batches go back to the front).
+After MAX_ATTEMPTS failures in a row the buffer is written one row at a
+time and rows the database still rejects are dropped, so one bad entry
+can't hold up the log. While the database is unreachable the buffer keeps
+at most MAX_BUFFER entries, oldest dropped first.
+flush_all() runs at shutdown (main.on_close and atexit).
+"""
+
+import atexit
+import threading
+import weakref
+from datetime import datetime
+
+FLUSH_INTERVAL = 2.0     # seconds
+FLUSH_SIZE     = 100     # entries
+ROWS_PER_INSERT = 200    # 4 params/row → stays under SQLite's 999-variable limit
+MAX_ATTEMPTS   = 3       # failed batch writes before falling back to row by row
+MAX_BUFFER     = 10000   # entries kept while the database is unreachable
+
+_loggers = weakref.WeakSet()
+
+
+class BufferedActivityLogger:
+    def __init__(self, get_connection, interval=FLUSH_INTERVAL, max_pending=FLUSH_SIZE):
+        self._get_connection = get_connection
+        self.interval     = interval
+        self.max_pending  = max_pending
+        self._pending     = []
+        self._lock        = threading.Lock()   # guards _pending
+        self._flush_lock  = threading.Lock()   # one writer at a time → ordering
+        self._wake        = threading.Event()
+        self._stopped     = False
+        self._thread      = None
+        self._failures    = 0                  # consecutive failed flushes
+        _loggers.add(self)
+
+    def log(self, action, performed_by, details=''):
+        with self._lock:
+            self._pending.append((action, performed_by, details, datetime.now()))
+            full = len(self._pending) >= self.max_pending
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(target=self._run, daemon=True,
+                                                name='activity-log-flusher')
+                self._thread.start()
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[ACTIVITY LOG] Flush failed, will retry: {e}")
+
+    def flush(self):
+        """Write everything buffered so far. Returns number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                if self._failures >= MAX_ATTEMPTS:
+                    written = self._insert_rows(batch)
+                else:
+                    self._insert_batch(batch)
+                    written = len(batch)
+            except Exception:
+                self._failures += 1
+                with self._lock:
+                    self._pending[:0] = batch   # keep original order for the retry
+                    dropped = max(len(self._pending) - MAX_BUFFER, 0)
+                    del self._pending[:dropped]
+                if dropped:
+                    print(f"[ACTIVITY LOG] Buffer full — dropped {dropped} oldest entries")
+                raise
+            self._failures = 0
+            return written
+
+    def _insert_batch(self, batch):
+        conn   = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            for i in range(0, len(batch), ROWS_PER_INSERT):
+                chunk = batch[i:i + ROWS_PER_INSERT]
+                cursor.execute(
+                    "INSERT INTO activity_log (action, performed_by, details, timestamp) VALUES " +
+                    ", ".join(["(%s,%s,%s,%s)"] * len(chunk)),
+                    [v for row in chunk for v in row]
+                )
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _insert_rows(self, batch):
+        """One INSERT per row; rows the database rejects are dropped. Returns rows written."""
+        conn    = self._get_connection()    # unreachable → raises, batch is retried
+        cursor  = conn.cursor()
+        written = 0
+        try:
+            for row in batch:
+                try:
+                    cursor.execute(
+                        "INSERT INTO activity_log (action, performed_by, details, timestamp) "
+                        "VALUES (%s,%s,%s,%s)", row)
+                    conn.commit()
+                    written += 1
+                except Exception as e:
+                    conn.rollback()
+                    print(f"[ACTIVITY LOG] Dropped {row[0]} entry of {row[3]}: {e}")
+        finally:
+            cursor.close()
+            conn.close()
+        return written
+
+    def close(self):
+        """Stop the flusher thread and write whatever is left."""
+        self._stopped = True
+        self._wake.set()
+        self.flush()
+
+
+def flush_all():
+    """Flush every live logger — call at application shutdown."""
+    for logger in list(_loggers):
+        try:
+            logger.close()
+        except Exception as e:
+            print(f"[ACTIVITY LOG] Final flush failed: {e}")
+
+
+atexit.register(flush_all)
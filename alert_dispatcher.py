@@ -0,0 +1,198 @@
+"""
+Alert Dispatcher — Concurrent Absent Alerts
+===========================================
+Sending one WhatsApp alert takes about a second of HTTP round-trip, so
+800 absentees one after another took over 13 minutes. The dispatcher sends
+them from a small thread pool over one shared Twilio client:
+
+  • TokenBucket   — caps messages/second at the sender's Twilio limit
+  • Retries       — 429 / 5xx / network errors back off exponentially
+                    (with jitter); permanent errors fail immediately,
+                    ones still transient after MAX_RETRIES are 'deferred'
+  • Summary       — sent / failed / deferred / skipped / retries / elapsed
+
+The app sends through notification_outbox (durable queue) which hands
+claimed rows to send_messages(); dispatch() sends straight from a student list.
+
+Usage:
+    from alert_dispatcher import AlertDispatcher
+    summary = AlertDispatcher().dispatch(absent_students, '19-10-2026')
+
+Load-test against a local stub instead of Twilio with:
+    python benchmark.py alerts
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import notification_service as ns
+
+# ══════════════════════════════════════════════════════════
+#  LIMITS — match these to your Twilio sender
+#  (sandbox / long code ≈ 1 msg/s, toll-free 3, WhatsApp Business 80)
+# ══════════════════════════════════════════════════════════
+RATE_PER_SEC = 10      # sustained messages per second
+BURST        = 10      # messages allowed back-to-back
+MAX_WORKERS  = 8       # concurrent HTTP requests
+MAX_RETRIES  = 4       # per message, transient errors only
+BACKOFF_BASE = 1.0     # seconds, doubled each retry
+BACKOFF_MAX  = 30.0
+DEMO         = "Demo mode"   # detail of a 'sent' result that was only printed
+# ══════════════════════════════════════════════════════════
+
+
+class TokenBucket:
+    """Thread-safe token bucket: acquire() blocks until a token is free."""
+
+    def __init__(self, rate, burst):
+        self.rate     = float(rate)
+        self.capacity = float(max(burst, 1))
+        self._tokens  = self.capacity
+        self._last    = time.monotonic()
+        self._lock    = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last   = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AlertDispatcher:
+    """
+    Send many absent alerts concurrently.
+
+    `send(phone, body)` defaults to notification_service.send_whatsapp and
+    must raise on failure; `transient(exc)` decides which failures are
+    retried and `describe(exc, recipient)` turns them into readable text.
+    Other channels (SMS, email) pass their own — see notification_router.
+    """
+
+    def __init__(self, send=None, rate=RATE_PER_SEC, burst=BURST, workers=MAX_WORKERS,
+                 max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX,
+                 transient=None, describe=None, enabled=None):
+        self.send         = send or ns.send_whatsapp
+        self.transient    = transient or ns.is_transient
+        self.describe     = describe or ns.friendly_error
+        self.enabled      = enabled or (lambda: ns.ENABLED)
+        self.bucket       = TokenBucket(rate, burst)
+        self.workers      = workers
+        self.max_retries  = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max  = backoff_max
+
+    def _backoff(self, attempt):
+        # "Full jitter" — spreads retries out so they don't hit the API together
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _deliver(self, phone, body):
+        """
+        Send one message with retries. Returns (status, detail, retries):
+        sent, failed (permanent error) or deferred (still transient after
+        max_retries — worth trying again later).
+        """
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                self.send(phone, body)
+                return 'sent', phone, attempt
+            except Exception as e:
+                transient = self.transient(e)
+                if transient and attempt < self.max_retries:
+                    time.sleep(self._backoff(attempt))
+                    attempt += 1
+                    continue
+                return ('deferred' if transient else 'failed'), self.describe(e, phone), attempt
+
+    def _send_one(self, student, date_str):
+        phone, reason = ns.check_recipient(student.get('phone'))
+        if not phone:
+            return 'skipped', reason, 0
+        if not self.enabled():
+            print(f"[WHATSAPP DEMO] Would send alert for {student['full_name']} to {phone}")
+            return 'sent', DEMO, 0
+        body = ns.absent_message(student['full_name'], student['student_id'],
+                                 student.get('class_name', ''), date_str)
+        return self._deliver(phone, body)
+
+    def _send_message(self, message):
+        if not self.enabled():
+            print(f"[{message.get('channel', 'whatsapp').upper()} DEMO] "
+                  f"Would send alert to {message['recipient']}")
+            return 'sent', DEMO, 0
+        return self._deliver(message['recipient'], message['body'])
+
+    def _run(self, items, send_one, on_result):
+        started = time.perf_counter()
+        summary = {'total': len(items), 'sent': 0, 'failed': 0, 'deferred': 0,
+                   'skipped': 0, 'retries': 0, 'elapsed': 0.0, 'errors': []}
+        lock = threading.Lock()
+
+        if self.enabled() and self.send in (ns.send_whatsapp, ns.send_sms):
+            try:
+                import twilio  # noqa: F401
+            except ImportError:
+                error = "Twilio not installed!\nRun: pip install twilio"
+                for item in items:
+                    summary['deferred'] += 1
+                    if on_result:
+                        on_result(item, 'deferred', error)
+                summary['errors'].append(('', error))
+                return summary
+
+        def work(item):
+            try:
+                status, detail, retries = send_one(item)
+            except Exception as e:
+                status, detail, retries = 'failed', str(e), 0
+            with lock:
+                summary[status]    += 1
+                summary['retries'] += retries
+                if status in ('failed', 'deferred'):
+                    summary['errors'].append((item.get('student_id', ''), detail))
+            if status in ('failed', 'deferred'):
+                print(f"[{item.get('channel', 'whatsapp').upper()} ERROR] "
+                      f"{item.get('student_id', '')}: {detail}")
+            if on_result:
+                on_result(item, status, detail)
+
+        with ThreadPoolExecutor(max_workers=self.workers,
+                                thread_name_prefix='absent-alert') as pool:
+            list(pool.map(work, items))
+
+        summary['elapsed'] = round(time.perf_counter() - started, 2)
+        return summary
+
+    def dispatch(self, students, date_str, on_result=None):
+        """
+        Send an absent alert to every student's parent phone.
+        on_result(student, status, detail) is called from worker threads as
+        each one finishes. Returns a summary dict.
+        """
+        return self._run(students, lambda s: self._send_one(s, date_str), on_result)
+
+    def send_messages(self, messages, on_result=None):
+        """
+        Send pre-built messages — dicts with 'recipient' (cleaned phone) and
+        'body', e.g. claimed notification_outbox rows.
+        """
+        return self._run(messages, self._send_message, on_result)
+
+
+def format_summary(summary):
+    return (
+        f"✅ Sent    : {summary['sent']}\n"
+        f"❌ Failed  : {summary['failed'] + summary['deferred']}\n"
+        f"⏭️ Skipped : {summary['skipped']} (no phone)\n"
+        f"🔁 Retries : {summary['retries']}\n"
+        f"⏱️ Time    : {summary['elapsed']}s"
+    )
@@ -0,0 +1,248 @@
+"""
+Analytics Snapshot — Attendance History as Partitioned Parquet
+==============================================================
+Term analysis used to start with an Excel export of every attendance row.
+snapshot() keeps a columnar copy under analytics/ instead, partitioned the
+way analysts slice it:
+
+    analytics/
+        attendance/academic_year=2025/month=2025-10/part-20251001-20251017.parquet
+        summary/academic_year=2025/month=2025-10/part-20251001-20251017.parquet
+        students/students.parquet
+        _manifest.json
+
+  • attendance — the attendance_export Parquet schema, one part file per run
+  • summary    — per day and class: total / present / late / absent / pct
+  • students   — the student list, rewritten every run
+
+Runs are incremental: only days after the last snapshot (up to yesterday)
+are appended. A month whose already-snapshotted days changed since
+(DatabaseManager.get_attendance_watermark) is rewritten, as is a finished
+month with more than one part, so closed months end up as single files.
+Months of archived academic years come from attendance_archive and are
+never rewritten.
+
+Querying a few years locally:
+    import pyarrow.dataset as ds
+    att = ds.dataset('analytics/attendance', partitioning='hive')
+    att.to_table(filter=ds.field('academic_year') == 2025).group_by('status').aggregate(...)
+
+Dependencies: pip install pyarrow
+"""
+
+import calendar
+import json
+import os
+import shutil
+import time
+from datetime import date, datetime, timedelta
+
+from attendance_archive import COMPRESSION, archived_years
+from attendance_export import export_attendance
+from database import academic_year_of, academic_year_bounds
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analytics')
+MANIFEST     = '_manifest.json'
+STUDENT_COLUMNS = ['student_id', 'full_name', 'class_name', 'section', 'email',
+                   'phone', 'status', 'registered_at']
+
+
+def _month_key(d):
+    return f"{d.year}-{d.month:02d}"
+
+
+def _month_bounds(year, month):
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _month_dir(table, first):
+    return os.path.join(SNAPSHOT_DIR, table, f"academic_year={academic_year_of(first)}",
+                        f"month={_month_key(first)}")
+
+
+def _months(first, last):
+    y, m = first.year, first.month
+    while (y, m) <= (last.year, last.month):
+        yield y, m
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+
+
+# ══════════════════════════════════════════════════════════
+#  MANIFEST
+# ══════════════════════════════════════════════════════════
+def _load_manifest():
+    try:
+        with open(os.path.join(SNAPSHOT_DIR, MANIFEST), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {'months': {}}
+
+
+def _save_manifest(manifest):
+    path = os.path.join(SNAPSHOT_DIR, MANIFEST)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+# ══════════════════════════════════════════════════════════
+#  WRITERS
+# ══════════════════════════════════════════════════════════
+def _write_part(db, first, date_from, date_to, archived):
+    """Attendance + summary part files for date_from..date_to. Returns the row count."""
+    name = f"part-{date_from:%Y%m%d}-{date_to:%Y%m%d}.parquet"
+    path = os.path.join(_month_dir('attendance', first), name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    try:
+        rows = export_attendance(db, tmp, fmt='parquet', include_archive=archived,
+                                 date_from=date_from, date_to=date_to)
+        if rows:
+            os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    if rows:
+        _write_summary(path, os.path.join(_month_dir('summary', first), name))
+    return rows
+
+
+def _write_summary(attendance_path, path):
+    """Per day / class status counts of one attendance part, aggregated in Arrow."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    t      = pq.read_table(attendance_path, columns=['date', 'class_name', 'status'])
+    status = pc.fill_null(t['status'], '')
+    counts = pa.table({
+        'date':       t['date'],
+        'class_name': pc.fill_null(t['class_name'], 'Unknown'),
+        'present':    pc.cast(pc.equal(status, 'present'), pa.int32()),
+        'late':       pc.cast(pc.equal(status, 'late'), pa.int32()),
+    }).group_by(['date', 'class_name']).aggregate(
+        [('present', 'count'), ('present', 'sum'), ('late', 'sum')])
+
+    total   = pc.cast(counts['present_count'], pa.int32())
+    present = pc.cast(counts['present_sum'], pa.int32())
+    late    = pc.cast(counts['late_sum'], pa.int32())
+    summary = pa.table({
+        'date': counts['date'], 'class_name': counts['class_name'],
+        'total': total, 'present': present, 'late': late,
+        'absent': pc.subtract(pc.subtract(total, present), late),
+        'pct': pc.round(pc.multiply(pc.divide(pc.cast(pc.add(present, late), pa.float64()),
+                                              pc.cast(total, pa.float64())), 100), 1),
+    }).sort_by([('date', 'ascending'), ('class_name', 'ascending')])
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(summary, path + '.tmp', compression=COMPRESSION)
+    os.replace(path + '.tmp', path)
+
+
+def _ts(v):
+    if isinstance(v, str):
+        try:
+            return datetime.fromisoformat(v)
+        except ValueError:
+            return None
+    return v
+
+
+def _write_students(db):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    students = db.get_all_students()
+    schema   = pa.schema([(c, pa.timestamp('s') if c == 'registered_at' else pa.string())
+                          for c in STUDENT_COLUMNS])
+    columns  = [pa.array([_ts(s.get(c)) if c == 'registered_at' else
+                          (None if s.get(c) is None else str(s.get(c))) for s in students],
+                         type=field.type)
+                for c, field in zip(STUDENT_COLUMNS, schema)]
+    path = os.path.join(SNAPSHOT_DIR, 'students', 'students.parquet')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(pa.Table.from_arrays(columns, schema=schema), path + '.tmp',
+                   compression=COMPRESSION)
+    os.replace(path + '.tmp', path)
+    return len(students)
+
+
+def _drop_month(first):
+    for table in ('attendance', 'summary'):
+        shutil.rmtree(_month_dir(table, first), ignore_errors=True)
+
+
+# ══════════════════════════════════════════════════════════
+#  PUBLIC
+# ══════════════════════════════════════════════════════════
+def snapshot(db, through=None, progress=None):
+    """
+    Bring analytics/ up to date through `through` (default yesterday — today
+    is still being marked). progress(month_key) is called per month written.
+
+    Returns {'rows', 'appended', 'rewritten', 'students', 'elapsed'}; appended
+    and rewritten list the months touched.
+    """
+    started  = time.perf_counter()
+    through  = through or date.today() - timedelta(days=1)
+    manifest = _load_manifest()
+    months   = manifest['months']
+    archived = set(archived_years())
+    result   = {'rows': 0, 'appended': [], 'rewritten': [], 'students': 0, 'elapsed': 0.0}
+
+    first, _ = db.get_attendance_date_range()
+    if archived:
+        oldest = academic_year_bounds(min(archived))[0]
+        first  = min(first, oldest) if first else oldest
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+
+    for y, m in (_months(first, through) if first and first <= through else ()):
+        month_first, month_last = _month_bounds(y, m)
+        key     = _month_key(month_first)
+        upto    = min(month_last, through)
+        done    = months.get(key)
+        frozen  = academic_year_of(month_first) in archived
+        covered = date.fromisoformat(done['covered_to']) if done else None
+
+        if done and frozen:
+            continue
+        rewrite = done is None or (
+            list(db.get_attendance_watermark(month_first, covered)) != done['watermark'])
+        if not rewrite and covered >= upto:
+            if upto == month_last and done['parts'] > 1:
+                rewrite = True               # finished month: compact its parts
+            else:
+                continue
+
+        # Taken before reading, so edits made during the write show up next run
+        watermark = None if frozen else list(db.get_attendance_watermark(month_first, upto))
+        if rewrite:
+            _drop_month(month_first)
+            rows  = _write_part(db, month_first, month_first, upto, frozen)
+            parts = 1 if rows else 0
+            result['rewritten'].append(key)
+        else:
+            rows  = _write_part(db, month_first, covered + timedelta(days=1), upto, frozen)
+            parts = done['parts'] + (1 if rows else 0)
+            result['appended'].append(key)
+
+        months[key] = {
+            'covered_to': str(upto), 'parts': parts, 'watermark': watermark,
+        }
+        _save_manifest(manifest)
+        result['rows'] += rows
+        if progress:
+            progress(key)
+
+    result['students'] = _write_students(db)
+    manifest['updated_at'] = datetime.now().isoformat(timespec='seconds')
+    _save_manifest(manifest)
+    result['elapsed'] = round(time.perf_counter() - started, 2)
+    print(f"[ANALYTICS] {result['rows']} rows — appended {len(result['appended'])}, "
+          f"rewrote {len(result['rewritten'])} month(s) in {result['elapsed']}s → {SNAPSHOT_DIR}")
+    return result
+
+
+def clear():
+    """Delete the snapshot; the next snapshot() rebuilds it from scratch."""
+    shutil.rmtree(SNAPSHOT_DIR, ignore_errors=True)
@@ -0,0 +1,212 @@
+"""
+Attendance Archive — Closed Academic Years as Parquet
+=====================================================
+The live `attendance` table is range-partitioned by academic year
+(see DatabaseManager.ensure_attendance_partitions). Once a year is closed
+its rows are moved out of MySQL into compressed Parquet files:
+
+    attendance_archive/
+        academic_year=2023/attendance.parquet
+        academic_year=2024/attendance.parquet
+
+Reports keep working through DatabaseManager.get_attendance(include_archive=True),
+which only opens the files of the years a query can touch.
+
+Dependencies: pip install pyarrow
+"""
+
+import os
+from datetime import date, datetime
+
+from database import academic_year_of, academic_year_bounds
+
+ARCHIVE_DIR  = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'attendance_archive')
+COMPRESSION  = 'zstd'
+COLUMNS      = ['id', 'student_id', 'full_name', 'class_name', 'date',
+                'time_in', 'time_out', 'status', 'marked_by']
+
+
+def _year_path(year):
+    return os.path.join(ARCHIVE_DIR, f"academic_year={year}", "attendance.parquet")
+
+
+def archived_years():
+    """Academic years that have an archive file, oldest first."""
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+    years = []
+    for name in os.listdir(ARCHIVE_DIR):
+        if name.startswith('academic_year=') and os.path.exists(_year_path(int(name[14:]))):
+            years.append(int(name[14:]))
+    return sorted(years)
+
+
+def archive_academic_year(db, year):
+    """
+    Move one closed academic year from MySQL to Parquet.
+    Rows that reappear in the live table for an already archived year
+    (a backfill, a PC with a wrong clock) are merged into the existing
+    file — one row per (student_id, date), the live row winning.
+    Returns the number of rows archived.
+    """
+    import pandas as pd
+
+    if year >= academic_year_of(date.today()):
+        raise ValueError(f"Academic year {year}-{year + 1} is still open.")
+
+    start, end = academic_year_bounds(year)
+    rows = _fetch_year(db, start, end)
+    if not rows:
+        return 0
+
+    df = pd.DataFrame(rows)
+    for col in COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+    df = df[COLUMNS]
+    for col in ('time_in', 'time_out'):
+        df[col] = df[col].map(_fmt_time)
+    archived = len(df)
+
+    path = _year_path(year)
+    if os.path.exists(path):
+        old = pd.read_parquet(path)
+        df  = pd.concat([old, df], ignore_index=True)
+        df['date'] = pd.to_datetime(df['date']).dt.date
+        df = (df.drop_duplicates(['student_id', 'date'], keep='last')
+                .sort_values(['date', 'id'], ignore_index=True))
+        if len(df) < len(old):
+            raise IOError(f"Archive merge for {year} would lose rows "
+                          f"({len(old)} archived, {len(df)} after merge)")
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    df.to_parquet(tmp, compression=COMPRESSION, index=False)
+
+    # Only drop live rows once the file reads back complete
+    if len(pd.read_parquet(tmp, columns=['id'])) != len(df):
+        os.remove(tmp)
+        raise IOError(f"Archive verification failed for {year}")
+    os.replace(tmp, path)
+    db.drop_attendance_year(year)
+    return archived
+
+
+def _fmt_time(v):
+    """MySQL TIME comes back as timedelta — store it as zero-padded HH:MM:SS."""
+    if v is None:
+        return None
+    if hasattr(v, 'total_seconds'):
+        secs = int(v.total_seconds())
+        return f"{secs // 3600:02d}:{secs % 3600 // 60:02d}:{secs % 60:02d}"
+    return str(v)
+
+
+def _fetch_year(db, start, end):
+    conn   = db.get_connection()
+    cursor = conn.cursor(dictionary=True, buffered=True)
+    try:
+        cursor.execute(
+            "SELECT * FROM attendance WHERE date >= %s AND date < %s ORDER BY date, id",
+            (start, end)
+        )
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def archive_closed_years(db, keep_years=1):
+    """
+    Archive every academic year older than the current one minus keep_years.
+    Returns {year: rows_archived}.
+    """
+    conn   = db.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT MIN(date) FROM attendance")
+    first = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+    if not first:
+        return {}
+    if isinstance(first, str):   # SQLite returns untyped aggregates
+        first = date.fromisoformat(first)
+
+    last_closed = academic_year_of(date.today()) - 1 - keep_years
+    return {year: archive_academic_year(db, year)
+            for year in range(academic_year_of(first), last_closed + 1)}
+
+
+def _archive_scope(filter_date, date_from, date_to):
+    """(archived years the filter can touch, date_from, date_to)."""
+    years = archived_years()
+    if isinstance(filter_date, str):
+        filter_date = datetime.strptime(filter_date, '%Y-%m-%d').date()
+    if filter_date:
+        date_from = date_to = filter_date
+    if not years:
+        return [], date_from, date_to
+    lo = academic_year_of(date_from) if date_from else years[0]
+    hi = academic_year_of(date_to)   if date_to   else years[-1]
+    return [y for y in years if lo <= y <= hi], date_from, date_to
+
+
+def iter_archived_rows(columns=COLUMNS, filter_date=None, filter_class=None,
+                       filter_student=None, date_from=None, date_to=None, chunk=5000):
+    """
+    Archived rows matching the same filters, as tuples of `columns` yielded
+    in lists of up to `chunk` rows — the iter_attendance_rows() counterpart.
+    Each year's file is read one record batch at a time, oldest first.
+    """
+    years, date_from, date_to = _archive_scope(filter_date, date_from, date_to)
+    if not years:
+        return
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    cond = None
+    for term in ((pc.field('date') >= date_from) if date_from else None,
+                 (pc.field('date') <= date_to) if date_to else None,
+                 (pc.field('class_name') == filter_class) if filter_class else None,
+                 (pc.field('student_id') == filter_student) if filter_student else None):
+        if term is not None:
+            cond = term if cond is None else cond & term
+
+    for year in years:
+        for batch in pq.ParquetFile(_year_path(year)).iter_batches(batch_size=chunk,
+                                                                    columns=COLUMNS):
+            table = pa.Table.from_batches([batch])
+            if cond is not None:
+                table = table.filter(cond)
+            if table.num_rows:
+                yield list(zip(*(table[c].to_pylist() for c in columns)))
+
+
+def read_archived_attendance(filter_date=None, filter_class=None, filter_student=None,
+                             date_from=None, date_to=None):
+    """Archived rows matching the same filters as DatabaseManager.get_attendance()."""
+    years, date_from, date_to = _archive_scope(filter_date, date_from, date_to)
+    if not years:
+        return []
+
+    import pandas as pd
+
+    filters = []
+    if date_from:
+        filters.append(('date', '>=', date_from))
+    if date_to:
+        filters.append(('date', '<=', date_to))
+    if filter_class:
+        filters.append(('class_name', '=', filter_class))
+    if filter_student:
+        filters.append(('student_id', '=', filter_student))
+
+    frames = [pd.read_parquet(_year_path(y), filters=filters or None) for y in years]
+    df = pd.concat(frames, ignore_index=True)
+    if df.empty:
+        return []
+    df = df.sort_values(['date', 'time_in'], ascending=False)
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict('records')
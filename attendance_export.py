@@ -0,0 +1,172 @@
+"""
+Attendance Export — Streaming CSV / Excel / Parquet
+===================================================
+Exports used to load every row into a list of dicts, copy it into a pandas
+DataFrame and only then write it — three copies of the data in memory.
+export_attendance() streams instead:
+
+  • rows come from an unbuffered cursor in CHUNK-row batches
+    (DatabaseManager.iter_attendance_rows) as plain tuples
+  • each batch is written straight out, chosen by file extension:
+        .csv        csv.writer
+        .csv.gz     the same, gzip-compressed
+        .xlsx       openpyxl write-only workbook (new sheet every
+                    XLSX_MAX_ROWS rows)
+        .parquet    pyarrow ParquetWriter, one row group per batch
+  • include_archive=True appends the matching archived years, read from
+    their Parquet files one record batch at a time
+    (attendance_archive.iter_archived_rows)
+
+Memory stays at about one batch whatever the size of the export.
+
+Dependencies: pip install openpyxl (Excel), pyarrow (Parquet)
+"""
+
+import csv
+import gzip
+from itertools import islice
+
+from attendance_archive import COLUMNS, COMPRESSION, _fmt_time
+
+CHUNK         = 5000
+XLSX_MAX_ROWS = 1_048_575       # Excel's row limit minus the header
+
+_TIME_COLS = [COLUMNS.index('time_in'), COLUMNS.index('time_out')]
+
+
+def export_format(path):
+    """Format implied by a file name ('csv' when unrecognised)."""
+    name = path.lower()
+    for fmt in ('csv.gz', 'xlsx', 'parquet'):
+        if name.endswith('.' + fmt):
+            return fmt
+    return 'csv'
+
+
+# ══════════════════════════════════════════════════════════
+#  WRITERS
+# ══════════════════════════════════════════════════════════
+class _CsvWriter:
+    def __init__(self, path, compressed=False):
+        self._f = (gzip.open(path, 'wt', newline='', encoding='utf-8') if compressed
+                   else open(path, 'w', newline='', encoding='utf-8'))
+        self._w = csv.writer(self._f)
+        self._w.writerow(COLUMNS)
+
+    def write(self, rows):
+        self._w.writerows(rows)
+
+    def close(self):
+        self._f.close()
+
+
+class _XlsxWriter:
+    def __init__(self, path):
+        from openpyxl import Workbook
+        self._path  = path
+        self._wb    = Workbook(write_only=True)     # rows go to a temp file, not memory
+        self._sheet = None
+        self._rows  = XLSX_MAX_ROWS
+
+    def write(self, rows):
+        for row in rows:
+            if self._rows >= XLSX_MAX_ROWS:
+                n = len(self._wb.worksheets) + 1
+                self._sheet = self._wb.create_sheet('Attendance' if n == 1 else f'Attendance {n}')
+                self._sheet.append(COLUMNS)
+                self._rows = 0
+            self._sheet.append(row)
+            self._rows += 1
+
+    def close(self):
+        if self._sheet is None:            # no rows — still write the header
+            self._wb.create_sheet('Attendance').append(COLUMNS)
+        self._wb.save(self._path)
+
+
+class _ParquetWriter:
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa     = pa
+        self._schema = pa.schema([
+            ('id', pa.int64()), ('student_id', pa.string()), ('full_name', pa.string()),
+            ('class_name', pa.string()), ('date', pa.date32()), ('time_in', pa.string()),
+            ('time_out', pa.string()), ('status', pa.string()), ('marked_by', pa.string()),
+        ])
+        self._w = pq.ParquetWriter(path, self._schema, compression=COMPRESSION)
+
+    def write(self, rows):
+        if not rows:
+            return
+        columns = [self._pa.array(col, type=field.type)
+                   for col, field in zip(zip(*rows), self._schema)]
+        self._w.write_table(self._pa.Table.from_arrays(columns, schema=self._schema))
+
+    def close(self):
+        self._w.close()
+
+
+def _open_writer(path, fmt):
+    if fmt == 'xlsx':
+        return _XlsxWriter(path)
+    if fmt == 'parquet':
+        return _ParquetWriter(path)
+    return _CsvWriter(path, compressed=(fmt == 'csv.gz'))
+
+
+def _clean(batch):
+    """TIME values as HH:MM:SS text in every format."""
+    out = []
+    for row in batch:
+        row = list(row)
+        for i in _TIME_COLS:
+            row[i] = _fmt_time(row[i])
+        out.append(row)
+    return out
+
+
+def _write(path, fmt, batches, progress):
+    writer, rows = _open_writer(path, fmt or export_format(path)), 0
+    try:
+        for batch in batches:
+            writer.write(_clean(batch))
+            rows += len(batch)
+            if progress:
+                progress(rows)
+    finally:
+        writer.close()
+    return rows
+
+
+def _chunks(records, size):
+    it = iter(records)
+    while True:
+        batch = [tuple(r.get(c) for c in COLUMNS) for r in islice(it, size)]
+        if not batch:
+            return
+        yield batch
+
+
+# ══════════════════════════════════════════════════════════
+#  PUBLIC
+# ══════════════════════════════════════════════════════════
+def export_attendance(db, path, fmt=None, include_archive=False, progress=None,
+                      chunk=CHUNK, **filters):
+    """
+    Stream attendance matching get_attendance()-style filters (filter_date,
+    filter_class, filter_student, date_from, date_to) into `path`.
+    progress(rows_written) is called after each batch. Returns the row count.
+    """
+    def batches():
+        yield from db.iter_attendance_rows(COLUMNS, chunk=chunk, **filters)
+        if include_archive:
+            from attendance_archive import iter_archived_rows
+            yield from iter_archived_rows(COLUMNS, chunk=chunk, **filters)
+
+    return _write(path, fmt, batches(), progress)
+
+
+def export_records(records, path, fmt=None, progress=None, chunk=CHUNK):
+    """Write rows already in memory (dicts, e.g. a search result page) the same way."""
+    return _write(path, fmt, _chunks(records, chunk), progress)
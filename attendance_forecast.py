@@ -0,0 +1,141 @@
+"""
+Attendance Forecast — Early Warnings Before Students Fall Below 75%
+===================================================================
+The defaulter list only finds students who are already short. run()
+looks ahead for every student at once:
+
+  • ONE query streams this and last academic year's (student, date,
+    status) rows (DatabaseManager.iter_attendance_rows)
+  • NumPy bincounts give each student's term %, last-14 / 30-day %,
+    and last academic year's %
+  • trend — least-squares slope of the weekly % over TREND_WEEKS weeks,
+    in percentage points per week
+  • projected_pct — the term % if the student keeps their last-30-day
+    rate for the teaching days (Mon–Sat) left in the term
+  • risk — critical (below and staying below), recovering (below but
+    projected back over), at_risk (above now, projected under),
+    watch (within WATCH_MARGIN or falling fast), ok
+
+Results replace the attendance_forecast table in one transaction, so the
+dashboards and the defaulter PDF read them instantly. The scheduler runs
+it nightly; run() can also be called any time.
+
+Dependencies: numpy
+"""
+
+import time
+from datetime import date, datetime, timedelta
+
+from database import academic_year_of, academic_year_bounds
+
+THRESHOLD    = 75        # % required
+WATCH_MARGIN = 5         # projected within this of THRESHOLD → 'watch'
+FALLING_FAST = 3         # trend (points / week) at or below -this → 'watch'
+TREND_WEEKS  = 8
+WEEKMASK     = '1111110' # teaching days, Mon–Sat
+COLUMNS      = ('student_id', 'full_name', 'class_name', 'term_start', 'term_end',
+                'days_held', 'days_attended', 'pct', 'pct_14d', 'pct_30d', 'trend',
+                'projected_pct', 'prev_year_pct', 'risk', 'computed_at')
+
+
+def term_bounds(day):
+    """(first, last) day of the academic year containing `day`."""
+    start, next_start = academic_year_bounds(academic_year_of(day))
+    return start, next_start - timedelta(days=1)
+
+
+def compute(db, today=None):
+    """Forecast rows (dicts keyed by COLUMNS) for every student with attendance this term."""
+    import numpy as np
+
+    today = today or date.today()
+    term_start, term_end = term_bounds(today)
+    prev_start = academic_year_bounds(academic_year_of(today) - 1)[0]
+
+    sids, days, attended = [], [], []
+    for batch in db.iter_attendance_rows(('student_id', 'date', 'status'),
+                                         date_from=prev_start, date_to=today):
+        for sid, d, status in batch:
+            sids.append(sid)
+            days.append(d)
+            attended.append(status in ('present', 'late'))
+    if not sids:
+        return []
+
+    ids, idx = np.unique(np.array(sids, dtype=object), return_inverse=True)
+    n    = len(ids)
+    age  = (np.datetime64(today, 'D') - np.array(days, dtype='datetime64[D]')).astype(int)
+    att  = np.array(attended, dtype=float)
+    term = age <= (today - term_start).days
+
+    def rate(mask):
+        held = np.bincount(idx[mask], minlength=n)
+        done = np.bincount(idx[mask], weights=att[mask], minlength=n)
+        return held, done, np.where(held > 0, done / np.maximum(held, 1) * 100, np.nan)
+
+    held, done, pct = rate(term)
+    pct14 = rate(term & (age < 14))[2]
+    pct30 = rate(term & (age < 30))[2]
+    prev  = rate(~term)[2]
+
+    # Weekly % per student (n × TREND_WEEKS, week 0 = the last 7 days) and its slope
+    week  = age // 7
+    m     = term & (week < TREND_WEEKS)
+    cell  = idx[m] * TREND_WEEKS + week[m]
+    wheld = np.bincount(cell, minlength=n * TREND_WEEKS).reshape(n, TREND_WEEKS)
+    wdone = np.bincount(cell, weights=att[m], minlength=n * TREND_WEEKS).reshape(n, TREND_WEEKS)
+    has   = wheld > 0
+    y     = np.where(has, wdone / np.maximum(wheld, 1) * 100, 0)
+    x     = -np.arange(TREND_WEEKS, dtype=float)
+    k     = has.sum(axis=1)
+    xm    = (has * x).sum(axis=1) / np.maximum(k, 1)
+    ym    = (has * y).sum(axis=1) / np.maximum(k, 1)
+    dx    = (x - xm[:, None]) * has
+    var   = (dx ** 2).sum(axis=1)
+    trend = np.where((k >= 3) & (var > 0),
+                     (dx * (y - ym[:, None])).sum(axis=1) / np.where(var > 0, var, 1), np.nan)
+
+    remaining = int(np.busday_count(today + timedelta(days=1), term_end + timedelta(days=1),
+                                    weekmask=WEEKMASK)) if term_end > today else 0
+    recent    = np.where(np.isnan(pct30), pct, pct30) / 100
+    projected = np.where(held > 0, (done + recent * remaining) /
+                         np.maximum(held + remaining, 1) * 100, np.nan)
+
+    risk = np.select(
+        [(pct < THRESHOLD) & (projected < THRESHOLD), pct < THRESHOLD, projected < THRESHOLD,
+         (projected < THRESHOLD + WATCH_MARGIN) | (trend <= -FALLING_FAST)],
+        ['critical', 'recovering', 'at_risk', 'watch'], 'ok')
+
+    students = {s['student_id']: s for s in db.get_all_students()}
+    now      = datetime.now().replace(microsecond=0)
+
+    def val(a, i):
+        return None if np.isnan(a[i]) else round(float(a[i]), 1)
+
+    rows = []
+    for i in np.flatnonzero(held):
+        s = students.get(ids[i], {})
+        rows.append(dict(zip(COLUMNS, (
+            ids[i], s.get('full_name'), s.get('class_name'), term_start, term_end,
+            int(held[i]), int(done[i]), val(pct, i), val(pct14, i), val(pct30, i),
+            val(trend, i), val(projected, i), val(prev, i), str(risk[i]), now))))
+    return rows
+
+
+def run(db, today=None):
+    """
+    Recompute and store the forecast.
+    Returns {'students', 'critical', 'at_risk', 'elapsed'}.
+    """
+    started = time.perf_counter()
+    rows    = compute(db, today)
+    db.save_attendance_forecast(COLUMNS, [tuple(r[c] for c in COLUMNS) for r in rows])
+    result  = {
+        'students': len(rows),
+        'critical': sum(r['risk'] == 'critical' for r in rows),
+        'at_risk':  sum(r['risk'] == 'at_risk' for r in rows),
+        'elapsed':  round(time.perf_counter() - started, 2),
+    }
+    print(f"[FORECAST] {result['students']} students — {result['critical']} critical, "
+          f"{result['at_risk']} at risk in {result['elapsed']}s")
+    return result
@@ -12,6 +12,8 @@ from database import DatabaseManager
 
 try:
     from notification_service import notify_absent
+    from alert_dispatcher import format_summary
+    from notification_router import NotificationRouter
     NOTIFY_AVAILABLE = True
 except ImportError:
     NOTIFY_AVAILABLE = False
@@ -598,9 +600,8 @@ class AttendancePage:
         self._set_status("📲 Sending absent alerts...", '#7B1FA2')
 
         def _send_all():
-            sent = failed = skipped = 0
+            # Mark absent in DB
             for s in absent_students:
-                # Mark absent in DB
                 try:
                     self.db.mark_attendance(
                         s['student_id'], s['full_name'],
@@ -609,36 +610,37 @@ class AttendancePage:
                 except Exception:
                     pass
 
-                phone = s.get('phone', '')
-                if not phone:
-                    skipped += 1
-                    continue
-
-                ok, msg = notify_absent(
-                    s['full_name'], s['student_id'],
-                    s.get('class_name', ''), phone, today_str
-                )
-                if ok:
-                    sent += 1
-                else:
-                    failed += 1
+            # Queue first — already-queued students (a rerun) are not sent twice
+            router = NotificationRouter(self.db)
+            try:
+                queued = router.enqueue_absent_alerts(absent_students, today)
+            except Exception as e:
+                self.parent.after(0, lambda msg=str(e): messagebox.showerror("DB Error", msg))
+                return
 
+            def _logged(row, status, detail):
+                if status != 'sent':
+                    return
                 try:
                     self.db.log_activity(
                         "ABSENT_ALERT", self.admin_user,
-                        f"{s['full_name']} ({s['student_id']}) → {phone}"
+                        f"{row['student_id']} → {row['recipient']} ({row['channel']})"
                     )
                 except Exception:
                     pass
 
-            result = (
-                f"📲 Absent Alerts Done!\n\n"
-                f"✅ Sent    : {sent}\n"
-                f"❌ Failed  : {failed}\n"
-                f"⏭️ Skipped : {skipped} (no phone)\n"
-            )
+            summary = router.drain(on_result=_logged)
+            summary['skipped'] = queued['skipped']
+            channels = ", ".join(f"{name} {n['sent']}" for name, n in summary['by_channel'].items()
+                                 if n['total'])
+            result  = (f"📲 Absent Alerts Done!\n\n{format_summary(summary)}\n"
+                       f"📡 By channel : {channels or '—'}\n"
+                       f"↪️ Fallbacks  : {summary['fallbacks']}\n"
+                       f"🗓️ Digests    : {queued['digests']} "
+                       f"({queued['suppressed']} repeat absences held back)\n"
+                       f"🔒 Already notified earlier: {queued['duplicates']}\n")
             self.parent.after(0, lambda: (
-                self._set_status(f"✅ Alerts sent: {sent}", SUCCESS),
+                self._set_status(f"✅ Alerts sent: {summary['sent']}", SUCCESS),
                 messagebox.showinfo("Alerts Done", result)
             ))
 
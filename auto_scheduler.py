@@ -2,7 +2,7 @@
 Auto Scheduler — Advanced Feature #3
 =====================================
 Runs automatically in background:
-  - 09:30 AM → Send WhatsApp absent alerts
+  - 09:30 AM → Send absent alerts (WhatsApp / SMS / email)
   - 06:00 PM → Daily summary email
   - Every Friday 5PM → Weekly report
   - 1st of month → Monthly PDF report
@@ -15,22 +15,28 @@ HOW TO ADD TO YOUR APP:
         # When app closes:
         scheduler.stop()
 
-    OR add a Scheduler control panel to Settings page:
-        from auto_scheduler import SchedulerPanel
-        SchedulerPanel(self.content, self.db)
+    The Settings page (Settings → Scheduler) mounts a control panel for it:
+        from auto_scheduler import SchedulerPanel, current_scheduler
+        SchedulerPanel(tab, self.db, scheduler=current_scheduler())
 
-INSTALL (run once):
-    pip install schedule
+SCHEDULE: cron expressions in AttendanceScheduler.schedule; runs missed
+while the app was closed are caught up on start (AttendanceScheduler.catch_up).
 """
 
+import heapq
+import itertools
+import os
+import socket
 import threading
-import time
 import logging
+import uuid
 from datetime import datetime, date, timedelta
 import tkinter as tk
 from tkinter import ttk, messagebox
 
-from database import DatabaseManager
+from cron_schedule import CronSchedule
+from database import DatabaseManager, ACADEMIC_YEAR_START_MONTH
+from job_executor import JobExecutor
 
 BG       = '#FDFAF6'
 BROWN    = '#6B2D0E'
@@ -56,28 +62,73 @@ logging.basicConfig(
 )
 log = logging.getLogger('scheduler')
 
+OUTBOX_TASK        = '_outbox_retry'   # internal: retries queued alerts
+OUTBOX_RETRY_EVERY = 60                # seconds between outbox retry passes
+MAX_SLEEP          = 300               # longest single sleep of the loop (seconds)
+
+# ── Leader election — one PC runs the scheduled tasks ────
+LEADER_LEASE       = 'scheduler'
+LEASE_SECONDS      = 15                # standby PCs take over this long after the leader dies
+HEARTBEAT_EVERY    = 5                 # seconds between lease renewals
+
+_current = None                        # the scheduler started in this process
+
+
+def current_scheduler():
+    """The scheduler started in this process (by main.py), or None."""
+    return _current
+
 
 class AttendanceScheduler:
     """
     Background scheduler that runs daily tasks automatically.
-    Uses Python's built-in time module — no external library needed.
+    Tasks use cron expressions (see cron_schedule.py); the loop sleeps until
+    the next one is due instead of polling. Last runs are kept in the
+    `scheduler_runs` table, so a run missed while the app was closed or the
+    PC asleep is caught up on start if it is still within `catch_up`.
+    With the app open on several PCs, only the holder of the leader lease
+    (`scheduler_leases`) runs them; another PC takes over within
+    LEASE_SECONDS if it closes or crashes.
     """
 
     def __init__(self, db: DatabaseManager):
         self.db           = db
         self._thread      = None
         self._running     = False
-        self._last_run    = {}   # task_name → date last ran
+        self._stop_event  = threading.Event()
+        self._last_run    = {}   # task_name → datetime of last scheduled run
+        self._heap        = []   # (due, seq, task_name)
+        self._crons       = {}   # task_name → CronSchedule
+        self._seq         = itertools.count()
+        self.executor     = JobExecutor(on_change=self._job_changed)
+        self.instance_id  = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.is_leader    = False
         self.log_callback = None  # optional GUI callback: fn(msg, color)
 
         # ── Task schedule config ──────────────────────────
-        # Format: (hour, minute) for daily tasks
+        # Cron format: "minute hour day-of-month month day-of-week"
         self.schedule = {
-            'absent_alerts':    (9, 30),    # 9:30 AM every day
-            'daily_summary':    (18, 0),    # 6:00 PM every day
-            'weekly_report':    (17, 0),    # 5:00 PM every Friday (weekday=4)
-            'monthly_report':   (8, 0),     # 8:00 AM on 1st of each month
-            'auto_mark_absent': (11, 15),   # 11:15 AM — mark missing students absent
+            'absent_alerts':    '30 9 * * *',     # 9:30 AM every day
+            'daily_summary':    '0 18 * * *',     # 6:00 PM every day
+            'weekly_report':    '0 17 * * fri',   # 5:00 PM every Friday
+            'monthly_report':   '0 8 1 * *',      # 8:00 AM on 1st of each month
+            'auto_mark_absent': '15 11 * * *',    # 11:15 AM — mark missing students absent
+            'archive_attendance': f'0 2 1 {ACADEMIC_YEAR_START_MONTH} *',  # first day of the academic year
+            'analytics_snapshot': '30 1 * * *',   # 1:30 AM — yesterday into the Parquet snapshot
+            'attendance_forecast': '0 1 * * *',   # 1:00 AM — term-end projections / early warnings
+        }
+
+        # ── Catch-up: how late a missed run may still start ──
+        # (None → a missed run is skipped until its next time)
+        self.catch_up = {
+            'absent_alerts':    timedelta(hours=8),
+            'daily_summary':    timedelta(hours=6),
+            'weekly_report':    timedelta(days=3),
+            'monthly_report':   timedelta(days=7),
+            'auto_mark_absent': timedelta(hours=8),
+            'archive_attendance': timedelta(days=30),
+            'analytics_snapshot': timedelta(hours=20),
+            'attendance_forecast': timedelta(hours=20),
         }
 
         # ── Enable/disable individual tasks ──────────────
@@ -85,23 +136,37 @@ class AttendanceScheduler:
             'absent_alerts':    True,
             'daily_summary':    False,   # needs email setup
             'weekly_report':    False,   # needs email setup
-            'monthly_report':   False,   # needs fpdf2
+            'monthly_report':   False,   # needs reportlab
             'auto_mark_absent': True,
+            'archive_attendance': False,  # needs pyarrow
+            'analytics_snapshot': False,  # needs pyarrow
+            'attendance_forecast': True,
         }
 
     def start(self):
         """Start the scheduler in a background daemon thread."""
+        global _current
         if self._running:
             return
-        self._running = True
-        self._thread  = threading.Thread(target=self._run_loop, daemon=True)
+        _current = self
+        self._running    = True
+        self._stop_event = threading.Event()
+        self._thread     = threading.Thread(target=self._run_loop,
+                                            args=(self._stop_event,), daemon=True)
         self._thread.start()
         log.info("Scheduler started.")
         self._notify("🟢 Scheduler started", SUCCESS)
 
     def stop(self):
-        """Stop the scheduler."""
+        """Stop the scheduler (hands the leader lease over straight away)."""
         self._running = False
+        self._stop_event.set()
+        if self.is_leader:
+            self.is_leader = False
+            try:
+                self.db.release_lease(LEADER_LEASE, self.instance_id)
+            except Exception as e:
+                log.error(f"Could not release leader lease: {e}")
         log.info("Scheduler stopped.")
         self._notify("⏹ Scheduler stopped", MUTED)
 
@@ -116,79 +181,166 @@ class AttendanceScheduler:
     # ════════════════════════════════════════════════════
     #  MAIN LOOP
     # ════════════════════════════════════════════════════
-    def _run_loop(self):
-        """Check every minute if any task should run."""
+    def _push(self, due, task_name):
+        heapq.heappush(self._heap, (due, next(self._seq), task_name))
+
+    def _plan(self, now):
+        """Fill the timer heap: missed runs (within catch_up) now, the rest at their next time."""
+        try:
+            self._last_run = self.db.get_scheduler_runs()
+        except Exception as e:
+            log.error(f"Could not load last runs: {e}")
+        self._heap, self._crons = [], {}
+        for task_name, expr in self.schedule.items():
+            try:
+                cron = self._crons[task_name] = CronSchedule(expr)
+            except ValueError as e:
+                log.error(f"Task {task_name} not scheduled: {e}")
+                continue
+            last   = self._last_run.get(task_name)
+            window = self.catch_up.get(task_name)
+            missed = cron.last_due(max(last, now - window), now) if last and window else None
+            if missed:
+                log.info(f"Catching up {task_name} (missed {missed:%d-%m-%Y %H:%M})")
+            self._push(missed or cron.next_after(now), task_name)
+        self._push(now, OUTBOX_TASK)
+
+    def next_runs(self):
+        """{task_name: next due datetime} — for display."""
+        return {name: due for due, _, name in sorted(self._heap) if name != OUTBOX_TASK}
+
+    def _check_leadership(self, now):
+        """Take or renew the leader lease; (re)plan from the DB on becoming leader."""
+        try:
+            leader = self.db.acquire_lease(LEADER_LEASE, self.instance_id, LEASE_SECONDS)
+        except Exception as e:
+            log.error(f"Leader lease check failed: {e}")
+            leader = False
+        if leader and not self.is_leader:
+            log.info(f"Leader: {self.instance_id} now runs scheduled tasks")
+            self._notify("👑 This PC now runs the scheduled tasks", SUCCESS)
+            # Catch up whatever the previous leader missed
+            self._plan(now)
+        elif self.is_leader and not leader:
+            log.warning("Lost leader lease — standing by")
+            self._notify("⏸ Another PC took over the scheduled tasks", WARNING)
+        self.is_leader = leader
+
+    def _run_loop(self, stop_event):
+        """
+        Sleep until the next task is due, run it, reschedule it. Tasks only run
+        while this instance holds the leader lease (renewed every
+        HEARTBEAT_EVERY seconds); standby instances just keep trying to take it.
+        """
         log.info("Scheduler loop running...")
-        while self._running:
+        next_beat = datetime.now()
+        while not stop_event.is_set():
             now = datetime.now()
-            today = date.today()
+            if now >= next_beat:
+                self._check_leadership(now)
+                next_beat = now + timedelta(seconds=HEARTBEAT_EVERY)
+            if not self.is_leader:
+                stop_event.wait(HEARTBEAT_EVERY)
+                continue
+            due, _, task_name = self._heap[0]
+            if due > now:
+                # Capped so the lease is renewed and a clock change is noticed
+                stop_event.wait(min((due - now).total_seconds(),
+                                    (next_beat - now).total_seconds(), MAX_SLEEP))
+                continue
+            heapq.heappop(self._heap)
 
-            for task_name, (h, m) in self.schedule.items():
-                if not self.enabled.get(task_name, False):
-                    continue
+            if task_name == OUTBOX_TASK:
+                # Retry queued alerts that failed earlier or were interrupted
+                if self.enabled.get('absent_alerts'):
+                    self.executor.submit(OUTBOX_TASK, lambda cancel: self._drain_outbox())
+                self._push(now + timedelta(seconds=OUTBOX_RETRY_EVERY), OUTBOX_TASK)
+                continue
 
-                # Check if it's time
-                if now.hour == h and now.minute == m:
-                    last = self._last_run.get(task_name)
-
-                    # Skip if already ran today (or this week/month for weekly/monthly)
-                    if task_name == 'weekly_report':
-                        if now.weekday() != 4:   # Friday only
-                            continue
-                        if last and last >= today - timedelta(days=1):
-                            continue
-                    elif task_name == 'monthly_report':
-                        if today.day != 1:        # 1st of month only
-                            continue
-                        if last and last.month == today.month:
-                            continue
-                    else:
-                        if last and last >= today:
-                            continue
-
-                    # Run the task
-                    self._last_run[task_name] = today
-                    threading.Thread(
-                        target=self._run_task,
-                        args=(task_name,),
-                        daemon=True
-                    ).start()
-
-            time.sleep(60)   # check every minute
-
-    def _run_task(self, task_name):
-        """Execute a specific task safely."""
-        log.info(f"Running task: {task_name}")
-        self._notify(f"⏳ Running: {task_name}...", WARNING)
-        try:
-            if task_name == 'absent_alerts':
-                self._task_absent_alerts()
-            elif task_name == 'daily_summary':
-                self._task_daily_summary()
-            elif task_name == 'weekly_report':
-                self._task_weekly_report()
-            elif task_name == 'monthly_report':
-                self._task_monthly_report()
-            elif task_name == 'auto_mark_absent':
-                self._task_auto_mark_absent()
-        except Exception as e:
-            log.error(f"Task {task_name} failed: {e}")
-            self._notify(f"❌ {task_name} failed: {e}", DANGER)
+            self._push(self._crons[task_name].next_after(now), task_name)
+            if not self.enabled.get(task_name, False):
+                continue
+            window = self.catch_up.get(task_name) or timedelta(minutes=1)
+            if now - due > window:
+                log.warning(f"Skipped {task_name}: due {due:%d-%m-%Y %H:%M}, too late to catch up")
+                continue
+
+            try:
+                if not self.db.claim_scheduler_run(task_name, due):
+                    log.info(f"Skipped {task_name}: already run for {due:%d-%m-%Y %H:%M}")
+                    continue
+            except Exception as e:
+                log.error(f"Could not record run of {task_name}: {e}")
+                continue
+            self._last_run[task_name] = due
+            triggered_by = 'catch-up' if now - due > timedelta(minutes=1) else 'schedule'
+            if not self.executor.submit(task_name, lambda cancel, t=task_name: self._run_task(t, cancel),
+                                        triggered_by):
+                log.warning(f"Skipped {task_name}: previous run still in progress")
+
+    def _drain_outbox(self):
+        from notification_router import NotificationRouter
+        summary = NotificationRouter(self.db).drain()
+        if summary['total']:
+            log.info(f"Outbox retry: {summary['sent']} sent, "
+                     f"{summary['failed']} failed, {summary['deferred']} deferred")
+
+    def _job_changed(self, task_name, job):
+        """JobExecutor callback: log, tell the GUI and keep a history row per run."""
+        status = job['status']
+        if task_name == OUTBOX_TASK:
+            if status == 'failed':
+                log.error(f"Outbox retry failed: {job['message']}")
+            return
+        if status == 'running':
+            log.info(f"Running task: {task_name} ({job['triggered_by']})")
+            self._notify(f"⏳ Running: {task_name}...", WARNING)
+        elif status == 'timeout' and job['duration'] is None:
+            log.error(f"Task {task_name} timed out: {job['message']}")
+            self._notify(f"⌛ {task_name} timed out", DANGER)
+        elif status == 'failed':
+            log.error(f"Task {task_name} failed: {job['message']}")
+            self._notify(f"❌ {task_name} failed: {job['message']}", DANGER)
+        if status in ('done', 'failed', 'timeout') and job['duration'] is not None:
+            log.info(f"Task {task_name} {status} in {job['duration']}s")
+            try:
+                self.db.record_job_run(task_name, job['triggered_by'], status,
+                                       job['started'], job['duration'], job['message'])
+            except Exception as e:
+                log.error(f"Could not record job run of {task_name}: {e}")
+
+    def _run_task(self, task_name, cancel=None):
+        """Execute a specific task (on a JobExecutor worker; exceptions are recorded there)."""
+        if task_name == 'absent_alerts':
+            self._task_absent_alerts()
+        elif task_name == 'daily_summary':
+            self._task_daily_summary()
+        elif task_name == 'weekly_report':
+            self._task_weekly_report()
+        elif task_name == 'monthly_report':
+            self._task_monthly_report()
+        elif task_name == 'auto_mark_absent':
+            self._task_auto_mark_absent(cancel)
+        elif task_name == 'archive_attendance':
+            self._task_archive_attendance()
+        elif task_name == 'analytics_snapshot':
+            self._task_analytics_snapshot()
+        elif task_name == 'attendance_forecast':
+            self._task_attendance_forecast()
 
     # ════════════════════════════════════════════════════
     #  TASKS
     # ════════════════════════════════════════════════════
 
     def _task_absent_alerts(self):
-        """Send WhatsApp/SMS to parents of absent students."""
+        """Alert parents of absent students over their preferred channel."""
         try:
-            from notification_service import notify_absent
+            from notification_router import NotificationRouter
         except ImportError:
             log.warning("notification_service not found — skipping absent alerts")
             return
 
-        today     = date.today()
-        today_str = today.strftime('%d-%m-%Y')
+        today = date.today()
 
         try:
             all_students  = self.db.get_all_students()
@@ -208,25 +360,14 @@ class AttendanceScheduler:
             and s['student_id'] not in present_ids
         ]
 
-        sent = failed = skipped = 0
-        for s in absent_students:
-            phone = s.get('phone', '')
-            if not phone:
-                skipped += 1
-                continue
-            try:
-                ok, _ = notify_absent(
-                    s['full_name'], s['student_id'],
-                    s.get('class_name', ''), phone, today_str
-                )
-                if ok:
-                    sent += 1
-                else:
-                    failed += 1
-            except Exception:
-                failed += 1
+        router  = NotificationRouter(self.db)
+        queued  = router.enqueue_absent_alerts(absent_students, today)
+        summary = router.drain()
+        sent, failed, skipped = (summary['sent'], summary['failed'] + summary['deferred'],
+                                 queued['skipped'])
 
-        msg = f"📲 Absent alerts: {sent} sent, {failed} failed, {skipped} skipped"
+        msg = (f"📲 Absent alerts: {sent} sent, {failed} failed, {skipped} skipped, "
+               f"{queued['suppressed']} held for digest in {summary['elapsed']}s")
         log.info(msg)
         self._notify(msg, SUCCESS if failed == 0 else WARNING)
 
@@ -236,7 +377,7 @@ class AttendanceScheduler:
         except Exception:
             pass
 
-    def _task_auto_mark_absent(self):
+    def _task_auto_mark_absent(self, cancel=None):
         """Mark all students not present by 11:15 AM as absent."""
         today = date.today()
         try:
@@ -251,6 +392,9 @@ class AttendanceScheduler:
         marked = 0
 
         for s in all_students:
+            if cancel and cancel.is_set():
+                log.warning("auto_mark_absent stopped after timeout")
+                break
             if s.get('status') != 'active':
                 continue
             if s['student_id'] not in present_ids:
@@ -281,7 +425,6 @@ class AttendanceScheduler:
         Called by auto_mark_absent so students are marked ABSENT (not late).
         """
         from datetime import date, datetime
-        import mysql.connector
         today = date.today()
         now   = datetime.now().strftime('%H:%M:%S')
         conn  = self.db.get_connection()
@@ -292,11 +435,12 @@ class AttendanceScheduler:
             cursor.execute(
                 """INSERT INTO attendance
                    (student_id, full_name, class_name, date, time_in, status)
-                   VALUES (%s, %s, %s, %s, %s, 'absent')
-                   ON DUPLICATE KEY UPDATE status=IF(status='absent','absent',status)""",
+                   VALUES (%s, %s, %s, %s, %s, 'absent') """ +
+                self.db.backend.upsert_clause(('student_id', 'date')),
                 (student_id, full_name, class_name, today, now)
             )
             conn.commit()
+            self.db.csv_mirror.record(student_id, full_name, class_name, today, now, 'absent')
             return True
         except Exception as e:
             log.warning(f"force_mark_absent error for {student_id}: {e}")
@@ -306,76 +450,89 @@ class AttendanceScheduler:
             conn.close()
 
     def _task_daily_summary(self):
-        """Send daily attendance summary email."""
-        # Requires email_service.py (Email feature)
-        try:
-            from email_service import send_daily_summary_email
-            send_daily_summary_email(self.db)
-            self._notify("📧 Daily summary email sent", SUCCESS)
-        except ImportError:
-            log.info("email_service not available — skipping daily summary")
-        except Exception as e:
-            log.error(f"Daily summary failed: {e}")
+        """Email the daily summary with per-class PDFs (email_service)."""
+        from email_service import send_daily_summary_email
+        self._report_done("Daily summary", send_daily_summary_email(self.db))
 
     def _task_weekly_report(self):
-        """Generate and email weekly attendance report."""
-        try:
-            from email_service import send_weekly_report_email
-            send_weekly_report_email(self.db)
-            self._notify("📧 Weekly report email sent", SUCCESS)
-        except ImportError:
-            log.info("email_service not available — skipping weekly report")
-        except Exception as e:
-            log.error(f"Weekly report failed: {e}")
+        """Email month-to-date registers per class and the defaulter list."""
+        from email_service import send_weekly_report_email
+        self._report_done("Weekly report", send_weekly_report_email(self.db))
 
     def _task_monthly_report(self):
-        """Generate monthly PDF and save to reports folder."""
+        """Generate last month's register PDFs (all classes + one per class)."""
+        from email_service import generate_monthly_registers
+        last_month = date.today().replace(day=1) - timedelta(days=1)
+        result = generate_monthly_registers(self.db, last_month.year, last_month.month)
+        self._report_done(f"Monthly registers {last_month:%Y-%m}", result)
+
+    def _report_done(self, label, result):
+        t   = result['timings']
+        msg = (f"📄 {label}: {len(result['files'])} PDF(s)"
+               f"{', emailed' if result['sent'] else ''} in {t.get('total', 0)}s "
+               f"(query {t.get('query', 0)}s, render {t.get('render', 0)}s"
+               f"{', send ' + str(t['send']) + 's' if 'send' in t else ''})")
+        log.info(msg)
+        self._notify(msg, SUCCESS if not result['errors'] else WARNING)
+        for where, err in result['errors']:
+            log.error(f"{label} — {where}: {err}")
+        if result['errors'] and not result['files']:
+            raise RuntimeError(f"{label} failed: {result['errors'][0][1]}")
+
+    def _task_archive_attendance(self):
+        """Move closed academic years out of MySQL into Parquet files."""
+        from attendance_archive import archive_closed_years
+        archived = archive_closed_years(self.db)
+        total    = sum(archived.values())
+        msg = (f"🗄 Archived {total} attendance rows "
+               f"({', '.join(f'{y}-{y + 1}' for y in archived) or 'nothing to archive'})")
+        log.info(msg)
+        self._notify(msg, SUCCESS)
         try:
-            import os
-            reports_dir = os.path.join(
-                os.path.dirname(os.path.abspath(__file__)),
-                'monthly_reports'
-            )
-            os.makedirs(reports_dir, exist_ok=True)
-
-            today    = date.today()
-            # Report for previous month
-            first_day = today.replace(day=1) - timedelta(days=1)
-            month_str = first_day.strftime('%Y-%m')
-            fname     = os.path.join(reports_dir, f"monthly_{month_str}.pdf")
-
-            from pdf_reports import PDFReportGenerator
-            gen = PDFReportGenerator(self.db)
-            gen._generate_monthly(fname, month_str, None)
+            self.db.log_activity("AUTO_SCHEDULER", "system", msg)
+        except Exception:
+            pass
 
-            msg = f"📄 Monthly PDF generated: {fname}"
-            log.info(msg)
-            self._notify(msg, SUCCESS)
-        except Exception as e:
-            log.error(f"Monthly report failed: {e}")
-            self._notify(f"❌ Monthly report failed: {e}", DANGER)
+    def _task_analytics_snapshot(self):
+        """Append the days since the last run to the analytics Parquet snapshot."""
+        from analytics_snapshot import snapshot
+        result = snapshot(self.db)
+        msg = (f"📊 Analytics snapshot: {result['rows']} rows "
+               f"({len(result['appended'])} month(s) appended, "
+               f"{len(result['rewritten'])} rewritten)")
+        log.info(msg)
+        self._notify(msg, SUCCESS)
+
+    def _task_attendance_forecast(self):
+        """Recompute every student's term-end projection and risk."""
+        from attendance_forecast import run
+        result = run(self.db)
+        msg = (f"📈 Attendance forecast: {result['students']} students — "
+               f"{result['critical']} critical, {result['at_risk']} at risk")
+        log.info(msg)
+        self._notify(msg, WARNING if result['at_risk'] else SUCCESS)
 
     # ════════════════════════════════════════════════════
     #  MANUAL TRIGGER
     # ════════════════════════════════════════════════════
     def run_now(self, task_name):
-        """Manually trigger a task immediately."""
-        threading.Thread(
-            target=self._run_task,
-            args=(task_name,),
-            daemon=True
-        ).start()
+        """Manually trigger a task (queued behind running jobs). False if already running."""
+        started = self.executor.submit(task_name, lambda cancel: self._run_task(task_name, cancel),
+                                       'manual')
+        if not started:
+            self._notify(f"⚠️ {task_name} is already queued or running", WARNING)
+        return started
 
 
 # ════════════════════════════════════════════════════════
-#  SCHEDULER CONTROL PANEL (add to Settings page)
+#  SCHEDULER CONTROL PANEL (Settings → Scheduler)
 # ════════════════════════════════════════════════════════
 class SchedulerPanel:
     """
-    GUI control panel for the scheduler.
-    Add to your Settings page:
-        from auto_scheduler import SchedulerPanel
-        SchedulerPanel(content_frame, db)
+    GUI control panel for the scheduler, mounted in Settings → Scheduler:
+        from auto_scheduler import SchedulerPanel, current_scheduler
+        SchedulerPanel(tab, db, scheduler=current_scheduler())
+    Without a scheduler it creates a stopped one that ▶ Start can run.
     """
 
     def __init__(self, parent, db: DatabaseManager, scheduler=None):
@@ -423,7 +580,8 @@ class SchedulerPanel:
         # Header row
         hdr_row = tk.Frame(tasks_frame, bg=BROWN)
         hdr_row.pack(fill='x')
-        for txt, w in [("Task", 25), ("Schedule", 15), ("Enabled", 8), ("Run Now", 10)]:
+        for txt, w in [("Task", 25), ("Schedule", 15), ("Enabled", 8), ("Run Now", 10),
+                       ("Last Run", 26)]:
             tk.Label(hdr_row, text=txt, font=(FONT, 9, 'bold'),
                      bg=BROWN, fg=WHITE, width=w, anchor='w').pack(side='left', padx=6, pady=4)
 
@@ -433,8 +591,12 @@ class SchedulerPanel:
             ('Daily Summary',    'daily_summary',    'Every day 6:00 PM'),
             ('Weekly Report',    'weekly_report',    'Every Friday 5:00 PM'),
             ('Monthly Report',   'monthly_report',   'Every 1st at 8:00 AM'),
+            ('Archive Attendance', 'archive_attendance', 'Yearly, June 1st 2 AM'),
+            ('Analytics Snapshot', 'analytics_snapshot', 'Every day 1:30 AM'),
+            ('Attendance Forecast', 'attendance_forecast', 'Every day 1:00 AM'),
         ]
-        self._vars = {}
+        self._vars   = {}
+        self._status = {}
         for i, (label, key, schedule) in enumerate(task_info):
             bg = '#FFF8F0' if i % 2 == 0 else WHITE
             row = tk.Frame(tasks_frame, bg=bg)
@@ -463,6 +625,10 @@ class SchedulerPanel:
                       relief='flat', padx=8, pady=2,
                       cursor='hand2').pack(side='left', padx=8)
 
+            self._status[key] = tk.Label(row, text="—", font=(FONT, 9), bg=bg, fg=MUTED,
+                                         width=26, anchor='w')
+            self._status[key].pack(side='left', padx=6)
+
         # Log box
         tk.Label(body, text="Scheduler Log:",
                  font=(FONT, 11, 'bold'), bg=BG, fg=BROWN).pack(anchor='w', pady=(8, 4))
@@ -481,6 +647,44 @@ class SchedulerPanel:
 
         self._add_log("Scheduler ready. Click ▶ Start to begin.", SUCCESS)
 
+        try:
+            self._history = self.db.get_latest_job_runs()
+        except Exception:
+            self._history = {}
+        self._refresh_status()
+
+    def _refresh_status(self):
+        """Show each task's current / last job status; repeats every 2 s."""
+        try:
+            if not self.parent.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        icons = {'queued': ('🕒', MUTED), 'running': ('⏳', WARNING), 'done': ('✅', SUCCESS),
+                 'failed': ('❌', DANGER), 'timeout': ('⌛', DANGER)}
+        live = dict(self.scheduler.executor.jobs)
+        for key, label in self._status.items():
+            job = live.get(key)
+            if job is None and key in self._history:
+                h   = self._history[key]
+                job = {'status': h['status'], 'started': h['started_at'],
+                       'duration': h['duration']}
+            if not job:
+                continue
+            icon, color = icons.get(job['status'], ('•', MUTED))
+            text = f"{icon} {job['status']}"
+            if job.get('started'):
+                text += f"  {job['started']:%d-%m %H:%M}"
+            if job.get('duration') is not None:
+                text += f"  ({job['duration']:.1f}s)"
+            label.config(text=text, fg=color)
+        if self.scheduler._running:
+            if self.scheduler.is_leader:
+                self.status_badge.config(text="● RUNNING", fg='#88FF88')
+            else:
+                self.status_badge.config(text="● STANDBY (another PC runs tasks)", fg=GOLD)
+        self.parent.after(2000, self._refresh_status)
+
     def _add_log(self, msg, color=None):
         """Add message to log box."""
         try:
@@ -502,5 +706,5 @@ class SchedulerPanel:
         self.status_badge.config(text="● STOPPED", fg='#FF8888')
 
     def _run_now(self, task_name):
-        self._add_log(f"⚡ Manually running: {task_name}...", WARNING)
-        self.scheduler.run_now(task_name)
\ No newline at end of file
+        if self.scheduler.run_now(task_name):
+            self._add_log(f"⚡ Manually running: {task_name}...", WARNING)
\ No newline at end of file
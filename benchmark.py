@@ -0,0 +1,351 @@
+"""
+Performance Benchmarks
+======================
+Measures the hot paths of the attendance system on this machine.
+
+Usage:
+    python benchmark.py db        # per-mark latency, MySQL vs SQLite backends
+    python benchmark.py alerts    # absent-alert dispatch against a local Twilio stub
+    python benchmark.py smtp      # email throughput against a local SMTP sink
+    python benchmark.py templates # rendering 10k absent-alert emails
+    python benchmark.py reports   # per-student PDF reports, one by one vs batch
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import time
+
+
+def _percentiles(samples_ms):
+    s = sorted(samples_ms)
+    pick = lambda q: s[min(len(s) - 1, int(q * len(s)))]
+    return (f"mean {sum(s) / len(s):7.3f} ms   p50 {pick(0.50):7.3f}   "
+            f"p95 {pick(0.95):7.3f}   p99 {pick(0.99):7.3f}")
+
+
+def _section(title):
+    print()
+    print(title)
+    print("-" * 60)
+
+
+# ════════════════════════════════════════════════════════
+#  DB — per-mark latency
+# ════════════════════════════════════════════════════════
+def bench_db(n_students=500):
+    import database
+
+    tmp = tempfile.mkdtemp(prefix='attendance_bench_')
+    database.SQLITE_PATH = os.path.join(tmp, 'bench.db')
+    database.DB_CONFIG   = {**database.DB_CONFIG, 'database': 'face_attendance_bench'}
+
+    for backend in ('sqlite', 'mysql'):
+        _section(f"Backend: {backend}  ({n_students} students)")
+        try:
+            db = database.DatabaseManager(backend)
+            db.csv_dir = tmp
+            db.initialize_database()
+            conn = db.get_connection()
+            cur  = conn.cursor()
+            cur.execute("DELETE FROM attendance")
+            cur.execute("DELETE FROM students WHERE student_id LIKE 'BENCH%'")
+            conn.commit()
+            cur.close()
+            conn.close()
+        except Exception as e:
+            print(f"⚠️  Skipped — {e}")
+            continue
+
+        for i in range(n_students):
+            db.add_student(f"BENCH{i:05d}", f"Bench Student {i}", "BENCH", "A",
+                           None, None, None, None)
+
+        for label in ("First mark (insert)", "Repeat mark (upsert)"):
+            samples = []
+            for i in range(n_students):
+                t0 = time.perf_counter()
+                db.mark_attendance(f"BENCH{i:05d}", f"Bench Student {i}", "BENCH")
+                samples.append((time.perf_counter() - t0) * 1000)
+            print(f"{label:24s} {_percentiles(samples)}")
+
+        samples = []
+        for i in range(0, n_students, 5):
+            t0 = time.perf_counter()
+            db.get_attendance(filter_student=f"BENCH{i:05d}")
+            samples.append((time.perf_counter() - t0) * 1000)
+        print(f"{'Student history read':24s} {_percentiles(samples)}")
+
+        conn = db.get_connection()
+        cur  = conn.cursor()
+        cur.execute("DELETE FROM attendance WHERE class_name='BENCH'")
+        cur.execute("DELETE FROM students WHERE student_id LIKE 'BENCH%'")
+        conn.commit()
+        cur.close()
+        conn.close()
+
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+# ════════════════════════════════════════════════════════
+#  ALERTS — absent-alert dispatch against a local Twilio stub
+# ════════════════════════════════════════════════════════
+def _twilio_stub(latency, error_rate):
+    """
+    Local HTTP server answering Twilio's Messages endpoint. Sleeps `latency`
+    seconds per request and answers a share of them with 429 / 503.
+    """
+    import json
+    import random
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        counter = 0
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            time.sleep(latency)
+            roll = random.random()
+            if roll < error_rate / 2:
+                status, body = 429, {'code': 20429, 'message': 'Too Many Requests', 'status': 429}
+            elif roll < error_rate:
+                status, body = 503, {'code': 20500, 'message': 'Service Unavailable', 'status': 503}
+            else:
+                Handler.counter += 1
+                status, body = 201, {'sid': f"SM{Handler.counter:032d}", 'status': 'queued'}
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench_alerts(n_students=200, latency=0.05, error_rate=0.05):
+    import io
+    import contextlib
+    import notification_service as ns
+    from alert_dispatcher import AlertDispatcher
+
+    server = _twilio_stub(latency, error_rate)
+    ns.ENABLED      = True
+    ns.API_BASE_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    ns.reset_client()
+
+    students = [{'student_id': f"BENCH{i:05d}", 'full_name': f"Bench Student {i}",
+                 'class_name': 'BENCH', 'phone': f"98{i:08d}"} for i in range(n_students)]
+
+    runs = [
+        ("Sequential (old loop)", dict(workers=1, rate=1000, burst=1000)),
+        ("Dispatcher, 8 workers", dict(rate=1000, burst=1000)),
+        ("Dispatcher, 40 msg/s",  dict(rate=40, burst=10)),
+    ]
+    _section(f"Absent alerts  ({n_students} students, {latency * 1000:.0f} ms stub latency, "
+             f"{error_rate:.0%} transient errors)")
+    for label, kwargs in runs:
+        dispatcher = AlertDispatcher(backoff_base=0.05, **kwargs)
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = dispatcher.dispatch(students, '01-01-2026')
+        rate = summary['sent'] / summary['elapsed'] if summary['elapsed'] else 0
+        print(f"{label:24s} {summary['elapsed']:6.2f} s   {rate:6.1f} msg/s   "
+              f"sent {summary['sent']}  failed {summary['failed']}  retries {summary['retries']}")
+
+    server.shutdown()
+    ns.reset_client()
+
+
+# ════════════════════════════════════════════════════════
+#  SMTP — per-message connections vs pooled sessions
+# ════════════════════════════════════════════════════════
+def _smtp_sink(rtt, handshake):
+    """
+    Minimal local SMTP server that accepts and discards everything.
+    Every reply waits `rtt` seconds; a new connection also waits
+    `handshake` (standing in for TLS + AUTH against a real provider).
+    """
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+        def reply(self, line):
+            time.sleep(rtt)
+            self.wfile.write(line.encode() + b"\r\n")
+
+        def handle(self):
+            time.sleep(handshake)
+            self.reply("220 sink ESMTP")
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    return
+                cmd = line.decode(errors='replace').strip().upper()
+                if cmd.startswith(("EHLO", "HELO")):
+                    self.reply("250-sink\r\n250-AUTH PLAIN\r\n250 8BITMIME")
+                elif cmd.startswith("AUTH"):
+                    self.reply("235 OK")
+                elif cmd == "DATA":
+                    self.reply("354 go ahead")
+                    while self.rfile.readline() not in (b".\r\n", b""):
+                        pass
+                    server.messages += 1
+                    self.reply("250 queued")
+                elif cmd == "QUIT":
+                    self.reply("221 bye")
+                    return
+                else:
+                    self.reply("250 OK")
+
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.messages = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench_smtp(n_messages=300, rtt=0.002, handshake=0.05):
+    import io
+    import contextlib
+    import smtplib
+    import email_alerts as ea
+
+    server = _smtp_sink(rtt, handshake)
+    ea.ENABLED, ea.SMTP_STARTTLS = True, False
+    ea.SMTP_SERVER, ea.SMTP_PORT = '127.0.0.1', server.server_address[1]
+    students = [{'student_id': f"BENCH{i:05d}", 'full_name': f"Bench Student {i}",
+                 'class_name': 'BENCH', 'email': f"parent{i}@example.com"}
+                for i in range(n_messages)]
+
+    _section(f"SMTP  ({n_messages} messages, {rtt * 1000:.0f} ms per reply, "
+             f"{handshake * 1000:.0f} ms connect+TLS+auth)")
+
+    # Old behaviour: connect, log in and quit for every message
+    t0 = time.perf_counter()
+    for s in students:
+        with smtplib.SMTP(ea.SMTP_SERVER, ea.SMTP_PORT) as smtp:
+            smtp.login(ea.SENDER_EMAIL, ea.SENDER_PASSWORD)
+            smtp.sendmail(ea.SENDER_EMAIL, [s['email']], "Subject: bench\r\n\r\nbody")
+    elapsed = time.perf_counter() - t0
+    print(f"{'Connection per message':26s} {elapsed:6.2f} s   {n_messages / elapsed:7.1f} msg/s")
+
+    for size in (1, ea.SMTP_POOL_SIZE):
+        ea.close_pool()
+        ea.SMTP_POOL_SIZE = size
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = ea.send_absent_alerts(students, '01 January 2026')
+        pool = ea.get_pool()
+        print(f"{f'Pooled, {size} session(s)':26s} {summary['elapsed']:6.2f} s   "
+              f"{summary['sent'] / summary['elapsed']:7.1f} msg/s   "
+              f"connects {pool.connects}  failed {summary['failed']}")
+
+    ea.close_pool()
+    server.shutdown()
+
+
+# ════════════════════════════════════════════════════════
+#  TEMPLATES — rendering absent-alert emails
+# ════════════════════════════════════════════════════════
+def bench_templates(n=10_000):
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+    import email_alerts as ea
+
+    students = [(f"Bench Student {i}", f"BENCH{i:05d}", 'BENCH', '01 January 2026')
+                for i in range(n)]
+    sender = f"{ea.SENDER_NAME} <{ea.SENDER_EMAIL}>"
+    _section(f"Email templates  ({n:,} absent alerts)")
+
+    def per_message_mime(name, sid, cls, day):
+        msg            = MIMEMultipart('alternative')
+        msg['Subject'] = f"Attendance Alert: {name} was Absent on {day}"
+        msg['From']    = sender
+        msg['To']      = 'parent@example.com'
+        msg.attach(MIMEText(ea._build_absent_html(name, sid, cls, day), 'html'))
+        return msg.as_string()
+
+    mail = ea._absent_mail()
+    runs = [
+        ("HTML render only",           lambda *a: ea._build_absent_html(*a)),
+        ("MIME tree per message",      per_message_mime),
+        ("Precompiled HtmlMail.build", lambda *a: mail.build('parent@example.com',
+                                                             **ea._absent_fields(*a))),
+    ]
+    for label, fn in runs:
+        t0 = time.perf_counter()
+        for args in students:
+            fn(*args)
+        elapsed = time.perf_counter() - t0
+        print(f"{label:28s} {elapsed:6.3f} s   {elapsed / n * 1e6:7.1f} µs/msg")
+
+
+# ════════════════════════════════════════════════════════
+#  REPORTS — every student's PDF, one call each vs report_batch
+# ════════════════════════════════════════════════════════
+def bench_reports(n_students=200, n_days=60):
+    from datetime import date, timedelta
+    import database
+    import pdf_reports
+    from report_batch import generate_student_reports
+
+    tmp = tempfile.mkdtemp(prefix='attendance_bench_')
+    database.SQLITE_PATH = os.path.join(tmp, 'bench.db')
+    db = database.DatabaseManager('sqlite')
+    db.initialize_database()
+    conn = db.get_connection()
+    cur  = conn.cursor()
+    start = date(2026, 1, 1)
+    cur.executemany(
+        "INSERT INTO attendance (student_id, full_name, class_name, date, time_in, status) "
+        "VALUES (%s, %s, %s, %s, %s, %s)",
+        [(f"BENCH{i:05d}", f"Bench Student {i}", 'BENCH', start + timedelta(days=d), '09:00:00',
+          ('present', 'late', 'absent')[(i + d) % 3])
+         for i in range(n_students) for d in range(n_days)])
+    conn.commit()
+    cur.close()
+    conn.close()
+    _section(f"Student reports  ({n_students} students × {n_days} days, SQLite)")
+
+    t0 = time.perf_counter()
+    for i in range(n_students):
+        pdf_reports.generate_student_report(db, os.path.join(tmp, 'one.pdf'), f"BENCH{i:05d}")
+    elapsed = time.perf_counter() - t0
+    print(f"{'One call per student':28s} {elapsed:6.2f} s   {n_students / elapsed:6.1f} reports/s")
+
+    for workers in sorted({1, os.cpu_count() or 1}):
+        res = generate_student_reports(db, os.path.join(tmp, f'batch_{workers}.zip'), workers=workers)
+        print(f"{f'Batch, {workers} worker(s)':28s} {res['elapsed']:6.2f} s   "
+              f"{res['students'] / res['elapsed']:6.1f} reports/s   {res['pages_per_sec']} pages/s")
+
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+BENCHMARKS = {
+    'db':        bench_db,
+    'alerts':    bench_alerts,
+    'smtp':      bench_smtp,
+    'templates': bench_templates,
+    'reports':   bench_reports,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark '{name}'. Choose from: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+    print("=" * 60)
+    print("Face Attendance System - Benchmarks")
+    print("=" * 60)
+    for name in names:
+        BENCHMARKS[name]()
+    print()
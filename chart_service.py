@@ -0,0 +1,294 @@
+"""
+Chart Service — Cached Attendance Charts for Tk Pages and PDFs
+==============================================================
+The student dashboard and the PDF reports draw the same trends every time
+they open. chart() renders each chart once as a PNG under chart_cache/ and
+hands back the path; both sides embed that file:
+
+  • student_trend    (student_id)        weekly attendance % bars, 75% line
+  • student_heatmap  (student_id)        weekday × week status grid
+  • class_trend      (class_name=None)   daily attendance % per class
+  • class_heatmap    ()                  class × day attendance % grid
+
+Files are keyed by chart kind and parameters, the end date, and the
+attendance watermark (DatabaseManager.get_attendance_watermark) of just that
+student or class over the chart's window — marking someone else present
+doesn't redraw your chart. Rendering uses matplotlib's Agg canvas (no
+pyplot, no display) on one background thread; chart_async() delivers the
+result back on the Tk thread.
+
+Usage:
+    path = chart(db, 'class_trend', end=report_date)          # PDF
+    chart_async(frame, db, 'student_trend', show, student_id=sid)   # Tk
+
+Dependencies: pip install matplotlib
+"""
+
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import report_queries
+
+CHART_CACHE_DIR  = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chart_cache')
+CHART_MAX_MB     = 50
+DPI              = 120
+TREND_WEEKS      = 12
+HEATMAP_WEEKS    = 26
+CLASS_TREND_DAYS = 30
+THRESHOLD        = 75
+
+GREEN, ORANGE, RED = '#2E7D32', '#E65100', '#C62828'
+BROWN, MUTED, NONE = '#6B2D0E', '#9E7B5A', '#EEEEEE'
+
+# matplotlib isn't thread-safe across figures sharing state — one renderer
+_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='charts')
+
+
+def _window(kind, end):
+    days = {'student_trend': TREND_WEEKS * 7, 'student_heatmap': HEATMAP_WEEKS * 7}.get(
+        kind, CLASS_TREND_DAYS)
+    return end - timedelta(days=days - 1), end
+
+
+def _figure(width, height):
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(width, height), dpi=DPI)
+    fig.patch.set_facecolor('white')
+    return fig
+
+
+def _style(ax, title):
+    ax.set_title(title, fontsize=10, color=BROWN, loc='left', fontweight='bold')
+    for side in ('top', 'right'):
+        ax.spines[side].set_visible(False)
+    ax.tick_params(labelsize=8, colors='#444444')
+
+
+# ══════════════════════════════════════════════════════════
+#  CHARTS
+# ══════════════════════════════════════════════════════════
+def _days(records, date_from, date_to):
+    """{date: status} of attendance rows (dicts) inside the window."""
+    return {r['date']: (r['status'] or '').lower()
+            for r in records if r['date'] and date_from <= r['date'] <= date_to}
+
+
+def _student_days(db, student_id, date_from, date_to):
+    return _days((r._asdict() for r in report_queries.student_history(db, student_id)),
+                 date_from, date_to)
+
+
+def _student_trend(db, date_from, date_to, student_id):
+    return _trend_figure(_student_days(db, student_id, date_from, date_to), date_from)
+
+
+def _trend_figure(days, date_from):
+    weeks = [date_from + timedelta(days=7 * i) for i in range(TREND_WEEKS)]
+    pcts  = []
+    for start in weeks:
+        marks = [days[d] for d in (start + timedelta(days=i) for i in range(7)) if d in days]
+        pcts.append(round(sum(s in ('present', 'late') for s in marks) / len(marks) * 100, 1)
+                    if marks else None)
+
+    fig = _figure(8, 2.6)
+    ax  = fig.add_subplot()
+    ax.bar(range(len(weeks)), [p or 0 for p in pcts], width=0.7,
+           color=[NONE if p is None else GREEN if p >= THRESHOLD else ORANGE if p >= 60 else RED
+                  for p in pcts])
+    ax.axhline(THRESHOLD, color=MUTED, linestyle='--', linewidth=1)
+    ax.set_xticks(range(len(weeks)))
+    ax.set_xticklabels([w.strftime('%d %b') for w in weeks], rotation=45, ha='right')
+    ax.set_ylim(0, 100)
+    ax.set_ylabel('%', fontsize=8)
+    _style(ax, f"Weekly attendance — last {TREND_WEEKS} weeks")
+    return fig
+
+
+def _student_heatmap(db, date_from, date_to, student_id):
+    from matplotlib.colors import ListedColormap
+    import numpy as np
+
+    days  = _student_days(db, student_id, date_from, date_to)
+    start = date_from - timedelta(days=date_from.weekday())       # Monday column
+    weeks = (date_to - start).days // 7 + 1
+    value = {'present': 3, 'late': 2}
+    grid  = np.zeros((7, weeks))
+    for d, status in days.items():
+        grid[d.weekday(), (d - start).days // 7] = value.get(status, 1)
+
+    fig = _figure(8, 2.2)
+    ax  = fig.add_subplot()
+    ax.imshow(grid, cmap=ListedColormap([NONE, RED, ORANGE, GREEN]), vmin=0, vmax=3,
+              aspect='auto', interpolation='nearest')
+    ax.set_yticks(range(7))
+    ax.set_yticklabels(['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'])
+    firsts = [(i, start + timedelta(days=7 * i)) for i in range(weeks)]
+    ticks  = [(i, d) for i, d in firsts if i == 0 or d.month != firsts[i - 1][1].month]
+    ax.set_xticks([i for i, _ in ticks])
+    ax.set_xticklabels([d.strftime('%b') for _, d in ticks])
+    _style(ax, "Attendance calendar — green present, orange late, red absent")
+    for side in ('left', 'bottom'):
+        ax.spines[side].set_visible(False)
+    return fig
+
+
+def _class_trend(db, date_from, date_to, class_name=None):
+    from matplotlib.dates import DateFormatter
+
+    rows    = report_queries.daily_class_totals(db, date_from, date_to, class_name)
+    classes = sorted({r.class_name for r in rows})
+
+    fig = _figure(8, 2.8)
+    ax  = fig.add_subplot()
+    for cls in classes:
+        points = [(r.date, r.pct) for r in rows if r.class_name == cls]
+        ax.plot([d for d, _ in points], [p for _, p in points], marker='o',
+                markersize=3, linewidth=1.5, label=cls)
+    ax.axhline(THRESHOLD, color=MUTED, linestyle='--', linewidth=1)
+    ax.set_xlim(date_from, date_to)
+    ax.set_ylim(0, 100)
+    ax.set_ylabel('%', fontsize=8)
+    ax.xaxis.set_major_formatter(DateFormatter('%d %b'))
+    fig.autofmt_xdate(rotation=45)
+    if 1 < len(classes) <= 10:
+        ax.legend(fontsize=7, ncol=min(len(classes), 5), frameon=False, loc='lower left')
+    _style(ax, f"Daily attendance — {class_name or 'all classes'}, last {CLASS_TREND_DAYS} days")
+    return fig
+
+
+def _class_heatmap(db, date_from, date_to):
+    import matplotlib
+    import numpy as np
+
+    rows    = report_queries.daily_class_totals(db, date_from, date_to)
+    classes = sorted({r.class_name for r in rows})
+    days    = [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+    grid    = np.full((max(len(classes), 1), len(days)), np.nan)
+    row_of  = {c: i for i, c in enumerate(classes)}
+    for r in rows:
+        grid[row_of[r.class_name], (r.date - date_from).days] = r.pct
+
+    fig = _figure(8, 1.2 + 0.3 * max(len(classes), 1))
+    ax  = fig.add_subplot()
+    img = ax.imshow(np.ma.masked_invalid(grid), vmin=0, vmax=100,
+                    cmap=matplotlib.colormaps['RdYlGn'].with_extremes(bad=NONE),
+                    aspect='auto', interpolation='nearest')
+    ax.set_yticks(range(len(classes)))
+    ax.set_yticklabels(classes)
+    step = max(len(days) // 10, 1)
+    ax.set_xticks(range(0, len(days), step))
+    ax.set_xticklabels([d.strftime('%d %b') for d in days[::step]], rotation=45, ha='right')
+    fig.colorbar(img, ax=ax, fraction=0.03, pad=0.01).ax.tick_params(labelsize=7)
+    _style(ax, f"Attendance % by class and day — last {CLASS_TREND_DAYS} days")
+    return fig
+
+
+_CHARTS = {
+    'student_trend':   _student_trend,
+    'student_heatmap': _student_heatmap,
+    'class_trend':     _class_trend,
+    'class_heatmap':   _class_heatmap,
+}
+
+
+# ══════════════════════════════════════════════════════════
+#  PUBLIC
+# ══════════════════════════════════════════════════════════
+def chart(db, kind, end=None, **params):
+    """
+    PNG path of chart `kind` for the window ending at `end` (default today),
+    rendered only if its data changed since last time.
+    """
+    from report_cache import _evict
+
+    end = end or date.today()
+    date_from, date_to = _window(kind, end)
+    key = repr((
+        db.backend.name, kind, str(end),
+        sorted((k, str(v)) for k, v in params.items() if v is not None),
+        db.get_attendance_watermark(date_from, date_to, params.get('student_id'),
+                                    params.get('class_name')),
+    ))
+    path = os.path.join(CHART_CACHE_DIR, hashlib.sha1(key.encode()).hexdigest() + '.png')
+    if os.path.exists(path):
+        try:
+            os.utime(path)
+            return path
+        except OSError:
+            pass
+
+    fig = _CHARTS[kind](db, date_from, date_to, **params)
+    fig.tight_layout()
+    os.makedirs(CHART_CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        fig.savefig(tmp, format='png', dpi=DPI)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    _evict(CHART_CACHE_DIR, '.png', CHART_MAX_MB)
+    return path
+
+
+def student_trend_file(records, path, end=None):
+    """
+    Render student_trend from attendance rows already in memory (dicts with
+    date and status) to `path`, bypassing the cache — for report_batch
+    workers, which have no database connection. Returns path.
+    """
+    date_from, date_to = _window('student_trend', end or date.today())
+    fig = _trend_figure(_days(records, date_from, date_to), date_from)
+    fig.tight_layout()
+    fig.savefig(path, format='png', dpi=DPI)
+    return path
+
+
+def chart_async(widget, db, kind, on_ready, **params):
+    """
+    Render chart() on the chart thread; on_ready(path) runs on the Tk thread
+    (path is None if it failed). Dropped if `widget` is destroyed first.
+    """
+    future = _pool.submit(chart, db, kind, **params)
+
+    def poll():
+        try:
+            if not widget.winfo_exists():
+                return
+        except Exception:
+            return
+        if not future.done():
+            widget.after(50, poll)
+            return
+        try:
+            path = future.result()
+        except Exception as e:
+            print(f"[CHART] {kind}: {e}")
+            path = None
+        on_ready(path)
+
+    widget.after(50, poll)
+
+
+def tk_image(path, width):
+    """PhotoImage of a cached chart scaled to `width` pixels (call on the Tk thread)."""
+    from PIL import Image, ImageTk
+    img = Image.open(path)
+    img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+    return ImageTk.PhotoImage(img)
+
+
+def pdf_image(path, width):
+    """ReportLab Image flowable of a cached chart, `width` points wide."""
+    from reportlab.platypus import Image
+    from reportlab.lib.utils import ImageReader
+    w, h = ImageReader(path).getSize()
+    return Image(path, width=width, height=width * h / w)
+
+
+def clear():
+    import shutil
+    shutil.rmtree(CHART_CACHE_DIR, ignore_errors=True)
@@ -0,0 +1,99 @@
+"""
+Cron Schedule — Minimal Cron Expressions
+========================================
+Five fields, as in crontab:  minute  hour  day-of-month  month  day-of-week
+
+  • *  every value          • 1,15    list
+  • 9-17  range            • */15    step (also 9-17/2)
+  • day-of-week: 0-6 (0 = Sunday, 7 also Sunday) or mon..sun
+  • month: 1-12 or jan..dec
+
+When both day-of-month and day-of-week are restricted a day matches if
+EITHER does (standard cron behaviour).
+
+Usage:
+    cron = CronSchedule('30 9 * * mon-sat')
+    cron.next_after(datetime.now())      # next 9:30, skipping Sundays
+"""
+
+from datetime import datetime, timedelta
+
+_NAMES = {
+    'dow':   {n: i for i, n in enumerate(('sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat'))},
+    'month': {n: i + 1 for i, n in enumerate(('jan', 'feb', 'mar', 'apr', 'may', 'jun',
+                                              'jul', 'aug', 'sep', 'oct', 'nov', 'dec'))},
+}
+_FIELDS = (('minute', 0, 59), ('hour', 0, 23), ('dom', 1, 31), ('month', 1, 12), ('dow', 0, 7))
+
+
+def _value(token, field):
+    return _NAMES.get(field, {}).get(token.lower()) if not token.isdigit() else int(token)
+
+
+def _parse_field(text, field, lo, hi):
+    values = set()
+    for part in text.split(','):
+        rng, _, step = part.partition('/')
+        step = int(step) if step else 1
+        if rng == '*':
+            start, end = lo, hi
+        elif '-' in rng:
+            start, end = (_value(t, field) for t in rng.split('-', 1))
+        else:
+            start = _value(rng, field)
+            end   = hi if step > 1 else start
+        if start is None or end is None or not (lo <= start <= end <= hi) or step < 1:
+            raise ValueError(f"Bad cron {field} field: {text!r}")
+        values.update(range(start, end + 1, step))
+    if field == 'dow' and 7 in values:
+        values.discard(7)
+        values.add(0)
+    return frozenset(values)
+
+
+class CronSchedule:
+    def __init__(self, expr):
+        parts = expr.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        (self.minutes, self.hours, self.days,
+         self.months, self.weekdays) = (_parse_field(p, *f) for p, f in zip(parts, _FIELDS))
+        self._any_dom = parts[2] == '*'
+        self._any_dow = parts[4] == '*'
+
+    def _day_matches(self, d):
+        dom = d.day in self.days
+        dow = (d.isoweekday() % 7) in self.weekdays
+        if self._any_dom:
+            return dow
+        if self._any_dow:
+            return dom
+        return dom or dow
+
+    def next_after(self, after):
+        """First matching minute strictly after `after` (a naive datetime)."""
+        t   = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        end = t + timedelta(days=366 * 5)
+        while t < end:
+            if t.month not in self.months or not self._day_matches(t):
+                t = datetime(t.year, t.month, t.day) + timedelta(days=1)
+                continue
+            if t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            if t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+                continue
+            return t
+        raise ValueError(f"Cron expression never fires: {self.expr!r}")
+
+    def last_due(self, since, now):
+        """Latest occurrence in (since, now], or None if nothing was due."""
+        due, t = None, self.next_after(since)
+        while t <= now:
+            due, t = t, self.next_after(t)
+        return due
+
+    def __repr__(self):
+        return f"CronSchedule({self.expr!r})"
@@ -0,0 +1,186 @@
+"""
+Attendance CSV Mirror
+=====================
+Every mark used to reopen attendance_csv/attendance_<date>.csv, check that
+it existed and append one row — on the camera thread. A repeat mark (the
+ON DUPLICATE KEY update that only sets time_out) appended the student a
+second time.
+
+record() now only queues the row; a background thread writes the queue when
+
+  • FLUSH_INTERVAL seconds have passed, or
+  • FLUSH_SIZE rows are waiting.
+
+The day's file stays open between flushes and is closed at midnight, when
+the first row of the next day arrives. Each file holds one row per student,
+like the attendance table — a student already in the file is skipped.
+rebuild() rewrites a day's file from the database (after edits, or if the
+folder was lost).
+
+One mirror per folder is shared by every DatabaseManager in the process.
+flush_all() runs at shutdown (main.on_close and atexit).
+"""
+
+import atexit
+import csv
+import os
+import threading
+from datetime import date
+
+FLUSH_INTERVAL = 2.0     # seconds
+FLUSH_SIZE     = 50      # rows
+HEADER         = ['Student ID', 'Full Name', 'Class', 'Date', 'Time In', 'Status']
+COLUMNS        = ['student_id', 'full_name', 'class_name', 'date', 'time_in', 'status']
+
+_mirrors = {}
+_mirrors_lock = threading.Lock()
+
+
+class CsvMirror:
+    def __init__(self, csv_dir, interval=FLUSH_INTERVAL, max_pending=FLUSH_SIZE):
+        self.csv_dir     = csv_dir
+        self.interval    = interval
+        self.max_pending = max_pending
+        self._pending    = []
+        self._lock       = threading.Lock()   # guards _pending
+        self._file_lock  = threading.Lock()   # guards the open file and _seen
+        self._wake       = threading.Event()
+        self._stopped    = False
+        self._thread     = None
+        self._day        = None               # 'YYYY-MM-DD' of the open file
+        self._file       = None
+        self._writer     = None
+        self._seen       = set()              # student IDs already in the open file
+
+    def path(self, day):
+        return os.path.join(self.csv_dir, f"attendance_{day}.csv")
+
+    def record(self, student_id, full_name, class_name, att_date, time_in, status):
+        with self._lock:
+            self._pending.append((student_id, full_name, class_name, att_date, time_in, status))
+            full = len(self._pending) >= self.max_pending
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(target=self._run, daemon=True,
+                                                name='csv-mirror-flusher')
+                self._thread.start()
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                with self._file_lock:
+                    if self._day is not None and self._day != str(date.today()):
+                        self._close_file()        # midnight: release yesterday's file
+            except Exception as e:
+                print(f"[CSV MIRROR] Flush failed, will retry: {e}")
+
+    def flush(self):
+        """Write everything queued so far. Returns the number of new rows."""
+        with self._file_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            written = 0
+            try:
+                for row in batch:
+                    day = str(row[3])
+                    if day != self._day:
+                        self._open_file(day)
+                    if row[0] in self._seen:
+                        continue                  # repeat mark — the DB row was updated, not added
+                    self._writer.writerow(row)
+                    self._seen.add(row[0])
+                    written += 1
+                self._file.flush()
+            except Exception:
+                # Retry the whole batch on a freshly opened file: rows that did
+                # get written are in _seen again and skipped
+                try:
+                    self._close_file()
+                except OSError:
+                    self._day, self._file, self._writer, self._seen = None, None, None, set()
+                with self._lock:
+                    self._pending[:0] = batch
+                raise
+            return written
+
+    def _open_file(self, day):
+        """Switch to `day`'s file, reading back who is already in it."""
+        self._close_file()
+        path = self.path(day)
+        os.makedirs(self.csv_dir, exist_ok=True)
+        seen = set()
+        if os.path.exists(path):
+            with open(path, newline='', encoding='utf-8') as f:
+                seen = {row[0] for row in csv.reader(f) if row and row != HEADER}
+        self._file   = open(path, 'a', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        if not seen and self._file.tell() == 0:
+            self._writer.writerow(HEADER)
+        self._day, self._seen = day, seen
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+        self._day, self._file, self._writer, self._seen = None, None, None, set()
+
+    def rebuild(self, db, day=None):
+        """
+        Rewrite one day's file (default today) from the attendance table,
+        in check-in order. Returns the row count.
+        """
+        from attendance_archive import _fmt_time
+
+        day  = day or date.today()
+        rows = [r for batch in db.iter_attendance_rows(COLUMNS, filter_date=day) for r in batch]
+        rows.sort(key=lambda r: (_fmt_time(r[4]) or '', r[0]))
+        path = self.path(day)
+        os.makedirs(self.csv_dir, exist_ok=True)
+        with self._file_lock:
+            if self._day == str(day):
+                self._close_file()                # reopened (and re-read) on the next write
+            with open(path + '.tmp', 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(HEADER)
+                writer.writerows((sid, name, cls, d, _fmt_time(t), st)
+                                 for sid, name, cls, d, t, st in rows)
+            os.replace(path + '.tmp', path)
+        return len(rows)
+
+    def close(self):
+        """Stop the flusher thread, write whatever is left and close the file."""
+        self._stopped = True
+        self._wake.set()
+        try:
+            self.flush()
+        finally:
+            with self._file_lock:
+                self._close_file()
+
+
+def mirror(csv_dir):
+    """The process-wide CsvMirror for a folder."""
+    key = os.path.abspath(csv_dir)
+    with _mirrors_lock:
+        if key not in _mirrors:
+            _mirrors[key] = CsvMirror(key)
+        return _mirrors[key]
+
+
+def flush_all():
+    """Flush and close every mirror — call at application shutdown."""
+    with _mirrors_lock:
+        mirrors = list(_mirrors.values())
+    for m in mirrors:
+        try:
+            m.close()
+        except Exception as e:
+            print(f"[CSV MIRROR] Final flush failed: {e}")
+
+
+atexit.register(flush_all)
@@ -1,15 +1,18 @@
 """
-Database Manager - MySQL + CSV Support
+Database Manager - MySQL / SQLite + CSV Support
 Face Attendance System
 """
-import mysql.connector
-import csv
+import calendar
 import os
-import pandas as pd
 from datetime import datetime, date, timedelta
 import hashlib
 import secrets
 
+from db_backends import make_backend
+from db_metrics import instrument
+from activity_logger import BufferedActivityLogger
+import csv_mirror
+
 
 DB_CONFIG = {
     'host': 'localhost',
@@ -18,36 +21,57 @@ DB_CONFIG = {
     'database': 'face_attendance_db'
 }
 
+# 'mysql' → MySQL server above, 'sqlite' → single local file (no server needed)
+DB_BACKEND  = 'mysql'
+SQLITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'face_attendance.db')
+
+
+# Notification outbox: rows stuck in 'sending' this long (app closed mid-send) are reclaimed
+OUTBOX_CLAIM_TIMEOUT = 600   # seconds
+
+# Academic year runs June → May; attendance is partitioned (and archived) per year
+ACADEMIC_YEAR_START_MONTH = 6
+
+
+def academic_year_of(d):
+    """Start year of the academic year containing date d (e.g. 2024 for 2025-03-10)."""
+    return d.year if d.month >= ACADEMIC_YEAR_START_MONTH else d.year - 1
+
+
+def academic_year_bounds(year):
+    """(first_day, first_day_of_next_year) for an academic year."""
+    return (date(year, ACADEMIC_YEAR_START_MONTH, 1),
+            date(year + 1, ACADEMIC_YEAR_START_MONTH, 1))
+
 
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
 
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, backend=None):
         self.config = DB_CONFIG
+        self.backend = make_backend(backend or DB_BACKEND,
+                                    mysql_config=self.config, sqlite_path=SQLITE_PATH)
         self.csv_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'attendance_csv')
         os.makedirs(self.csv_dir, exist_ok=True)
+        self.activity_log = BufferedActivityLogger(self.get_connection)
 
     def get_connection(self):
-        try:
-            conn = mysql.connector.connect(**self.config)
-            return conn
-        except mysql.connector.Error:
-            cfg = {k: v for k, v in self.config.items() if k != 'database'}
-            conn = mysql.connector.connect(**cfg)
-            cursor = conn.cursor()
-            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.config['database']}")
-            conn.commit()
-            conn.close()
-            return mysql.connector.connect(**self.config)
+        return instrument(self.backend.connect())
+
+    def close(self):
+        """Flush buffered writes — call before the application exits."""
+        self.activity_log.close()
+        self.csv_mirror.flush()
 
     def initialize_database(self):
         conn = self.get_connection()
         cursor = conn.cursor()
+        ddl = self.backend.ddl
 
         # Admin table
-        cursor.execute("""
+        cursor.execute(ddl("""
             CREATE TABLE IF NOT EXISTS admin (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 username VARCHAR(50) UNIQUE NOT NULL,
@@ -61,7 +85,7 @@ class DatabaseManager:
                 login_method VARCHAR(20) DEFAULT 'password',
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
-        """)
+        """))
 
         # Auto-add missing columns to existing admin table
         new_cols = [
@@ -74,13 +98,13 @@ class DatabaseManager:
         ]
         for col, definition in new_cols:
             try:
-                cursor.execute(f"ALTER TABLE admin ADD COLUMN {col} {definition}")
+                cursor.execute(ddl(f"ALTER TABLE admin ADD COLUMN {col} {definition}"))
                 conn.commit()
-            except mysql.connector.Error:
+            except self.backend.Error:
                 pass  # Column already exists
 
         # Students table
-        cursor.execute("""
+        cursor.execute(ddl("""
             CREATE TABLE IF NOT EXISTS students (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 student_id VARCHAR(20) UNIQUE NOT NULL,
@@ -94,10 +118,10 @@ class DatabaseManager:
                 status ENUM('active','inactive') DEFAULT 'active',
                 registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
-        """)
+        """))
 
         # Attendance table
-        cursor.execute("""
+        cursor.execute(ddl("""
             CREATE TABLE IF NOT EXISTS attendance (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 student_id VARCHAR(20) NOT NULL,
@@ -108,20 +132,51 @@ class DatabaseManager:
                 time_out TIME,
                 status ENUM('present','absent','late') DEFAULT 'present',
                 marked_by VARCHAR(50) DEFAULT 'face_recognition',
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                 UNIQUE KEY unique_attendance (student_id, date)
             )
-        """)
+        """))
+
+        # Last change per row — with COUNT/MAX(id) it is the data watermark
+        # report_queries caches on
+        if 'updated_at' not in self.backend.column_names(cursor, 'attendance'):
+            try:
+                cursor.execute(ddl("ALTER TABLE attendance ADD COLUMN updated_at TIMESTAMP "
+                                   "DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"))
+            except self.backend.Error:
+                # SQLite can't add a column with a non-constant default
+                cursor.execute("ALTER TABLE attendance ADD COLUMN updated_at TIMESTAMP")
+            conn.commit()
+
+        # Lookup indexes — exact student / date paths use the unique key,
+        # name search uses a FULLTEXT index with a prefix B-tree fallback
+        indexes = [
+            ("students",   "idx_students_name",    "full_name",        False),
+            ("students",   "ft_students_name",     "full_name",        True),
+            ("attendance", "idx_attendance_date",  "date",             False),
+            ("attendance", "idx_attendance_class", "class_name, date", False),
+            ("attendance", "idx_attendance_updated", "updated_at",     False),
+        ]
+        for table, name, columns, fulltext in indexes:
+            self.backend.add_index(cursor, table, name, columns, fulltext)
+            conn.commit()
+
+        # Yearly range partitions on attendance.date
+        if self.backend.supports_partitions:
+            try:
+                self.ensure_attendance_partitions(cursor)
+                conn.commit()
+            except self.backend.Error as e:
+                print(f"[DB] Attendance partitioning skipped: {e}")
 
         # Activity log table (recreate if missing performed_by)
-        cursor.execute("SHOW TABLES LIKE 'activity_log'")
-        if cursor.fetchone():
-            cursor.execute("SHOW COLUMNS FROM activity_log LIKE 'performed_by'")
-            if not cursor.fetchone():
+        if self.backend.table_exists(cursor, 'activity_log'):
+            if 'performed_by' not in self.backend.column_names(cursor, 'activity_log'):
                 cursor.execute("DROP TABLE activity_log")
                 conn.commit()
 
         # Check and fix activity_log table columns
-        cursor.execute("""
+        cursor.execute(ddl("""
             CREATE TABLE IF NOT EXISTS activity_log (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 action VARCHAR(100),
@@ -129,19 +184,18 @@ class DatabaseManager:
                 details TEXT,
                 timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
-        """)
+        """))
         # Auto-fix: add missing columns if table was created without them
-        cursor.execute("SHOW COLUMNS FROM activity_log")
-        existing_cols = [row[0] for row in cursor.fetchall()]
+        existing_cols = self.backend.column_names(cursor, 'activity_log')
         if 'performed_by' not in existing_cols:
-            cursor.execute("ALTER TABLE activity_log ADD COLUMN performed_by VARCHAR(50) AFTER action")
+            cursor.execute(ddl("ALTER TABLE activity_log ADD COLUMN performed_by VARCHAR(50) AFTER action"))
         if 'details' not in existing_cols:
-            cursor.execute("ALTER TABLE activity_log ADD COLUMN details TEXT AFTER performed_by")
+            cursor.execute(ddl("ALTER TABLE activity_log ADD COLUMN details TEXT AFTER performed_by"))
         if 'timestamp' not in existing_cols:
-            cursor.execute("ALTER TABLE activity_log ADD COLUMN timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP AFTER details")
+            cursor.execute(ddl("ALTER TABLE activity_log ADD COLUMN timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP AFTER details"))
 
         # OTP table for phone login
-        cursor.execute("""
+        cursor.execute(ddl("""
             CREATE TABLE IF NOT EXISTS otp_store (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 phone VARCHAR(20) NOT NULL,
@@ -150,10 +204,10 @@ class DatabaseManager:
                 used TINYINT DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
-        """)
+        """))
 
         # Student Results table
-        cursor.execute("""
+        cursor.execute(ddl("""
             CREATE TABLE IF NOT EXISTS student_results (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 student_id VARCHAR(20) NOT NULL,
@@ -166,10 +220,10 @@ class DatabaseManager:
                 result_date DATE,
                 added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
-        """)
+        """))
 
         # Student Fees table
-        cursor.execute("""
+        cursor.execute(ddl("""
             CREATE TABLE IF NOT EXISTS student_fees (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 student_id VARCHAR(20) NOT NULL,
@@ -185,7 +239,96 @@ class DatabaseManager:
                 remarks TEXT,
                 added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
-        """)
+        """))
+
+        # Outbound notification queue — one row per (student, date, channel)
+        cursor.execute(ddl("""
+            CREATE TABLE IF NOT EXISTS notification_outbox (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                student_id VARCHAR(20) NOT NULL,
+                date DATE NOT NULL,
+                channel VARCHAR(20) NOT NULL DEFAULT 'whatsapp',
+                recipient VARCHAR(100) NOT NULL,
+                body TEXT,
+                status ENUM('pending','sending','sent','failed') DEFAULT 'pending',
+                attempts INT DEFAULT 0,
+                last_error TEXT,
+                next_attempt_at DATETIME,
+                claimed_at DATETIME,
+                sent_at DATETIME,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE KEY unique_notification (student_id, date, channel)
+            )
+        """))
+        self.backend.add_index(cursor, "notification_outbox", "idx_outbox_status",
+                               "status, next_attempt_at")
+
+        # Per-student alert channels, in order of preference (e.g. 'whatsapp,email')
+        cursor.execute(ddl("""
+            CREATE TABLE IF NOT EXISTS contact_preferences (
+                student_id VARCHAR(20) PRIMARY KEY,
+                channels VARCHAR(100) NOT NULL DEFAULT 'whatsapp,sms,email',
+                parent_email VARCHAR(100),
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+        """))
+
+        # Last run of each scheduled task, so missed runs can be caught up after a restart
+        cursor.execute(ddl("""
+            CREATE TABLE IF NOT EXISTS scheduler_runs (
+                task_name VARCHAR(50) PRIMARY KEY,
+                last_run DATETIME NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+        """))
+
+        # Leader lease — only the instance holding it runs scheduled tasks
+        cursor.execute(ddl("""
+            CREATE TABLE IF NOT EXISTS scheduler_leases (
+                name VARCHAR(50) PRIMARY KEY,
+                holder VARCHAR(100) NOT NULL DEFAULT '',
+                expires_at BIGINT NOT NULL DEFAULT 0,
+                beats INT NOT NULL DEFAULT 0
+            )
+        """))
+
+        # One row per finished scheduler job (status and duration, Settings → Scheduler)
+        cursor.execute(ddl("""
+            CREATE TABLE IF NOT EXISTS scheduler_job_runs (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                task_name VARCHAR(50) NOT NULL,
+                triggered_by VARCHAR(20) NOT NULL DEFAULT 'schedule',
+                status VARCHAR(20) NOT NULL,
+                started_at DATETIME,
+                duration FLOAT,
+                message TEXT
+            )
+        """))
+        self.backend.add_index(cursor, "scheduler_job_runs", "idx_job_runs_task",
+                               "task_name, id")
+
+        # Nightly per-student attendance forecast (attendance_forecast.py), read by dashboards
+        cursor.execute(ddl("""
+            CREATE TABLE IF NOT EXISTS attendance_forecast (
+                student_id VARCHAR(20) PRIMARY KEY,
+                full_name VARCHAR(100),
+                class_name VARCHAR(50),
+                term_start DATE NOT NULL,
+                term_end DATE NOT NULL,
+                days_held INT NOT NULL DEFAULT 0,
+                days_attended INT NOT NULL DEFAULT 0,
+                pct FLOAT,
+                pct_14d FLOAT,
+                pct_30d FLOAT,
+                trend FLOAT,
+                projected_pct FLOAT,
+                prev_year_pct FLOAT,
+                risk VARCHAR(20) NOT NULL DEFAULT 'ok',
+                computed_at DATETIME NOT NULL
+            )
+        """))
+        self.backend.add_index(cursor, "attendance_forecast", "idx_forecast_risk",
+                               "risk, projected_pct")
 
         # Default admin
         cursor.execute("SELECT COUNT(*) FROM admin")
@@ -199,6 +342,73 @@ class DatabaseManager:
         cursor.close()
         conn.close()
 
+    # ── Attendance partitions ────────────────────────────────
+
+    def get_attendance_partitions(self, cursor):
+        """Returns {partition_name: upper_bound_str} — empty if not partitioned."""
+        cursor.execute(
+            "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA=DATABASE() AND TABLE_NAME='attendance' "
+            "AND PARTITION_NAME IS NOT NULL"
+        )
+        return {row[0]: row[1] for row in cursor.fetchall()}
+
+    def ensure_attendance_partitions(self, cursor):
+        """
+        Keep attendance RANGE-partitioned by academic year (ayYYYY), with
+        partitions up to next year and a catch-all pfuture. Date-bounded
+        queries then only touch the partitions they need.
+        """
+        upcoming = academic_year_of(date.today()) + 1
+        parts    = self.get_attendance_partitions(cursor)
+
+        if not parts:
+            cursor.execute("SELECT MIN(date) FROM attendance")
+            first = cursor.fetchone()[0]
+            start = academic_year_of(first) if first else upcoming - 1
+            # Partition key must be part of every unique key
+            cursor.execute("SHOW KEYS FROM attendance WHERE Key_name='PRIMARY'")
+            if len(cursor.fetchall()) == 1:
+                cursor.execute("ALTER TABLE attendance DROP PRIMARY KEY, ADD PRIMARY KEY (id, date)")
+            defs = ', '.join(
+                f"PARTITION ay{y} VALUES LESS THAN ('{academic_year_bounds(y)[1]}')"
+                for y in range(start, upcoming + 1)
+            )
+            cursor.execute(
+                f"ALTER TABLE attendance PARTITION BY RANGE COLUMNS(date) "
+                f"({defs}, PARTITION pfuture VALUES LESS THAN (MAXVALUE))"
+            )
+            return
+
+        years   = [int(name[2:]) for name in parts if name.startswith('ay')]
+        missing = range(max(years) + 1 if years else upcoming, upcoming + 1)
+        if missing:
+            defs = ', '.join(
+                f"PARTITION ay{y} VALUES LESS THAN ('{academic_year_bounds(y)[1]}')"
+                for y in missing
+            )
+            cursor.execute(
+                f"ALTER TABLE attendance REORGANIZE PARTITION pfuture INTO "
+                f"({defs}, PARTITION pfuture VALUES LESS THAN (MAXVALUE))"
+            )
+
+    def drop_attendance_year(self, year):
+        """Remove one academic year from the live table (after it was archived)."""
+        conn   = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            if (self.backend.supports_partitions and
+                    f"ay{year}" in self.get_attendance_partitions(cursor)):
+                cursor.execute(f"ALTER TABLE attendance DROP PARTITION ay{year}")
+            else:
+                start, end = academic_year_bounds(year)
+                cursor.execute("DELETE FROM attendance WHERE date >= %s AND date < %s",
+                               (start, end))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
     # ════════════════════════════════════════════════════════
     # ADMIN AUTH
     # ════════════════════════════════════════════════════════
@@ -296,7 +506,7 @@ class DatabaseManager:
             )
             conn.commit()
             return True, "Registration successful!"
-        except mysql.connector.IntegrityError as e:
+        except self.backend.IntegrityError as e:
             err = str(e).lower()
             if 'username' in err:
                 return False, "Username already exists!"
@@ -330,8 +540,8 @@ class DatabaseManager:
         conn = self.get_connection()
         cursor = conn.cursor(dictionary=True, buffered=True)
         cursor.execute(
-            "SELECT * FROM admin WHERE reset_token=%s AND reset_expiry > NOW()",
-            (token,)
+            "SELECT * FROM admin WHERE reset_token=%s AND reset_expiry > %s",
+            (token, datetime.now())
         )
         result = cursor.fetchone()
         cursor.close()
@@ -343,8 +553,8 @@ class DatabaseManager:
         cursor = conn.cursor()
         cursor.execute(
             """UPDATE admin SET password=%s, reset_token=NULL, reset_expiry=NULL
-               WHERE reset_token=%s AND reset_expiry > NOW()""",
-            (hash_password(new_password), token)
+               WHERE reset_token=%s AND reset_expiry > %s""",
+            (hash_password(new_password), token, datetime.now())
         )
         affected = cursor.rowcount
         conn.commit()
@@ -454,8 +664,8 @@ class DatabaseManager:
         conn = self.get_connection()
         cursor = conn.cursor(dictionary=True, buffered=True)
         cursor.execute(
-            "SELECT * FROM otp_store WHERE phone=%s AND otp=%s AND expiry > NOW() AND used=0",
-            (phone, otp)
+            "SELECT * FROM otp_store WHERE phone=%s AND otp=%s AND expiry > %s AND used=0",
+            (phone, otp, datetime.now())
         )
         result = cursor.fetchone()
         if result:
@@ -647,7 +857,8 @@ class DatabaseManager:
     def toggle_student_status(self, student_id):
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute("UPDATE students SET status = IF(status='active','inactive','active') WHERE student_id=%s", (student_id,))
+        cursor.execute("UPDATE students SET status = CASE WHEN status='active' THEN 'inactive' ELSE 'active' END "
+                       "WHERE student_id=%s", (student_id,))
         conn.commit()
         cursor.close()
         conn.close()
@@ -666,12 +877,15 @@ class DatabaseManager:
         try:
             cursor.execute(
                 """INSERT INTO attendance (student_id, full_name, class_name, date, time_in, status)
-                   VALUES (%s,%s,%s,%s,%s,%s)
-                   ON DUPLICATE KEY UPDATE time_out=%s""",
+                   VALUES (%s,%s,%s,%s,%s,%s) """ +
+                # Server clock, not this PC's — a lagging client clock would leave
+                # MAX(updated_at), and so the data watermark, unchanged
+                self.backend.upsert_clause(('student_id', 'date'),
+                                           ['time_out=%s', f'updated_at={self.backend.now_sql()}']),
                 (student_id, full_name, class_name, today, now, status, now)
             )
             conn.commit()
-            self._append_to_csv(student_id, full_name, class_name, today, now, status)
+            self.csv_mirror.record(student_id, full_name, class_name, today, now, status)
             return True
         except:
             return False
@@ -679,16 +893,22 @@ class DatabaseManager:
             cursor.close()
             conn.close()
 
-    def _append_to_csv(self, student_id, full_name, class_name, att_date, time_in, status):
-        csv_file = os.path.join(self.csv_dir, f"attendance_{att_date}.csv")
-        file_exists = os.path.exists(csv_file)
-        with open(csv_file, 'a', newline='') as f:
-            writer = csv.writer(f)
-            if not file_exists:
-                writer.writerow(['Student ID', 'Full Name', 'Class', 'Date', 'Time In', 'Status'])
-            writer.writerow([student_id, full_name, class_name, att_date, time_in, status])
+    @property
+    def csv_mirror(self):
+        """Buffered writer of the attendance_csv/ daily files (shared per folder)."""
+        return csv_mirror.mirror(self.csv_dir)
+
+    def rebuild_attendance_csv(self, day=None):
+        """Rewrite a day's CSV mirror file from the attendance table."""
+        return self.csv_mirror.rebuild(self, day)
 
-    def get_attendance(self, filter_date=None, filter_class=None, filter_student=None):
+    def get_attendance(self, filter_date=None, filter_class=None, filter_student=None,
+                       date_from=None, date_to=None, include_archive=False):
+        """
+        filter_student is an exact student ID — use search_attendance() for names.
+        date_from/date_to (inclusive) bound the scan to the matching partitions;
+        include_archive also returns rows of archived academic years.
+        """
         conn = self.get_connection()
         cursor = conn.cursor(dictionary=True, buffered=True)
         query = "SELECT * FROM attendance WHERE 1=1"
@@ -696,19 +916,294 @@ class DatabaseManager:
         if filter_date:
             query += " AND date=%s"
             params.append(filter_date)
+        if date_from:
+            query += " AND date>=%s"
+            params.append(date_from)
+        if date_to:
+            query += " AND date<=%s"
+            params.append(date_to)
         if filter_class:
             query += " AND class_name=%s"
             params.append(filter_class)
         if filter_student:
-            query += " AND (student_id=%s OR full_name LIKE %s)"
-            params.extend([filter_student, f'%{filter_student}%'])
+            query += " AND student_id=%s"
+            params.append(filter_student)
         query += " ORDER BY date DESC, time_in DESC"
         cursor.execute(query, params)
         result = cursor.fetchall()
         cursor.close()
         conn.close()
+        if include_archive:
+            from attendance_archive import read_archived_attendance
+            result += read_archived_attendance(
+                filter_date=filter_date, filter_class=filter_class,
+                filter_student=filter_student, date_from=date_from, date_to=date_to)
+        return result
+
+    def _attendance_filters(self, student_ids=None, filter_class=None, date_from=None, date_to=None):
+        where, params = "WHERE 1=1", []
+        if student_ids:
+            where += f" AND student_id IN ({', '.join(['%s'] * len(student_ids))})"
+            params += list(student_ids)
+        if filter_class:
+            where += " AND class_name=%s"
+            params.append(filter_class)
+        if date_from:
+            where += " AND date>=%s"
+            params.append(date_from)
+        if date_to:
+            where += " AND date<=%s"
+            params.append(date_to)
+        return where, params
+
+    def count_students_with_attendance(self, student_ids=None, filter_class=None,
+                                       date_from=None, date_to=None):
+        where, params = self._attendance_filters(student_ids, filter_class, date_from, date_to)
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COUNT(DISTINCT student_id) FROM attendance {where}", params)
+        count = cursor.fetchone()[0]
+        cursor.close()
+        conn.close()
+        return count
+
+    def iter_attendance_by_student(self, student_ids=None, filter_class=None,
+                                   date_from=None, date_to=None, chunk=2000):
+        """
+        Yield (student_id, rows) for every student with attendance, rows in
+        date order — one ordered query streamed in chunks, for bulk reports.
+        """
+        where, params = self._attendance_filters(student_ids, filter_class, date_from, date_to)
+        query = ("SELECT student_id, full_name, class_name, date, time_in, time_out, "
+                 f"status, marked_by FROM attendance {where} ORDER BY student_id, date")
+
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute(query, params)
+            current, rows = None, []
+            while True:
+                batch = cursor.fetchmany(chunk)
+                if not batch:
+                    break
+                for row in batch:
+                    if row['student_id'] != current:
+                        if rows:
+                            yield current, rows
+                        current, rows = row['student_id'], []
+                    rows.append(row)
+            if rows:
+                yield current, rows
+        finally:
+            cursor.close()
+            conn.close()
+
+    def iter_attendance_rows(self, columns, filter_date=None, filter_class=None,
+                             filter_student=None, date_from=None, date_to=None, chunk=5000):
+        """
+        Attendance as tuples of `columns`, in get_attendance() order, yielded
+        in lists of up to `chunk` rows. The cursor is unbuffered, so rows stay
+        on the server until fetched.
+        """
+        if filter_date:
+            date_from = date_to = filter_date
+        where, params = self._attendance_filters(
+            [filter_student] if filter_student else None, filter_class, date_from, date_to)
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SELECT {', '.join(columns)} FROM attendance {where} "
+                           "ORDER BY date DESC, time_in DESC", params)
+            while True:
+                batch = cursor.fetchmany(chunk)
+                if not batch:
+                    break
+                yield batch
+        finally:
+            cursor.close()
+            conn.close()
+
+    def iter_monthly_register(self, year, month, filter_class=None, chunk=500):
+        """
+        One row per student for the month, pivoted in SQL: d1..dN hold the
+        status letter (P/A/L, None = no record) and p/a/l the counts.
+        Streamed in chunks, ordered by student_id.
+        """
+        num_days = calendar.monthrange(year, month)[1]
+        days     = [date(year, month, d) for d in range(1, num_days + 1)]
+        letter   = "UPPER(SUBSTR(COALESCE(NULLIF(status, ''), 'absent'), 1, 1))"
+        columns  = ", ".join(f"MAX(CASE WHEN date=%s THEN {letter} END) AS d{d.day}" for d in days)
+        query = (f"SELECT student_id, MAX(full_name) AS full_name, MAX(class_name) AS class_name, "
+                 f"{columns}, "
+                 f"SUM(CASE WHEN {letter}='P' THEN 1 ELSE 0 END) AS p, "
+                 f"SUM(CASE WHEN {letter}='A' THEN 1 ELSE 0 END) AS a, "
+                 f"SUM(CASE WHEN {letter}='L' THEN 1 ELSE 0 END) AS l "
+                 f"FROM attendance WHERE date>=%s AND date<=%s")
+        params = days + [days[0], days[-1]]
+        if filter_class:
+            query += " AND class_name=%s"
+            params.append(filter_class)
+        query += " GROUP BY student_id ORDER BY student_id"
+
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute(query, params)
+            while True:
+                batch = cursor.fetchmany(chunk)
+                if not batch:
+                    break
+                yield from batch
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_attendance_watermark(self, date_from=None, date_to=None,
+                                 filter_student=None, filter_class=None):
+        """
+        (row count, max id, last change) of attendance, optionally within a
+        date range / for one student or class. Any insert, update or delete
+        moves it.
+        """
+        where, params = self._attendance_filters(
+            [filter_student] if filter_student else None, filter_class, date_from, date_to)
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COUNT(*), MAX(id), MAX(updated_at) FROM attendance {where}", params)
+        count, max_id, changed = cursor.fetchone()
+        cursor.close()
+        conn.close()
+        return count, max_id, str(changed) if changed is not None else None
+
+    def get_attendance_date_range(self):
+        """(first date, last date) in live attendance, (None, None) when empty."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT MIN(date), MAX(date) FROM attendance")
+        first, last = cursor.fetchone()
+        cursor.close()
+        conn.close()
+        # SQLite returns untyped aggregates
+        return tuple(date.fromisoformat(d) if isinstance(d, str) else d for d in (first, last))
+
+    def get_class_totals(self, filter_class=None, date_from=None, date_to=None):
+        """Per-class row counts by status; anything not present/late counts as absent."""
+        where, params = self._attendance_filters(None, filter_class, date_from, date_to)
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+        cursor.execute(
+            "SELECT COALESCE(class_name, 'Unknown') AS class_name, COUNT(*) AS total, "
+            "SUM(CASE WHEN status='present' THEN 1 ELSE 0 END) AS present, "
+            "SUM(CASE WHEN status='late' THEN 1 ELSE 0 END) AS late "
+            f"FROM attendance {where} "
+            "GROUP BY COALESCE(class_name, 'Unknown') ORDER BY class_name", params)
+        result = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        return result
+
+    def get_daily_class_totals(self, filter_class=None, date_from=None, date_to=None):
+        """get_class_totals() per day: one row per (date, class), oldest first."""
+        where, params = self._attendance_filters(None, filter_class, date_from, date_to)
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+        cursor.execute(
+            "SELECT date, COALESCE(class_name, 'Unknown') AS class_name, COUNT(*) AS total, "
+            "SUM(CASE WHEN status='present' THEN 1 ELSE 0 END) AS present, "
+            "SUM(CASE WHEN status='late' THEN 1 ELSE 0 END) AS late "
+            f"FROM attendance {where} "
+            "GROUP BY date, COALESCE(class_name, 'Unknown') ORDER BY date, class_name", params)
+        result = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        return result
+
+    def get_student_totals(self, filter_class=None, date_from=None, date_to=None, below_pct=None):
+        """
+        Per-student row counts by status, lowest attendance first. below_pct
+        keeps only students whose (present + late) share is under it.
+        """
+        where, params = self._attendance_filters(None, filter_class, date_from, date_to)
+        attended = "SUM(CASE WHEN status IN ('present','late') THEN 1 ELSE 0 END)"
+        query = (
+            "SELECT student_id, MAX(full_name) AS full_name, MAX(class_name) AS class_name, "
+            "COUNT(*) AS total, "
+            "SUM(CASE WHEN status='present' THEN 1 ELSE 0 END) AS present, "
+            "SUM(CASE WHEN status='late' THEN 1 ELSE 0 END) AS late "
+            f"FROM attendance {where} AND student_id<>'' GROUP BY student_id")
+        if below_pct is not None:
+            query += f" HAVING {attended} * 100 < %s * COUNT(*)"
+            params.append(below_pct)
+        query += f" ORDER BY {attended} * 1.0 / COUNT(*), student_id"
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+        cursor.execute(query, params)
+        result = cursor.fetchall()
+        cursor.close()
+        conn.close()
         return result
 
+    def _name_search_clause(self, name_query):
+        """
+        WHERE fragment matching students by ID prefix or name.
+        Words of 3+ chars go through the FULLTEXT index (prefix match on
+        each word); shorter input, or a backend without FULLTEXT, falls back
+        to an index-backed prefix LIKE.
+        """
+        prefix = name_query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        words  = [w for w in ''.join(
+            c if c.isalnum() else ' ' for c in name_query).split() if w]
+        like   = "LIKE %s" + self.backend.like_escape()
+        if self.backend.supports_fulltext and words and all(len(w) >= 3 for w in words):
+            return (f"(student_id {like} OR "
+                    "MATCH(full_name) AGAINST (%s IN BOOLEAN MODE))",
+                    [prefix, ' '.join(f'+{w}*' for w in words)])
+        return (f"(student_id {like} OR full_name {like})", [prefix, prefix])
+
+    def search_students(self, name_query, page=1, per_page=50):
+        """Paginated student search by ID prefix or name words."""
+        clause, params = self._name_search_clause(name_query.strip())
+        page   = max(1, int(page))
+        conn   = self.get_connection()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+        cursor.execute(f"SELECT COUNT(*) AS total FROM students WHERE {clause}", params)
+        total = cursor.fetchone()['total']
+        cursor.execute(
+            "SELECT student_id, full_name, class_name, section, email, phone, status, registered_at "
+            f"FROM students WHERE {clause} ORDER BY full_name LIMIT %s OFFSET %s",
+            params + [per_page, (page - 1) * per_page]
+        )
+        rows = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        return {'results': rows, 'total': total, 'page': page, 'per_page': per_page}
+
+    def search_attendance(self, name_query, filter_date=None, filter_class=None,
+                          page=1, per_page=200):
+        """Paginated attendance records for students matching a name search."""
+        clause, params = self._name_search_clause(name_query.strip())
+        page   = max(1, int(page))
+        where  = f"student_id IN (SELECT student_id FROM students WHERE {clause})"
+        if filter_date:
+            where += " AND date=%s"
+            params.append(filter_date)
+        if filter_class:
+            where += " AND class_name=%s"
+            params.append(filter_class)
+        conn   = self.get_connection()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+        cursor.execute(f"SELECT COUNT(*) AS total FROM attendance WHERE {where}", params)
+        total = cursor.fetchone()['total']
+        cursor.execute(
+            f"SELECT * FROM attendance WHERE {where} "
+            "ORDER BY date DESC, time_in DESC LIMIT %s OFFSET %s",
+            params + [per_page, (page - 1) * per_page]
+        )
+        rows = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        return {'results': rows, 'total': total, 'page': page, 'per_page': per_page}
+
     def get_today_attendance(self):
         return self.get_attendance(filter_date=date.today())
 
@@ -731,48 +1226,387 @@ class DatabaseManager:
             raise
 
     def export_attendance_csv(self, filepath, filter_date=None, filter_class=None):
-        records = self.get_attendance(filter_date=filter_date, filter_class=filter_class)
-        if not records:
-            return False
-        pd.DataFrame(records).to_csv(filepath, index=False)
-        return True
+        """Streamed in chunks (attendance_export); a .csv.gz path is gzipped."""
+        return self._export_attendance(filepath, filter_date, filter_class)
 
     def export_attendance_excel(self, filepath, filter_date=None, filter_class=None):
-        records = self.get_attendance(filter_date=filter_date, filter_class=filter_class)
-        if not records:
-            return False
-        pd.DataFrame(records).to_excel(filepath, index=False)
-        return True
+        """Streamed into a write-only openpyxl workbook (attendance_export)."""
+        return self._export_attendance(filepath, filter_date, filter_class)
+
+    def _export_attendance(self, filepath, filter_date, filter_class):
+        from attendance_export import export_attendance
+        if export_attendance(self, filepath, filter_date=filter_date, filter_class=filter_class):
+            return True
+        os.remove(filepath)
+        return False
 
     # ════════════════════════════════════════════════════════
     # ACTIVITY LOG
     # ════════════════════════════════════════════════════════
 
     def log_activity(self, action, performed_by, details=''):
+        """Buffered — written in batches by activity_logger (see flush())."""
+        self.activity_log.log(action, performed_by, details)
+
+    def get_activity_log(self, limit=100):
+        try:
+            self.activity_log.flush()
+        except Exception as e:
+            print(f"[ACTIVITY LOG] Flush failed, showing stored entries only: {e}")
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+        cursor.execute("SELECT * FROM activity_log ORDER BY timestamp DESC, id DESC LIMIT %s", (limit,))
+        result = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        return result
+
+    def get_classes(self):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT class_name FROM students WHERE class_name IS NOT NULL ORDER BY class_name")
+        result = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        conn.close()
+        return result
+
+    # ════════════════════════════════════════════════════════
+    # NOTIFICATION OUTBOX
+    # ════════════════════════════════════════════════════════
+
+    def enqueue_notifications(self, items):
+        """
+        items: dicts with student_id, date, channel, recipient, body.
+        A (student_id, date, channel) already queued is left untouched, so a
+        rerun never double-sends. Returns the number of new rows.
+        """
+        now = datetime.now()
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        added = 0
+        try:
+            for item in items:
+                cursor.execute(
+                    """INSERT INTO notification_outbox
+                       (student_id, date, channel, recipient, body, next_attempt_at)
+                       VALUES (%s,%s,%s,%s,%s,%s) """ +
+                    self.backend.upsert_clause(('student_id', 'date', 'channel')),
+                    (item['student_id'], item['date'], item.get('channel', 'whatsapp'),
+                     item['recipient'], item.get('body', ''), now)
+                )
+                added += max(cursor.rowcount, 0)
+            conn.commit()
+            return added
+        finally:
+            cursor.close()
+            conn.close()
+
+    def claim_notifications(self, limit=50, channel=None):
+        """
+        Atomically take up to `limit` due rows and mark them 'sending'.
+        Concurrent workers skip each other's locked rows (SKIP LOCKED).
+        """
+        now   = datetime.now()
+        stale = now - timedelta(seconds=OUTBOX_CLAIM_TIMEOUT)
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+        try:
+            self.backend.begin_write(cursor)
+            query = """SELECT * FROM notification_outbox
+                       WHERE ((status='pending' AND next_attempt_at <= %s)
+                              OR (status='sending' AND claimed_at < %s))"""
+            params = [now, stale]
+            if channel:
+                query += " AND channel=%s"
+                params.append(channel)
+            query += " ORDER BY id LIMIT %s" + self.backend.skip_locked()
+            params.append(limit)
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            if rows:
+                ids = [r['id'] for r in rows]
+                cursor.execute(
+                    f"""UPDATE notification_outbox
+                        SET status='sending', attempts=attempts+1, claimed_at=%s
+                        WHERE id IN ({','.join(['%s'] * len(ids))})""",
+                    [now] + ids
+                )
+                for r in rows:
+                    r['attempts'] = (r['attempts'] or 0) + 1
+            conn.commit()
+            return rows
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    def finish_notification(self, outbox_id, status, error=None, retry_at=None):
+        """status: 'sent', 'failed', or 'pending' (retry at retry_at)."""
+        now = datetime.now()
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """UPDATE notification_outbox
+                   SET status=%s, last_error=%s, next_attempt_at=%s, claimed_at=NULL,
+                       sent_at=CASE WHEN %s='sent' THEN %s ELSE sent_at END
+                   WHERE id=%s""",
+                (status, error, retry_at, status, now, outbox_id)
+            )
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def delete_notification(self, outbox_id):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM notification_outbox WHERE id=%s", (outbox_id,))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_notified_students(self, for_date):
+        """student_ids with an alert already queued (any channel) for a day."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT student_id FROM notification_outbox WHERE date=%s",
+                       (for_date,))
+        result = {row[0] for row in cursor.fetchall()}
+        cursor.close()
+        conn.close()
+        return result
+
+    def get_contact_preferences(self, student_ids=None):
+        """{student_id: {'channels': [...], 'parent_email': ...}} for students with a row."""
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+        if student_ids is None:
+            cursor.execute("SELECT * FROM contact_preferences")
+        elif not student_ids:
+            cursor.close()
+            conn.close()
+            return {}
+        else:
+            ids = list(student_ids)
+            cursor.execute(
+                f"SELECT * FROM contact_preferences WHERE student_id IN ({','.join(['%s'] * len(ids))})",
+                ids
+            )
+        result = {
+            r['student_id']: {
+                'channels':     [c.strip() for c in (r['channels'] or '').split(',') if c.strip()],
+                'parent_email': r['parent_email'],
+            }
+            for r in cursor.fetchall()
+        }
+        cursor.close()
+        conn.close()
+        return result
+
+    def set_contact_preferences(self, student_id, channels, parent_email=None):
+        channels = ','.join(c.strip().lower() for c in channels if c.strip())
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute(
-            "INSERT INTO activity_log (action, performed_by, details) VALUES (%s,%s,%s)",
-            (action, performed_by, details)
+            """INSERT INTO contact_preferences (student_id, channels, parent_email, updated_at)
+               VALUES (%s,%s,%s,%s) """ +
+            self.backend.upsert_clause(('student_id',),
+                                       ['channels=%s', 'parent_email=%s', 'updated_at=%s']),
+            (student_id, channels, parent_email or None, datetime.now(),
+             channels, parent_email or None, datetime.now())
         )
         conn.commit()
         cursor.close()
         conn.close()
 
-    def get_activity_log(self, limit=100):
+    def get_absence_stats(self, day, window_days=30):
+        """
+        Per-student absence figures for the `window_days` before `day`, from
+        one grouped query: absent_days, marked_days, streak (consecutive
+        absences up to yesterday), streak_start and last_alert (latest
+        non-failed outbox date). Students with no rows in the window are absent.
+        """
+        start       = day - timedelta(days=window_days)
+        no_presence = start - timedelta(days=1)
         conn = self.get_connection()
         cursor = conn.cursor(dictionary=True, buffered=True)
-        cursor.execute("SELECT * FROM activity_log ORDER BY timestamp DESC LIMIT %s", (limit,))
-        result = cursor.fetchall()
+        cursor.execute(
+            """SELECT a.student_id,
+                      SUM(CASE WHEN a.status='absent' THEN 1 ELSE 0 END) AS absent_days,
+                      COUNT(*) AS marked_days,
+                      SUM(CASE WHEN a.status='absent' AND a.date > COALESCE(p.last_present, %s)
+                               THEN 1 ELSE 0 END) AS streak,
+                      MIN(CASE WHEN a.status='absent' AND a.date > COALESCE(p.last_present, %s)
+                               THEN a.date END) AS streak_start,
+                      MAX(n.last_alert) AS last_alert
+               FROM attendance a
+               LEFT JOIN (SELECT student_id, MAX(date) AS last_present FROM attendance
+                          WHERE status<>'absent' AND date >= %s AND date < %s
+                          GROUP BY student_id) p ON p.student_id = a.student_id
+               LEFT JOIN (SELECT student_id, MAX(date) AS last_alert FROM notification_outbox
+                          WHERE status<>'failed' AND date >= %s AND date < %s
+                          GROUP BY student_id) n ON n.student_id = a.student_id
+               WHERE a.date >= %s AND a.date < %s
+               GROUP BY a.student_id""",
+            (no_presence, no_presence, start, day, start, day, start, day)
+        )
+        result = {}
+        for r in cursor.fetchall():
+            for key in ('streak_start', 'last_alert'):
+                if isinstance(r[key], str):   # SQLite returns untyped aggregates
+                    r[key] = date.fromisoformat(r[key][:10])
+            for key in ('absent_days', 'marked_days', 'streak'):
+                r[key] = int(r[key] or 0)
+            result[r['student_id']] = r
         cursor.close()
         conn.close()
         return result
 
-    def get_classes(self):
+    def get_outbox_counts(self, for_date=None):
+        """{status: count} for one day's notifications (all days if None)."""
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT DISTINCT class_name FROM students WHERE class_name IS NOT NULL ORDER BY class_name")
-        result = [row[0] for row in cursor.fetchall()]
+        query = "SELECT status, COUNT(*) FROM notification_outbox"
+        params = ()
+        if for_date:
+            query += " WHERE date=%s"
+            params = (for_date,)
+        cursor.execute(query + " GROUP BY status", params)
+        result = {row[0]: row[1] for row in cursor.fetchall()}
+        cursor.close()
+        conn.close()
+        return result
+
+    # ════════════════════════════════════════════════════════
+    # SCHEDULER RUNS
+    # ════════════════════════════════════════════════════════
+
+    def get_scheduler_runs(self):
+        """{task_name: datetime of its last scheduled run}."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT task_name, last_run FROM scheduler_runs")
+        result = {}
+        for name, last_run in cursor.fetchall():
+            if isinstance(last_run, str):      # SQLite
+                last_run = datetime.fromisoformat(last_run)
+            result[name] = last_run
+        cursor.close()
+        conn.close()
+        return result
+
+    def claim_scheduler_run(self, task_name, run_at):
+        """
+        Record `run_at` as the last run of `task_name`. False if that run (or
+        a later one) was already recorded — e.g. by another PC — so it must
+        not run again.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "INSERT INTO scheduler_runs (task_name, last_run) VALUES (%s, %s) "
+                + self.backend.upsert_clause(('task_name',)),
+                (task_name, run_at)
+            )
+            claimed = cursor.rowcount == 1
+            if not claimed:
+                cursor.execute(
+                    "UPDATE scheduler_runs SET last_run=%s WHERE task_name=%s AND last_run < %s",
+                    (run_at, task_name, run_at)
+                )
+                claimed = cursor.rowcount == 1
+            conn.commit()
+            return claimed
+        finally:
+            cursor.close()
+            conn.close()
+
+    def acquire_lease(self, name, holder, seconds):
+        """
+        Take or renew lease `name` for `seconds`; True if `holder` owns it now.
+        Expiry is checked against the database clock, so PCs whose clocks
+        disagree still agree on who holds it.
+        """
+        now = self.backend.epoch_sql()
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "INSERT INTO scheduler_leases (name) VALUES (%s) "
+                + self.backend.upsert_clause(('name',)),
+                (name,)
+            )
+            # beats changes on every renewal so MySQL reports the row as affected
+            cursor.execute(
+                f"""UPDATE scheduler_leases
+                    SET holder=%s, expires_at={now} + %s, beats=beats+1
+                    WHERE name=%s AND (holder=%s OR expires_at < {now})""",
+                (holder, int(seconds), name, holder)
+            )
+            won = cursor.rowcount == 1
+            conn.commit()
+            return won
+        finally:
+            cursor.close()
+            conn.close()
+
+    def release_lease(self, name, holder):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE scheduler_leases SET holder='', expires_at=0 WHERE name=%s AND holder=%s",
+            (name, holder)
+        )
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+    def get_lease_holder(self, name):
+        """Current holder of lease `name`, or None if it is free or expired."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT holder FROM scheduler_leases WHERE name=%s AND expires_at >= {self.backend.epoch_sql()}",
+            (name,)
+        )
+        row = cursor.fetchone()
+        cursor.close()
+        conn.close()
+        return row[0] if row and row[0] else None
+
+    def record_job_run(self, task_name, triggered_by, status, started_at, duration, message=''):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            """INSERT INTO scheduler_job_runs
+               (task_name, triggered_by, status, started_at, duration, message)
+               VALUES (%s, %s, %s, %s, %s, %s)""",
+            (task_name, triggered_by, status, started_at, duration, message or None)
+        )
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+    def get_latest_job_runs(self):
+        """{task_name: latest scheduler_job_runs row}."""
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+        cursor.execute(
+            """SELECT r.* FROM scheduler_job_runs r
+               JOIN (SELECT task_name, MAX(id) AS id FROM scheduler_job_runs
+                     GROUP BY task_name) latest ON latest.id = r.id"""
+        )
+        result = {}
+        for row in cursor.fetchall():
+            if isinstance(row['started_at'], str):      # SQLite
+                row['started_at'] = datetime.fromisoformat(row['started_at'])
+            result[row['task_name']] = row
         cursor.close()
         conn.close()
         return result
@@ -829,7 +1663,7 @@ class DatabaseManager:
             )
             conn.commit()
             return True, "Teacher registered successfully!"
-        except mysql.connector.IntegrityError as e:
+        except self.backend.IntegrityError as e:
             err = str(e).lower()
             if 'username' in err:
                 return False, "Username already exists!"
@@ -851,6 +1685,65 @@ class DatabaseManager:
         conn.close()
         return result
 
+    # ── Forecast (attendance_forecast.py) ──────────────────
+
+    def save_attendance_forecast(self, cols, rows):
+        """Replace the forecast table with `rows` (tuples of `cols`) in one transaction."""
+        per_ins = 999 // len(cols)          # SQLite's variable limit
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM attendance_forecast")
+            for i in range(0, len(rows), per_ins):
+                chunk = rows[i:i + per_ins]
+                cursor.execute(
+                    f"INSERT INTO attendance_forecast ({', '.join(cols)}) VALUES " +
+                    ", ".join(["(" + ",".join(["%s"] * len(cols)) + ")"] * len(chunk)),
+                    [v for row in chunk for v in row])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_attendance_forecast(self, risks=None, class_filter=None):
+        """Forecast rows, lowest projection first; risks limits to those levels."""
+        query, params = "SELECT * FROM attendance_forecast WHERE 1=1", []
+        if risks:
+            query += f" AND risk IN ({', '.join(['%s'] * len(risks))})"
+            params += list(risks)
+        if class_filter:
+            query += " AND class_name=%s"
+            params.append(class_filter)
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+        cursor.execute(query + " ORDER BY projected_pct, student_id", params)
+        result = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        return result
+
+    def get_forecast_computed_at(self):
+        """When the forecast was last computed (None if never)."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT MAX(computed_at) FROM attendance_forecast")
+        result = cursor.fetchone()[0]
+        cursor.close()
+        conn.close()
+        return result
+
+    def get_student_forecast(self, student_id):
+        conn = self.get_connection()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+        cursor.execute("SELECT * FROM attendance_forecast WHERE student_id=%s", (student_id,))
+        result = cursor.fetchone()
+        cursor.close()
+        conn.close()
+        return result
+
     def get_student_attendance_summary(self, student_id):
         """Get attendance summary stats for a student."""
         records = self.get_attendance(filter_student=student_id)
@@ -869,12 +1762,10 @@ class DatabaseManager:
     def get_weekly_attendance(self, student_id):
         """Get last 7 days attendance for a student."""
         from datetime import date, timedelta
-        records = self.get_attendance(filter_student=student_id)
-        today   = date.today()
-        week_ago = today - timedelta(days=6)
-        weekly  = [r for r in records
-                   if r.get('date') and r['date'] >= week_ago]
+        week_ago = date.today() - timedelta(days=6)
+        weekly   = self.get_attendance(filter_student=student_id, date_from=week_ago)
         return sorted(weekly, key=lambda x: x.get('date', date.min))
+
     def get_monthly_attendance(self, student_id, year=None, month=None):
         """Get attendance for a specific month for a student."""
         import calendar
@@ -882,10 +1773,10 @@ class DatabaseManager:
         today = date.today()
         year  = year  or today.year
         month = month or today.month
-        records = self.get_attendance(filter_student=student_id)
-        monthly = [r for r in records
-                   if r.get('date') and
-                   r['date'].year == year and r['date'].month == month]
+        monthly = self.get_attendance(
+            filter_student=student_id,
+            date_from=date(year, month, 1),
+            date_to=date(year, month, calendar.monthrange(year, month)[1]))
         return sorted(monthly, key=lambda x: x.get('date', date.min))
 
     # ════════════════════════════════════════════════════════
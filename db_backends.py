@@ -0,0 +1,281 @@
+"""
+Database Backends — MySQL Server or Embedded SQLite
+===================================================
+DatabaseManager talks to one of these instead of mysql.connector directly.
+Both hand out connections whose cursors accept the same SQL (``%s``
+placeholders, ``cursor(dictionary=True, buffered=True)``) so the manager's
+queries run unchanged; the few dialect differences (DDL, upserts, indexes,
+introspection) go through the backend helpers below.
+
+  • MySQLBackend  — the original server setup (DB_CONFIG in database.py)
+  • SQLiteBackend — single file, WAL mode, for one-PC campuses and test rigs
+
+Select with DB_BACKEND in database.py.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+
+class MySQLBackend:
+    name                = 'mysql'
+    supports_partitions = True
+    supports_fulltext   = True
+
+    def __init__(self, config):
+        import mysql.connector
+        self._mysql         = mysql.connector
+        self.config         = config
+        self.Error          = mysql.connector.Error
+        self.IntegrityError = mysql.connector.IntegrityError
+
+    def connect(self):
+        try:
+            return self._mysql.connect(**self.config)
+        except self._mysql.Error:
+            cfg = {k: v for k, v in self.config.items() if k != 'database'}
+            conn = self._mysql.connect(**cfg)
+            cursor = conn.cursor()
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.config['database']}")
+            conn.commit()
+            conn.close()
+            return self._mysql.connect(**self.config)
+
+    def ddl(self, sql):
+        return sql
+
+    def upsert_clause(self, conflict_cols, assignments=()):
+        """Tail of an INSERT that updates `assignments` (e.g. 'time_out=%s') on conflict."""
+        if not assignments:
+            return f"ON DUPLICATE KEY UPDATE {conflict_cols[0]}={conflict_cols[0]}"
+        return "ON DUPLICATE KEY UPDATE " + ", ".join(assignments)
+
+    def table_exists(self, cursor, table):
+        cursor.execute("SHOW TABLES LIKE %s", (table,))
+        return cursor.fetchone() is not None
+
+    def column_names(self, cursor, table):
+        cursor.execute(f"SHOW COLUMNS FROM {table}")
+        return [row[0] for row in cursor.fetchall()]
+
+    def add_index(self, cursor, table, name, columns, fulltext=False):
+        kind = "FULLTEXT INDEX" if fulltext else "INDEX"
+        try:
+            cursor.execute(f"ALTER TABLE {table} ADD {kind} {name} ({columns})")
+        except self.Error:
+            pass  # Index already exists
+
+    def begin_write(self, cursor):
+        pass  # autocommit is off — SELECT ... FOR UPDATE opens the transaction
+
+    def skip_locked(self):
+        """Row-lock suffix for queue claims (MySQL 8.0+)."""
+        return " FOR UPDATE SKIP LOCKED"
+
+    def epoch_sql(self):
+        """SQL for the database server's clock in Unix seconds."""
+        return "UNIX_TIMESTAMP()"
+
+    def now_sql(self):
+        """SQL for the database server's current time, as column defaults use it."""
+        return "CURRENT_TIMESTAMP"
+
+    def like_escape(self):
+        """ESCAPE suffix making backslash the LIKE escape character."""
+        return " ESCAPE '\\\\'"   # the string literal itself is backslash-escaped
+
+
+# ════════════════════════════════════════════════════════
+#  SQLITE
+# ════════════════════════════════════════════════════════
+
+def _parse_time(raw):
+    h, m, s = (int(float(x)) for x in raw.decode().split(':'))
+    return timedelta(hours=h, minutes=m, seconds=s)
+
+
+def _fmt_timedelta(td):
+    secs = int(td.total_seconds())
+    return f"{secs // 3600:02d}:{secs % 3600 // 60:02d}:{secs % 60:02d}"
+
+
+# Return the same Python types mysql.connector does (date / datetime / timedelta)
+sqlite3.register_adapter(date,      lambda d: d.isoformat())
+sqlite3.register_adapter(datetime,  lambda d: d.isoformat(' '))
+sqlite3.register_adapter(timedelta, _fmt_timedelta)
+sqlite3.register_converter('DATE',      lambda b: date.fromisoformat(b.decode()[:10]))
+sqlite3.register_converter('DATETIME',  lambda b: datetime.fromisoformat(b.decode()))
+sqlite3.register_converter('TIMESTAMP', lambda b: datetime.fromisoformat(b.decode()))
+sqlite3.register_converter('TIME',      _parse_time)
+
+
+class _SQLiteCursor:
+    """mysql.connector-style cursor over sqlite3: %s params, optional dict rows."""
+
+    def __init__(self, raw_conn, dictionary=False):
+        self._cur  = raw_conn.cursor()
+        self._dict = dictionary
+
+    @staticmethod
+    def _sql(sql):
+        return sql.replace('%s', '?')
+
+    def execute(self, sql, params=()):
+        self._cur.execute(self._sql(sql), tuple(params or ()))
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._cur.executemany(self._sql(sql), [tuple(p) for p in seq_of_params])
+        return self
+
+    def _row(self, row):
+        if row is None or not self._dict:
+            return row
+        return dict(zip((d[0] for d in self._cur.description), row))
+
+    def fetchone(self):
+        return self._row(self._cur.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(r) for r in self._cur.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(r) for r in self._cur.fetchall()]
+
+    def __iter__(self):
+        for row in self._cur:
+            yield self._row(row)
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    def close(self):
+        self._cur.close()
+
+
+class _SQLiteConnection:
+    """
+    Per-thread shared sqlite3 connection. close() only rolls back anything
+    left uncommitted — the handle (and its pragmas) is reused by the next call.
+    """
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def cursor(self, dictionary=False, buffered=False, **_):
+        return _SQLiteCursor(self.raw, dictionary)
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        if self.raw.in_transaction:
+            self.raw.rollback()
+
+
+class SQLiteBackend:
+    name                = 'sqlite'
+    supports_partitions = False
+    supports_fulltext   = False
+    Error               = sqlite3.Error
+    IntegrityError      = sqlite3.IntegrityError
+
+    PRAGMAS = [
+        "PRAGMA journal_mode=WAL",       # readers never block the camera thread's writes
+        "PRAGMA synchronous=NORMAL",     # fsync at checkpoints only — safe with WAL
+        "PRAGMA busy_timeout=5000",
+        "PRAGMA cache_size=-16000",      # 16 MB page cache
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA mmap_size=134217728",    # 128 MB memory-mapped reads
+        "PRAGMA foreign_keys=ON",
+    ]
+
+    def __init__(self, path):
+        self.path   = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            raw = sqlite3.connect(self.path, timeout=5,
+                                  detect_types=sqlite3.PARSE_DECLTYPES,
+                                  cached_statements=256)
+            for pragma in self.PRAGMAS:
+                raw.execute(pragma)
+            conn = self._local.conn = _SQLiteConnection(raw)
+        return conn
+
+    _DDL_RULES = [
+        (re.compile(r'\bINT AUTO_INCREMENT PRIMARY KEY', re.I), 'INTEGER PRIMARY KEY AUTOINCREMENT'),
+        (re.compile(r"\bENUM\([^)]*\)", re.I),                 'TEXT'),
+        (re.compile(r'\bUNIQUE KEY \w+ \(', re.I),              'UNIQUE ('),
+        (re.compile(r'\s+ON UPDATE CURRENT_TIMESTAMP', re.I),   ''),
+        (re.compile(r'\bDEFAULT CURRENT_TIMESTAMP', re.I),      "DEFAULT (datetime('now','localtime'))"),
+        (re.compile(r'\s+AFTER \w+', re.I),                     ''),
+    ]
+
+    def ddl(self, sql):
+        """Rewrite the MySQL schema statements into SQLite's dialect."""
+        for pattern, repl in self._DDL_RULES:
+            sql = pattern.sub(repl, sql)
+        return sql
+
+    def upsert_clause(self, conflict_cols, assignments=()):
+        target = ", ".join(conflict_cols)
+        if not assignments:
+            return f"ON CONFLICT({target}) DO NOTHING"
+        return f"ON CONFLICT({target}) DO UPDATE SET " + ", ".join(assignments)
+
+    def table_exists(self, cursor, table):
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=%s", (table,))
+        return cursor.fetchone() is not None
+
+    def column_names(self, cursor, table):
+        cursor.execute(f"PRAGMA table_info({table})")
+        return [row[1] for row in cursor.fetchall()]
+
+    def add_index(self, cursor, table, name, columns, fulltext=False):
+        if fulltext:
+            return  # name search falls back to the prefix B-tree index
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+
+    def begin_write(self, cursor):
+        """Take the database write lock up front so two claimers can't pick the same rows."""
+        cursor.execute("BEGIN IMMEDIATE")
+
+    def skip_locked(self):
+        return ""  # whole-database write lock from begin_write() instead
+
+    def epoch_sql(self):
+        # not strftime('%s') — '%s' is rewritten as a parameter placeholder
+        return "CAST((julianday('now') - 2440587.5) * 86400 AS INTEGER)"
+
+    def now_sql(self):
+        return "datetime('now','localtime')"   # matches the DEFAULT rewrite in ddl()
+
+    def like_escape(self):
+        return " ESCAPE '\\'"       # no default escape character in SQLite
+
+
+def make_backend(kind, mysql_config=None, sqlite_path=None):
+    if kind == 'sqlite':
+        return SQLiteBackend(sqlite_path)
+    if kind == 'mysql':
+        return MySQLBackend(mysql_config)
+    raise ValueError(f"Unknown database backend: {kind}")
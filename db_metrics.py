@@ -0,0 +1,235 @@
+"""
+Query Metrics — Per-Query Latency Instrumentation
+=================================================
+Every connection handed out by DatabaseManager.get_connection() is wrapped
+so each cursor execution is timed. Results are grouped by *query name* —
+the function that issued the SQL (e.g. ``get_all_face_encodings``,
+``get_attendance``) — into:
+
+  • call count, total / max latency
+  • a latency histogram (fixed millisecond buckets → p50 / p95 / p99)
+  • rows returned and approximate bytes transferred
+
+Commits are recorded separately as ``<name>.commit``.
+
+View them in Settings → Diagnostics, or dump with:
+    from db_metrics import query_metrics
+    query_metrics.dump_json('query_metrics.json')
+"""
+
+import json
+import sys
+import threading
+import time
+import weakref
+from datetime import datetime
+
+ENABLED = True
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+BUCKETS_MS = (0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float('inf'))
+
+
+def _row_bytes(row):
+    """Approximate payload size of one result row."""
+    values = row.values() if isinstance(row, dict) else row
+    size = 0
+    for v in values:
+        if isinstance(v, (bytes, bytearray, str)):
+            size += len(v)
+        elif v is not None:
+            size += 8
+    return size
+
+
+class _QueryStat:
+    __slots__ = ('calls', 'total_ms', 'max_ms', 'rows', 'bytes', 'buckets')
+
+    def __init__(self):
+        self.calls    = 0
+        self.total_ms = 0.0
+        self.max_ms   = 0.0
+        self.rows     = 0
+        self.bytes    = 0
+        self.buckets  = [0] * len(BUCKETS_MS)
+
+    def add(self, ms, rows, nbytes):
+        self.calls    += 1
+        self.total_ms += ms
+        self.max_ms    = max(self.max_ms, ms)
+        self.rows     += rows
+        self.bytes    += nbytes
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                break
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile."""
+        target = q * self.calls
+        seen   = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= target and count:
+                return self.max_ms if bound == float('inf') else min(bound, self.max_ms)
+        return self.max_ms
+
+
+class QueryMetrics:
+    """Thread-safe registry of per-query-name statistics."""
+
+    def __init__(self):
+        self._lock    = threading.Lock()
+        self._stats   = {}
+        self._started = datetime.now()
+
+    def record(self, name, ms, rows=0, nbytes=0):
+        with self._lock:
+            stat = self._stats.get(name)
+            if stat is None:
+                stat = self._stats[name] = _QueryStat()
+            stat.add(ms, rows, nbytes)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._started = datetime.now()
+
+    def snapshot(self):
+        """List of per-query dicts, slowest total time first."""
+        with self._lock:
+            out = []
+            for name, s in self._stats.items():
+                out.append({
+                    'query':    name,
+                    'calls':    s.calls,
+                    'total_ms': round(s.total_ms, 3),
+                    'mean_ms':  round(s.total_ms / s.calls, 3) if s.calls else 0.0,
+                    'p50_ms':   round(s.percentile(0.50), 3),
+                    'p95_ms':   round(s.percentile(0.95), 3),
+                    'p99_ms':   round(s.percentile(0.99), 3),
+                    'max_ms':   round(s.max_ms, 3),
+                    'rows':     s.rows,
+                    'bytes':    s.bytes,
+                    'histogram': {('inf' if b == float('inf') else str(b)): c
+                                  for b, c in zip(BUCKETS_MS, s.buckets)},
+                })
+        return sorted(out, key=lambda r: r['total_ms'], reverse=True)
+
+    def dump_json(self, path):
+        with open(path, 'w') as f:
+            json.dump({'since': self._started.isoformat(timespec='seconds'),
+                       'generated': datetime.now().isoformat(timespec='seconds'),
+                       'queries': self.snapshot()}, f, indent=2)
+        return path
+
+
+query_metrics = QueryMetrics()
+
+
+def _caller_name(depth=2):
+    return sys._getframe(depth).f_code.co_name
+
+
+class InstrumentedCursor:
+    """
+    Times execute() plus the fetches that follow it as one call. The call is
+    recorded when the next execute() starts, or when the cursor or its
+    connection is closed.
+    """
+
+    def __init__(self, cursor, metrics):
+        self._cur     = cursor
+        self._metrics = metrics
+        self._name    = None
+
+    def _finish(self):
+        if self._name is not None:
+            self._metrics.record(self._name, self._ms, self._rows, self._bytes)
+            self._name = None
+
+    def execute(self, sql, params=None, *args, **kwargs):
+        self._finish()
+        self._name, self._rows, self._bytes = _caller_name(), 0, 0
+        t0 = time.perf_counter()
+        try:
+            return self._cur.execute(sql, params, *args, **kwargs)
+        finally:
+            self._ms = (time.perf_counter() - t0) * 1000
+
+    def executemany(self, sql, seq_of_params, *args, **kwargs):
+        self._finish()
+        self._name, self._rows, self._bytes = _caller_name(), 0, 0
+        t0 = time.perf_counter()
+        try:
+            return self._cur.executemany(sql, seq_of_params, *args, **kwargs)
+        finally:
+            self._ms = (time.perf_counter() - t0) * 1000
+            self._rows = max(self._cur.rowcount or 0, 0)
+
+    def _timed_fetch(self, fetch, *args):
+        t0 = time.perf_counter()
+        result = fetch(*args)
+        if self._name is not None:
+            self._ms += (time.perf_counter() - t0) * 1000
+            rows = result if isinstance(result, list) else ([] if result is None else [result])
+            self._rows  += len(rows)
+            self._bytes += sum(_row_bytes(r) for r in rows)
+        return result
+
+    def fetchone(self):
+        return self._timed_fetch(self._cur.fetchone)
+
+    def fetchmany(self, size=1):
+        return self._timed_fetch(self._cur.fetchmany, size)
+
+    def fetchall(self):
+        return self._timed_fetch(self._cur.fetchall)
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def close(self):
+        self._finish()
+        return self._cur.close()
+
+    def __getattr__(self, attr):
+        return getattr(self._cur, attr)
+
+
+class InstrumentedConnection:
+    """Connection proxy whose cursors report into query_metrics."""
+
+    def __init__(self, conn, metrics=query_metrics):
+        self._conn    = conn
+        self._metrics = metrics
+        self._cursors = weakref.WeakSet()
+
+    def cursor(self, *args, **kwargs):
+        cur = InstrumentedCursor(self._conn.cursor(*args, **kwargs), self._metrics)
+        self._cursors.add(cur)
+        return cur
+
+    def commit(self):
+        t0 = time.perf_counter()
+        try:
+            return self._conn.commit()
+        finally:
+            self._metrics.record(f"{_caller_name()}.commit",
+                                 (time.perf_counter() - t0) * 1000)
+
+    def close(self):
+        for cur in list(self._cursors):      # cursors left open by the caller
+            cur._finish()
+        return self._conn.close()
+
+    def __getattr__(self, attr):
+        return getattr(self._conn, attr)
+
+
+def instrument(conn):
+    return InstrumentedConnection(conn) if ENABLED else conn
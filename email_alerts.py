@@ -17,16 +17,35 @@ SETUP (One time):
 3. Set ENABLED = True to send real emails.
 
 pip install (already in requirements — uses smtplib, built-in)
+
+Messages go out over a small pool of long-lived, already-authenticated SMTP
+sessions (SMTPPool) instead of connect → STARTTLS → login per message.
+Bulk sends (send_absent_alerts, send_daily_summary) use all sessions at once.
+
+The HTML bodies are precompiled email_templates. Values filled into them
+(student names, classes, ...) are HTML-escaped, so a name containing & or <
+shows as typed instead of being read as markup.
 """
 
+import atexit
+import html
+import queue
 import smtplib
+import threading
+import time
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from email.mime.multipart import MIMEMultipart
 from email.mime.text      import MIMEText
 from email.mime.base      import MIMEBase
 from email                import encoders
 from datetime             import date, datetime
 
+from absence_digest  import digest_text
+from email_templates import HtmlMail, Safe, compile_template
+from report_queries  import daily_summary
+
 # ══════════════════════════════════════════════════════════════
 #  ✏️  YOUR EMAIL CONFIG
 # ══════════════════════════════════════════════════════════════
@@ -42,10 +61,147 @@ SMTP_SERVER = 'smtp.gmail.com'
 SMTP_PORT   = 587
 UNIVERSITY  = "Vanita Vishram Women's University"
 
+SMTP_STARTTLS        = True
+SMTP_TIMEOUT         = 30    # seconds per SMTP command
+SMTP_POOL_SIZE       = 3     # concurrent authenticated sessions
+MESSAGES_PER_SESSION = 90    # Gmail drops a session after ~100 messages
 
-def _build_absent_html(student_name, student_id, class_name, date_str):
-    """Build styled HTML email for absent alert."""
-    return f"""
+
+# ══════════════════════════════════════════════════════════════
+#  SMTP SESSION POOL
+# ══════════════════════════════════════════════════════════════
+
+# Errors meaning the session itself is gone — reconnect and resend once
+_SESSION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError,
+                   ConnectionError, TimeoutError)
+
+
+def _quit(server):
+    try:
+        server.quit()
+    except Exception:
+        try:
+            server.close()
+        except Exception:
+            pass
+
+
+class SMTPPool:
+    """
+    Up to `size` logged-in SMTP sessions shared by all senders. A session is
+    reused until MESSAGES_PER_SESSION, replaced if the server drops it, and
+    closed with close().
+    """
+
+    def __init__(self, size=None):
+        self.size        = size or SMTP_POOL_SIZE
+        self._idle       = queue.LifoQueue()
+        self._slots      = threading.BoundedSemaphore(self.size)
+        self.connects    = 0
+        self.reconnects  = 0
+
+    def _connect(self):
+        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=SMTP_TIMEOUT)
+        server.ehlo()
+        if SMTP_STARTTLS:
+            server.starttls()
+            server.ehlo()
+        if SENDER_PASSWORD:
+            server.login(SENDER_EMAIL, SENDER_PASSWORD)
+        server.sent_count = 0
+        self.connects += 1
+        return server
+
+    def _acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                return self._connect()
+            except Exception:
+                self._slots.release()
+                raise
+
+    def _release(self, server, broken=False):
+        if broken or server.sent_count >= MESSAGES_PER_SESSION:
+            _quit(server)
+        else:
+            self._idle.put(server)
+        self._slots.release()
+
+    def send(self, msg, recipients):
+        """Send one message (Message or str) to a list of recipients."""
+        data = msg if isinstance(msg, (str, bytes)) else msg.as_string()
+        for attempt in (0, 1):
+            server = self._acquire()
+            try:
+                server.sendmail(SENDER_EMAIL, recipients, data)
+            except _SESSION_ERRORS + (smtplib.SMTPResponseException,) as e:
+                dropped = (isinstance(e, _SESSION_ERRORS) or
+                           getattr(e, 'smtp_code', None) == 421)
+                self._release(server, broken=dropped)
+                if not dropped or attempt:
+                    raise
+                self.reconnects += 1
+                continue
+            except Exception:
+                self._release(server)
+                raise
+            server.sent_count += 1
+            self._release(server)
+            return
+
+    def send_many(self, jobs):
+        """
+        jobs: list of (msg, recipients). Sent concurrently over the pool.
+        Returns [(ok, error_or_None), ...] in the same order.
+        """
+        def one(job):
+            try:
+                self.send(*job)
+                return True, None
+            except Exception as e:
+                return False, str(e)
+
+        if len(jobs) <= 1:
+            return [one(j) for j in jobs]
+        with ThreadPoolExecutor(max_workers=self.size, thread_name_prefix='smtp') as ex:
+            return list(ex.map(one, jobs))
+
+    def close(self):
+        while True:
+            try:
+                _quit(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+_pool      = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SMTPPool()
+        return _pool
+
+
+def close_pool():
+    """QUIT every idle session (called at exit)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool:
+        pool.close()
+
+
+atexit.register(close_pool)
+
+
+ABSENT_HTML = """
     <!DOCTYPE html>
     <html>
     <head><meta charset="UTF-8"></head>
@@ -59,7 +215,7 @@ def _build_absent_html(student_name, student_id, class_name, date_str):
             <tr>
               <td style="background:#8B4513;padding:25px 30px;text-align:center;">
                 <h1 style="color:#ffffff;margin:0;font-size:20px;font-weight:700;">
-                  {UNIVERSITY}
+                  {{ university }}
                 </h1>
                 <p style="color:#f0d0b0;margin:5px 0 0;font-size:13px;">
                   Department of Computer Science
@@ -70,7 +226,7 @@ def _build_absent_html(student_name, student_id, class_name, date_str):
             <tr>
               <td style="background:#FFF3CD;padding:15px 30px;border-left:5px solid #F39C12;">
                 <p style="margin:0;font-size:15px;font-weight:600;color:#856404;">
-                  ⚠️  Attendance Alert — {date_str}
+                  ⚠️  Attendance Alert — {{ date_str }}
                 </p>
               </td>
             </tr>
@@ -81,7 +237,7 @@ def _build_absent_html(student_name, student_id, class_name, date_str):
                 <p style="font-size:14px;color:#555;line-height:1.7;">
                   This is to inform you that your ward was marked
                   <strong style="color:#E74C3C;">ABSENT</strong> today.
-                </p>
+                </p>{{ note }}
                 <!-- Student Info Card -->
                 <table width="100%" cellpadding="0" cellspacing="0"
                        style="background:#F8F4F0;border-radius:6px;
@@ -92,21 +248,21 @@ def _build_absent_html(student_name, student_id, class_name, date_str):
                         <tr>
                           <td style="color:#888;font-size:13px;width:40%;">Student Name</td>
                           <td style="color:#333;font-size:14px;font-weight:600;">
-                            {student_name}
+                            {{ student_name }}
                           </td>
                         </tr>
                         <tr style="background:#fff;border-radius:4px;">
                           <td style="color:#888;font-size:13px;">Student ID</td>
-                          <td style="color:#333;font-size:14px;">{student_id}</td>
+                          <td style="color:#333;font-size:14px;">{{ student_id }}</td>
                         </tr>
                         <tr>
                           <td style="color:#888;font-size:13px;">Class</td>
-                          <td style="color:#333;font-size:14px;">{class_name}</td>
+                          <td style="color:#333;font-size:14px;">{{ class_name }}</td>
                         </tr>
                         <tr style="background:#fff;">
                           <td style="color:#888;font-size:13px;">Date</td>
                           <td style="color:#E74C3C;font-size:14px;font-weight:600;">
-                            {date_str}
+                            {{ date_str }}
                           </td>
                         </tr>
                       </table>
@@ -139,33 +295,42 @@ def _build_absent_html(student_name, student_id, class_name, date_str):
     </html>
     """
 
+ABSENT_SUBJECT = "Attendance Alert: {student_name} was Absent on {date_str}"
+SUMMARY_SUBJECT = "Daily Attendance Summary — {report_day} | {university}"
 
-def _build_summary_html(summary_data, report_date):
-    """Build styled HTML email for daily summary."""
-    total   = summary_data.get('total', 0)
-    present = summary_data.get('present', 0)
-    absent  = summary_data.get('absent', 0)
-    late    = summary_data.get('late', 0)
-    pct     = round((present + late) / total * 100, 1) if total else 0
 
-    rows_html = ''
-    for cls, data in summary_data.get('classes', {}).items():
-        t = data.get('present', 0) + data.get('absent', 0) + data.get('late', 0)
-        p = round((data.get('present', 0) + data.get('late', 0)) / t * 100, 1) if t else 0
-        color = '#27AE60' if p >= 75 else ('#F39C12' if p >= 60 else '#E74C3C')
-        rows_html += f"""
+def _build_absent_html(student_name, student_id, class_name, date_str, digest=None):
+    """Build styled HTML email for absent alert."""
+    return compile_template(ABSENT_HTML, university=UNIVERSITY).render(
+        **_absent_fields(student_name, student_id, class_name, date_str, digest))
+
+
+SUMMARY_ROW_HTML = """
         <tr>
-          <td style="padding:8px 12px;border-bottom:1px solid #eee;">{cls}</td>
-          <td style="padding:8px 12px;border-bottom:1px solid #eee;text-align:center;">{t}</td>
+          <td style="padding:8px 12px;border-bottom:1px solid #eee;">{{ cls }}</td>
+          <td style="padding:8px 12px;border-bottom:1px solid #eee;text-align:center;">{{ total }}</td>
           <td style="padding:8px 12px;border-bottom:1px solid #eee;text-align:center;color:#27AE60;">
-            {data.get('present',0)}</td>
+            {{ present }}</td>
           <td style="padding:8px 12px;border-bottom:1px solid #eee;text-align:center;color:#E74C3C;">
-            {data.get('absent',0)}</td>
+            {{ absent }}</td>
           <td style="padding:8px 12px;border-bottom:1px solid #eee;text-align:center;
-                     font-weight:600;color:{color};">{p}%</td>
+                     font-weight:600;color:{{ color }};">{{ pct }}%</td>
         </tr>"""
 
-    return f"""
+SUMMARY_TABLE_HTML = """<table width="100%" cellpadding="0" cellspacing="0"
+                        style="border:1px solid #eee;border-radius:6px;overflow:hidden;
+                               font-size:13px;">
+              <tr style="background:#8B4513;color:#fff;">
+                <th style="padding:10px 12px;text-align:left;">Class</th>
+                <th style="padding:10px 12px;">Total</th>
+                <th style="padding:10px 12px;">Present</th>
+                <th style="padding:10px 12px;">Absent</th>
+                <th style="padding:10px 12px;">Rate</th>
+              </tr>
+              {{ rows }}
+            </table>"""
+
+SUMMARY_HTML = """
     <!DOCTYPE html>
     <html>
     <body style="font-family:Segoe UI,Arial,sans-serif;background:#f5f5f5;padding:20px;">
@@ -177,7 +342,7 @@ def _build_summary_html(summary_data, report_date):
               📊 Daily Attendance Summary
             </h2>
             <p style="color:#f0d0b0;margin:6px 0 0;font-size:13px;">
-              {report_date.strftime('%A, %d %B %Y')}  |  {UNIVERSITY}
+              {{ report_day }}  |  {{ university }}
             </p>
           </td>
         </tr>
@@ -187,43 +352,32 @@ def _build_summary_html(summary_data, report_date):
             <table width="100%" cellpadding="0" cellspacing="8" style="margin-bottom:20px;">
               <tr>
                 <td align="center" style="background:#EBF5FB;padding:15px;border-radius:6px;">
-                  <div style="font-size:28px;font-weight:700;color:#2980B9;">{total}</div>
+                  <div style="font-size:28px;font-weight:700;color:#2980B9;">{{ total }}</div>
                   <div style="font-size:11px;color:#888;margin-top:4px;">Total</div>
                 </td>
                 <td align="center" style="background:#EAFAF1;padding:15px;border-radius:6px;">
-                  <div style="font-size:28px;font-weight:700;color:#27AE60;">{present}</div>
+                  <div style="font-size:28px;font-weight:700;color:#27AE60;">{{ present }}</div>
                   <div style="font-size:11px;color:#888;margin-top:4px;">Present</div>
                 </td>
                 <td align="center" style="background:#FEF9E7;padding:15px;border-radius:6px;">
-                  <div style="font-size:28px;font-weight:700;color:#F39C12;">{late}</div>
+                  <div style="font-size:28px;font-weight:700;color:#F39C12;">{{ late }}</div>
                   <div style="font-size:11px;color:#888;margin-top:4px;">Late</div>
                 </td>
                 <td align="center" style="background:#FDEDEC;padding:15px;border-radius:6px;">
-                  <div style="font-size:28px;font-weight:700;color:#E74C3C;">{absent}</div>
+                  <div style="font-size:28px;font-weight:700;color:#E74C3C;">{{ absent }}</div>
                   <div style="font-size:11px;color:#888;margin-top:4px;">Absent</div>
                 </td>
                 <td align="center"
-                    style="background:#{'EAFAF1' if pct>=75 else 'FDEDEC'};
+                    style="background:#{{ rate_bg }};
                            padding:15px;border-radius:6px;">
                   <div style="font-size:28px;font-weight:700;
-                              color:#{'27AE60' if pct>=75 else 'E74C3C'};">{pct}%</div>
+                              color:#{{ rate_fg }};">{{ pct }}%</div>
                   <div style="font-size:11px;color:#888;margin-top:4px;">Rate</div>
                 </td>
               </tr>
             </table>
             <!-- Class table -->
-            {f'''<table width="100%" cellpadding="0" cellspacing="0"
-                        style="border:1px solid #eee;border-radius:6px;overflow:hidden;
-                               font-size:13px;">
-              <tr style="background:#8B4513;color:#fff;">
-                <th style="padding:10px 12px;text-align:left;">Class</th>
-                <th style="padding:10px 12px;">Total</th>
-                <th style="padding:10px 12px;">Present</th>
-                <th style="padding:10px 12px;">Absent</th>
-                <th style="padding:10px 12px;">Rate</th>
-              </tr>
-              {rows_html}
-            </table>''' if rows_html else ''}
+            {{ class_table }}
           </td>
         </tr>
         <tr>
@@ -239,6 +393,64 @@ def _build_summary_html(summary_data, report_date):
     """
 
 
+def _build_summary_html(summary_data, report_date):
+    """Build styled HTML email for daily summary."""
+    total   = summary_data.get('total', 0)
+    present = summary_data.get('present', 0)
+    absent  = summary_data.get('absent', 0)
+    late    = summary_data.get('late', 0)
+    pct     = round((present + late) / total * 100, 1) if total else 0
+
+    row_tpl = compile_template(SUMMARY_ROW_HTML)
+    rows    = []
+    for cls, data in summary_data.get('classes', {}).items():
+        t = data.get('present', 0) + data.get('absent', 0) + data.get('late', 0)
+        p = round((data.get('present', 0) + data.get('late', 0)) / t * 100, 1) if t else 0
+        color = '#27AE60' if p >= 75 else ('#F39C12' if p >= 60 else '#E74C3C')
+        rows.append(row_tpl.render(cls=cls, total=t, present=data.get('present', 0),
+                                   absent=data.get('absent', 0), color=color, pct=p))
+
+    class_table = ''
+    if rows:
+        class_table = Safe(compile_template(SUMMARY_TABLE_HTML).render(rows=Safe(''.join(rows))))
+
+    return compile_template(SUMMARY_HTML, university=UNIVERSITY).render(
+        report_day=report_date.strftime('%A, %d %B %Y'),
+        total=total, present=present, late=late, absent=absent, pct=pct,
+        rate_bg='EAFAF1' if pct >= 75 else 'FDEDEC',
+        rate_fg='27AE60' if pct >= 75 else 'E74C3C',
+        class_table=class_table,
+    )
+
+
+@lru_cache(maxsize=8)
+def _mail(kind, sender, cc, university):
+    """Pre-serialized MIME layout, rebuilt only when the template or config changes."""
+    if kind == 'absent':
+        tpl, subject = compile_template(ABSENT_HTML, university=university), ABSENT_SUBJECT
+    else:
+        tpl, subject = compile_template(SUMMARY_HTML, university=university), SUMMARY_SUBJECT
+    return HtmlMail(tpl, subject, sender, cc)
+
+
+def _absent_mail():
+    return _mail('absent', f"{SENDER_NAME} <{SENDER_EMAIL}>", tuple(CC_EMAILS), UNIVERSITY)
+
+
+def _digest_note(digest):
+    """Extra paragraph for a repeated-absence digest (see absence_digest)."""
+    if not digest:
+        return Safe('')
+    return Safe('<p style="font-size:14px;color:#C0392B;line-height:1.7;">'
+                f'Repeated absence: your ward has been {html.escape(digest_text(digest))}.'
+                '</p>')
+
+
+def _absent_fields(student_name, student_id, class_name, date_str, digest=None):
+    return dict(student_name=student_name, student_id=student_id,
+                class_name=class_name or '', date_str=date_str, note=_digest_note(digest))
+
+
 def send_absent_alert(student_name, student_id, class_name, parent_email, date_str=None):
     """
     Send absent alert email to parent.
@@ -256,23 +468,9 @@ def send_absent_alert(student_name, student_id, class_name, parent_email, date_s
         date_str = date.today().strftime('%d %B %Y')
 
     try:
-        msg              = MIMEMultipart('alternative')
-        msg['Subject']   = f"Attendance Alert: {student_name} was Absent on {date_str}"
-        msg['From']      = f"{SENDER_NAME} <{SENDER_EMAIL}>"
-        msg['To']        = parent_email
-        if CC_EMAILS:
-            msg['Cc']    = ', '.join(CC_EMAILS)
-
-        html_part = MIMEText(
-            _build_absent_html(student_name, student_id, class_name, date_str),
-            'html')
-        msg.attach(html_part)
-
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SENDER_EMAIL, SENDER_PASSWORD)
-            recipients = [parent_email] + CC_EMAILS
-            server.sendmail(SENDER_EMAIL, recipients, msg.as_string())
+        msg = _absent_mail().build(
+            parent_email, **_absent_fields(student_name, student_id, class_name, date_str))
+        get_pool().send(msg, [parent_email] + CC_EMAILS)
 
         print(f"[✅ EMAIL SENT] Absent alert → {parent_email}")
         return True, f"Email sent to {parent_email}"
@@ -291,56 +489,63 @@ def send_daily_summary(admin_emails, db, report_date=None):
     if report_date is None:
         report_date = date.today()
 
-    records = db.get_attendance(date_filter=str(report_date))
-    total   = len(records)
-    present = sum(1 for r in records if r.get('status') == 'present')
-    absent  = sum(1 for r in records if r.get('status') == 'absent')
-    late    = sum(1 for r in records if r.get('status') == 'late')
-
-    # Class breakdown
-    classes = {}
-    for r in records:
-        cls = r.get('class_name', 'Unknown')
-        if cls not in classes:
-            classes[cls] = {'present': 0, 'absent': 0, 'late': 0}
-        s = (r.get('status') or '').lower()
-        if s in classes[cls]:
-            classes[cls][s] += 1
-
-    summary_data = {
-        'total': total, 'present': present,
-        'absent': absent, 'late': late, 'classes': classes
-    }
+    summary_data = daily_summary(db, report_date)
 
     if not ENABLED:
         print(f"[EMAIL DEMO] Would send daily summary. Set ENABLED=True.")
         return [(e, True, "Demo mode") for e in admin_emails]
 
-    results = []
-    for email in admin_emails:
-        try:
-            msg              = MIMEMultipart('alternative')
-            msg['Subject']   = (f"Daily Attendance Summary — "
-                                f"{report_date.strftime('%d %b %Y')} | {UNIVERSITY}")
-            msg['From']      = f"{SENDER_NAME} <{SENDER_EMAIL}>"
-            msg['To']        = email
+    # Same body for every admin — render once, only the To: header differs
+    mail = _mail('summary', f"{SENDER_NAME} <{SENDER_EMAIL}>", (), UNIVERSITY)
+    html = _build_summary_html(summary_data, report_date)
+    subject_fields = dict(report_day=report_date.strftime('%d %b %Y'), university=UNIVERSITY)
+    jobs = [(mail.build(email, body=html, **subject_fields), [email]) for email in admin_emails]
 
-            html_part = MIMEText(
-                _build_summary_html(summary_data, report_date), 'html')
-            msg.attach(html_part)
+    results = []
+    for email, (ok, err) in zip(admin_emails, get_pool().send_many(jobs)):
+        if ok:
+            print(f"[✅ EMAIL SENT] Daily summary → {email}")
+        results.append((email, ok, "Sent" if ok else err))
+    return results
 
-            with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-                server.starttls()
-                server.login(SENDER_EMAIL, SENDER_PASSWORD)
-                server.sendmail(SENDER_EMAIL, [email], msg.as_string())
 
-            print(f"[✅ EMAIL SENT] Daily summary → {email}")
-            results.append((email, True, "Sent"))
+def send_absent_alerts(students, date_str=None):
+    """
+    Bulk absent alerts over the pooled sessions.
+    students: dicts with full_name, student_id, class_name and
+    parent_email (or email). Returns a summary dict.
+    """
+    if date_str is None:
+        date_str = date.today().strftime('%d %B %Y')
 
-        except Exception as e:
-            results.append((email, False, str(e)))
+    started  = time.perf_counter()
+    targets  = [s for s in students if s.get('parent_email') or s.get('email')]
+    summary  = {'total': len(students), 'sent': 0, 'failed': 0,
+                'skipped': len(students) - len(targets), 'elapsed': 0.0, 'errors': []}
 
-    return results
+    if not ENABLED:
+        print(f"[EMAIL DEMO] Would send {len(targets)} absent alerts. Set ENABLED=True.")
+        summary['sent'] = len(targets)
+        return summary
+
+    mail = _absent_mail()
+    jobs = []
+    for s in targets:
+        to = s.get('parent_email') or s.get('email')
+        msg = mail.build(to, **_absent_fields(s['full_name'], s['student_id'],
+                                              s.get('class_name', ''), date_str))
+        jobs.append((msg, [to] + CC_EMAILS))
+
+    for s, (ok, err) in zip(targets, get_pool().send_many(jobs)):
+        if ok:
+            summary['sent'] += 1
+        else:
+            summary['failed'] += 1
+            summary['errors'].append((s['student_id'], err))
+            print(f"[EMAIL ERROR] {s['student_id']}: {err}")
+
+    summary['elapsed'] = round(time.perf_counter() - started, 2)
+    return summary
 
 
 def send_report_with_attachment(recipient_emails, pdf_path, report_title="Attendance Report"):
@@ -348,8 +553,16 @@ def send_report_with_attachment(recipient_emails, pdf_path, report_title="Attend
     Send an email with a PDF report as attachment.
     Returns (success: bool, message: str)
     """
+    return send_report_email(recipient_emails, [pdf_path], report_title)
+
+
+def send_report_email(recipient_emails, pdf_paths, report_title="Attendance Report", html=None):
+    """
+    One email carrying several PDF reports, over a pooled SMTP session.
+    `html` replaces the default body. Returns (success: bool, message: str)
+    """
     if not ENABLED:
-        print(f"[EMAIL DEMO] Would send '{report_title}' PDF to {recipient_emails}")
+        print(f"[EMAIL DEMO] Would send '{report_title}' ({len(pdf_paths)} PDF) to {recipient_emails}")
         return True, "Demo mode"
 
     try:
@@ -358,16 +571,18 @@ def send_report_with_attachment(recipient_emails, pdf_path, report_title="Attend
         msg['From']    = f"{SENDER_NAME} <{SENDER_EMAIL}>"
         msg['To']      = ', '.join(recipient_emails)
 
-        body = MIMEText(
+        body = MIMEText(html or (
             f"<p>Dear Admin,</p>"
             f"<p>Please find attached the <b>{report_title}</b> for {UNIVERSITY}.</p>"
             f"<p>This report was automatically generated by the "
-            f"Face Recognition Attendance System.</p>",
+            f"Face Recognition Attendance System.</p>"),
             'html')
         msg.attach(body)
 
-        # Attach PDF
-        if os.path.exists(pdf_path):
+        # Attach PDFs
+        for pdf_path in pdf_paths:
+            if not os.path.exists(pdf_path):
+                continue
             with open(pdf_path, 'rb') as f:
                 part = MIMEBase('application', 'octet-stream')
                 part.set_payload(f.read())
@@ -376,12 +591,9 @@ def send_report_with_attachment(recipient_emails, pdf_path, report_title="Attend
                             f'attachment; filename="{os.path.basename(pdf_path)}"')
             msg.attach(part)
 
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SENDER_EMAIL, SENDER_PASSWORD)
-            server.sendmail(SENDER_EMAIL, recipient_emails, msg.as_string())
+        get_pool().send(msg, recipient_emails)
 
-        return True, f"Email with PDF sent to {recipient_emails}"
+        return True, f"Email with {len(pdf_paths)} PDF(s) sent to {recipient_emails}"
 
     except Exception as e:
         return False, f"Email error: {e}"
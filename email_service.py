@@ -0,0 +1,217 @@
+"""
+Email Service — Scheduled Report Emails
+=======================================
+The report jobs of auto_scheduler:
+
+  • send_daily_summary_email(db)   — 6 PM: summary email with one daily
+                                     PDF per class attached
+  • send_weekly_report_email(db)   — Friday: register per class for the
+                                     week's month(s) + defaulter list
+  • generate_monthly_registers(db) — 1st of month: last month's register
+                                     per class, saved under monthly_reports/
+
+Each job runs in three timed stages:
+  1. query   — classes and summary figures (one pass in this process)
+  2. render  — per-class PDFs in a process pool (ReportLab is CPU-bound,
+               so threads would not help); each worker opens its own DB
+               connection, and PDFs whose data hasn't changed are copied
+               from report_cache
+  3. send    — one email with every PDF, over email_alerts' pooled SMTP
+               session
+
+Recipients are REPORT_EMAILS, or every admin with an email if it is empty.
+Every job returns {'sent', 'recipients', 'files', 'errors', 'timings'}.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+
+REPORT_EMAILS = []      # e.g. ['principal@vvwu.ac.in'] — empty → all admin emails
+PDF_WORKERS   = min(4, os.cpu_count() or 1)
+REPORTS_DIR   = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'monthly_reports')
+
+
+# ══════════════════════════════════════════════════════════
+#  PROCESS POOL WORKER
+# ══════════════════════════════════════════════════════════
+_worker_db = None
+
+
+def _init_worker(backend):
+    global _worker_db
+    from database import DatabaseManager
+    _worker_db = DatabaseManager(backend)
+
+
+def _render(kind, path, params):
+    """Build one PDF in a worker process (or reuse it from report_cache). Returns (path, seconds)."""
+    import report_cache
+    started = time.perf_counter()
+    report_cache.render(_worker_db, kind, path, **params)
+    return path, time.perf_counter() - started
+
+
+def render_pdfs(db, jobs, workers=None):
+    """
+    Render (kind, path, params) jobs across a process pool.
+    Returns (paths, errors) — a failed PDF doesn't stop the others.
+    """
+    paths, errors = [], []
+    if not jobs:
+        return paths, errors
+    workers = min(workers or PDF_WORKERS, len(jobs))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(db.backend.name,)) as pool:
+        futures = {pool.submit(_render, *job): job for job in jobs}
+        for future in as_completed(futures):
+            kind, path, _ = futures[future]
+            try:
+                paths.append(future.result()[0])
+            except Exception as e:
+                errors.append((os.path.basename(path), str(e)))
+                print(f"[REPORT ERROR] {kind} → {os.path.basename(path)}: {e}")
+    # Attachment order follows the job list, not completion order
+    order = {job[1]: i for i, job in enumerate(jobs)}
+    paths.sort(key=order.get)
+    return paths, errors
+
+
+# ══════════════════════════════════════════════════════════
+#  HELPERS
+# ══════════════════════════════════════════════════════════
+def _recipients(db):
+    if REPORT_EMAILS:
+        return list(REPORT_EMAILS)
+    return [a['email'] for a in db.get_all_admins() if a.get('email')]
+
+
+def _safe(name):
+    return ''.join(c if c.isalnum() or c in '-_' else '_' for c in str(name))
+
+
+class _Timer:
+    """Collects seconds per stage: with timer('render'): ..."""
+
+    def __init__(self):
+        self.timings = {}
+        self._t0     = time.perf_counter()
+
+    def __call__(self, stage):
+        self._stage = stage
+        return self
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.timings[self._stage] = round(time.perf_counter() - self._start, 2)
+
+    def done(self):
+        self.timings['total'] = round(time.perf_counter() - self._t0, 2)
+        return self.timings
+
+
+def _send(result, timer, out_dir, recipients, files, title, html=None):
+    """Email the PDFs, then delete their temporary folder."""
+    import email_alerts
+    with timer('send'):
+        try:
+            if recipients:
+                ok, message = email_alerts.send_report_email(recipients, files, title, html)
+                result['sent'] = ok
+                if not ok:
+                    result['errors'].append(('email', message))
+            else:
+                result['errors'].append(('email', "No recipients — set REPORT_EMAILS or admin emails"))
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+    result['files']   = [os.path.basename(f) for f in files]
+    result['timings'] = timer.done()
+    print(f"[REPORT] {title}: {len(files)} PDF(s), timings {result['timings']}")
+    return result
+
+
+# ══════════════════════════════════════════════════════════
+#  SCHEDULED JOBS
+# ══════════════════════════════════════════════════════════
+def send_daily_summary_email(db, report_date=None, recipients=None):
+    """Daily summary email with a daily attendance PDF per class attached."""
+    import email_alerts
+    import report_queries
+    report_date = report_date or date.today()
+    timer  = _Timer()
+    result = {'sent': False, 'recipients': [], 'files': [], 'errors': [], 'timings': {}}
+
+    with timer('query'):
+        summary    = report_queries.daily_summary(db, report_date)
+        recipients = recipients or _recipients(db)
+        out_dir    = tempfile.mkdtemp(prefix='daily_reports_')
+        jobs = [('classes', os.path.join(out_dir, f"class_summary_{report_date}.pdf"),
+                 {'report_date': report_date})]
+        jobs += [('daily', os.path.join(out_dir, f"daily_{_safe(cls)}_{report_date}.pdf"),
+                  {'report_date': report_date, 'class_filter': cls})
+                 for cls in sorted(summary['classes'])]
+
+    with timer('render'):
+        files, errors = render_pdfs(db, jobs)
+
+    result.update(recipients=recipients, files=files, errors=errors)
+    html = email_alerts._build_summary_html(summary, report_date)
+    return _send(result, timer, out_dir, recipients, files,
+                 f"Daily Attendance Summary — {report_date.strftime('%d %b %Y')}", html)
+
+
+def send_weekly_report_email(db, week_end=None, recipients=None):
+    """
+    Register per class for the month(s) the week falls in — both months
+    when it spans a month boundary — plus the defaulter list.
+    """
+    week_end   = week_end or date.today()
+    week_start = week_end - timedelta(days=week_end.weekday())
+    timer      = _Timer()
+    result     = {'sent': False, 'recipients': [], 'files': [], 'errors': [], 'timings': {}}
+
+    with timer('query'):
+        recipients = recipients or _recipients(db)
+        classes    = db.get_classes()
+        out_dir    = tempfile.mkdtemp(prefix='weekly_reports_')
+        stamp      = week_end.strftime('%Y_%m_%d')
+        months     = sorted({(week_start.year, week_start.month), (week_end.year, week_end.month)})
+        jobs = [('defaulters', os.path.join(out_dir, f"defaulter_list_{stamp}.pdf"), {})]
+        jobs += [('register', os.path.join(out_dir, f"register_{_safe(cls)}_{y}-{m:02d}.pdf"),
+                  {'year': y, 'month': m, 'class_filter': cls})
+                 for y, m in months for cls in classes]
+
+    with timer('render'):
+        files, errors = render_pdfs(db, jobs)
+
+    result.update(recipients=recipients, files=files, errors=errors)
+    return _send(result, timer, out_dir, recipients, files,
+                 f"Weekly Attendance Report — {week_start.strftime('%d %b')} "
+                 f"to {week_end.strftime('%d %b %Y')}")
+
+
+def generate_monthly_registers(db, year, month, out_dir=None):
+    """Register PDF for every class (and one for all classes) into out_dir."""
+    timer   = _Timer()
+    out_dir = out_dir or os.path.join(REPORTS_DIR, f"{year}-{month:02d}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    with timer('query'):
+        classes = db.get_classes()
+        jobs = [('register', os.path.join(out_dir, f"monthly_{year}-{month:02d}.pdf"),
+                 {'year': year, 'month': month})]
+        jobs += [('register', os.path.join(out_dir, f"monthly_{year}-{month:02d}_{_safe(cls)}.pdf"),
+                  {'year': year, 'month': month, 'class_filter': cls})
+                 for cls in classes]
+
+    with timer('render'):
+        files, errors = render_pdfs(db, jobs)
+
+    timings = timer.done()
+    print(f"[REPORT] Monthly registers {year}-{month:02d}: {len(files)} PDF(s), timings {timings}")
+    return {'sent': False, 'recipients': [], 'files': files, 'errors': errors, 'timings': timings}
@@ -0,0 +1,116 @@
+"""
+Email Templates — Compiled Once, Rendered Per Recipient
+=======================================================
+The alert emails are ~5 KB of fixed HTML with a handful of per-student
+fields. Instead of rebuilding the whole f-string and a fresh MIME tree for
+every parent:
+
+  • Template     — source is split into literal chunks and ``{{ field }}``
+                   slots once; render() is a single join. Values are
+                   HTML-escaped unless wrapped in Safe().
+  • compile_template(source, **constants)
+                 — cached per (source, constants); constants such as the
+                   university name are baked in at compile time.
+  • HtmlMail     — multipart/alternative skeleton (headers, boundary, part
+                   headers) serialized once per template version; build()
+                   only adds To/Subject and the base64 body.
+
+Usage:
+    tpl  = compile_template(ABSENT_HTML, university=UNIVERSITY)
+    mail = HtmlMail(tpl, "Absent on {date_str}", "Sender <me@x.com>")
+    raw  = mail.build("parent@example.com", student_name=..., date_str=...)
+    smtp.sendmail(sender, [to], raw)
+"""
+
+import base64
+import hashlib
+import html
+import re
+from email.header import Header
+from email.utils import formatdate, make_msgid
+from functools import lru_cache
+
+_FIELD = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+
+class Safe(str):
+    """Pre-built markup — inserted without HTML-escaping."""
+
+
+def _escape(value):
+    return value if isinstance(value, Safe) else html.escape(str(value), quote=False)
+
+
+class Template:
+    def __init__(self, source, **constants):
+        parts = _FIELD.split(source)
+        # Fold constants into the neighbouring literals so render() skips them
+        literals, fields = [parts[0]], []
+        for name, literal in zip(parts[1::2], parts[2::2]):
+            if name in constants:
+                literals[-1] += _escape(constants[name]) + literal
+            else:
+                fields.append(name)
+                literals.append(literal)
+        self._literals = literals
+        self._fields   = fields
+        self.fields    = frozenset(fields)
+        self.version   = hashlib.sha1(
+            (source + repr(sorted(constants.items()))).encode()).hexdigest()[:12]
+
+    def render(self, **values):
+        out = [self._literals[0]]
+        for name, literal in zip(self._fields, self._literals[1:]):
+            out.append(_escape(values[name]))
+            out.append(literal)
+        return ''.join(out)
+
+
+@lru_cache(maxsize=32)
+def _compile(source, constants):
+    return Template(source, **dict(constants))
+
+
+def compile_template(source, **constants):
+    """Compiled Template, reused for the same source and constants."""
+    return _compile(source, tuple(sorted(constants.items())))
+
+
+def _header(value):
+    """RFC 2047-encode a header value only when it isn't plain ASCII."""
+    try:
+        value.encode('ascii')
+        return value
+    except UnicodeEncodeError:
+        return Header(value, 'utf-8').encode()
+
+
+class HtmlMail:
+    """One HTML email layout; build() returns the raw message for sendmail()."""
+
+    def __init__(self, template, subject, sender, cc=()):
+        self.template = template
+        self.subject  = subject          # str.format() pattern over the same fields
+        self.cc       = list(cc)
+        boundary      = f"===============vvwu{template.version}=="
+        cc_line       = f"Cc: {_header(', '.join(self.cc))}\n" if self.cc else ""
+        self._head    = (f"From: {_header(sender)}\n{cc_line}MIME-Version: 1.0\n"
+                         f'Content-Type: multipart/alternative; boundary="{boundary}"\n')
+        self._open    = (f"\n--{boundary}\n"
+                         'Content-Type: text/html; charset="utf-8"\n'
+                         "MIME-Version: 1.0\n"
+                         "Content-Transfer-Encoding: base64\n\n")
+        self._close   = f"\n--{boundary}--\n"
+
+    def build(self, to, body=None, **values):
+        """Raw message for `to`; pass `body` to reuse HTML already rendered."""
+        if body is None:
+            body = self.template.render(**values)
+        body = base64.encodebytes(body.encode('utf-8')).decode('ascii')
+        return ''.join((
+            f"Subject: {_header(self.subject.format(**values))}\n",
+            f"To: {_header(to)}\n",
+            f"Date: {formatdate(localtime=True)}\n",
+            f"Message-ID: {make_msgid(domain='vvwu.attendance')}\n",
+            self._head, self._open, body, self._close,
+        ))
@@ -0,0 +1,119 @@
+"""
+Job Executor — Bounded Worker Pool for Scheduler Tasks
+======================================================
+The scheduler used to start a fresh thread for every task run, so a
+manual "Run" during the 9:30 run sent alerts twice and a slow monthly
+report could pile up threads. JobExecutor runs them on a fixed pool:
+
+  • Workers   — JOB_WORKERS daemon threads; extra jobs wait in a queue
+  • Dedupe    — a task already queued or running is not queued again
+  • Groups    — tasks in the same JOB_GROUPS group (e.g. auto_mark_absent
+                and absent_alerts, which touch the same rows) run one
+                at a time
+  • Timeouts  — a job running past its timeout is reported 'timeout'
+                and its cancel event is set. Python threads can't be
+                killed, so long loops check the event and stop early.
+  • Status    — jobs[task] = {'status', 'triggered_by', 'started',
+                'duration', 'message'}; on_change(task, job) fires on
+                every change (AttendanceScheduler records it in the DB)
+"""
+
+import queue
+import threading
+import time
+from datetime import datetime
+
+JOB_WORKERS  = 3
+JOB_TIMEOUT  = 30 * 60      # seconds, for tasks not listed below
+JOB_TIMEOUTS = {
+    'absent_alerts':      15 * 60,
+    'auto_mark_absent':   5 * 60,
+    'daily_summary':      10 * 60,
+    'archive_attendance': 2 * 60 * 60,
+    'analytics_snapshot': 60 * 60,
+    'attendance_forecast': 15 * 60,
+}
+JOB_GROUPS   = {               # tasks sharing a group never overlap
+    'absent_alerts':      'attendance',
+    'auto_mark_absent':   'attendance',
+    'archive_attendance': 'archive',    # the snapshot reads the rows archiving moves
+    'analytics_snapshot': 'archive',
+    'attendance_forecast': 'archive',   # reads last year's rows too
+}
+
+
+class JobExecutor:
+    def __init__(self, workers=JOB_WORKERS, on_change=None):
+        self.jobs       = {}
+        self.on_change  = on_change
+        self._queue     = queue.Queue()
+        self._lock      = threading.Lock()
+        self._active    = set()
+        self._groups    = {}
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f'scheduler-job-{i + 1}',
+                             daemon=True).start()
+
+    def _update(self, task_name, **fields):
+        with self._lock:
+            job = self.jobs.setdefault(task_name, {})
+            job.update(fields)
+            job = dict(job)
+        if self.on_change:
+            try:
+                self.on_change(task_name, job)
+            except Exception as e:
+                print(f"[JOB ERROR] on_change for {task_name}: {e}")
+
+    def _group_lock(self, task_name):
+        group = JOB_GROUPS.get(task_name, task_name)
+        with self._lock:
+            return self._groups.setdefault(group, threading.Lock())
+
+    def is_busy(self, task_name):
+        with self._lock:
+            return task_name in self._active
+
+    def submit(self, task_name, fn, triggered_by='schedule'):
+        """
+        Queue fn(cancel_event) as `task_name`. Returns False (and queues
+        nothing) if that task is already queued or running.
+        """
+        with self._lock:
+            if task_name in self._active:
+                return False
+            self._active.add(task_name)
+        self._update(task_name, status='queued', triggered_by=triggered_by,
+                     started=None, duration=None, message='')
+        self._queue.put((task_name, fn))
+        return True
+
+    def _timed_out(self, task_name, cancel):
+        cancel.set()
+        self._update(task_name, status='timeout',
+                     message=f"Still running after {JOB_TIMEOUTS.get(task_name, JOB_TIMEOUT)}s")
+
+    def _worker(self):
+        while True:
+            task_name, fn = self._queue.get()
+            cancel = threading.Event()
+            with self._group_lock(task_name):
+                self._update(task_name, status='running', started=datetime.now())
+                timer = threading.Timer(JOB_TIMEOUTS.get(task_name, JOB_TIMEOUT),
+                                        self._timed_out, (task_name, cancel))
+                timer.daemon = True
+                timer.start()
+                t0 = time.perf_counter()
+                try:
+                    fn(cancel)
+                    status, message = ('timeout' if cancel.is_set() else 'done'), ''
+                except Exception as e:
+                    status, message = 'failed', str(e)
+                finally:
+                    timer.cancel()
+                duration = round(time.perf_counter() - t0, 2)
+            with self._lock:
+                self._active.discard(task_name)
+                if status == 'timeout':
+                    message = self.jobs.get(task_name, {}).get('message', '')
+            self._update(task_name, status=status, duration=duration, message=message)
@@ -48,6 +48,10 @@ if __name__ == "__main__":
     def on_close():
         if scheduler: 
             scheduler.stop()
+        from activity_logger import flush_all
+        flush_all()
+        import csv_mirror
+        csv_mirror.flush_all()
         root.destroy()
     root.protocol("WM_DELETE_WINDOW", on_close)
 
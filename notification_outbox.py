@@ -0,0 +1,77 @@
+"""
+Notification Outbox — Durable Alert Queue
+=========================================
+Alerts used to be sent inline and forgotten: if the app closed half-way
+through, or Twilio failed, nothing recorded which parents had been told,
+and a rerun sent everyone a second message. Now:
+
+  1. NotificationRouter.enqueue_absent_alerts() writes one
+     `notification_outbox` row per (student, date, channel). The unique
+     key makes re-enqueueing a no-op.
+  2. OutboxWorker.drain() claims due rows of one channel in batches
+     (SELECT ... FOR UPDATE SKIP LOCKED), sends them through
+     AlertDispatcher and records sent / failed / retry-later on each row.
+
+Rows left in 'sending' by a crash are reclaimed after OUTBOX_CLAIM_TIMEOUT
+(database.py); transient failures are retried with a growing delay up
+to MAX_ATTEMPTS. Demo-mode sends (notification_service.ENABLED = False)
+delete their row, so switching to live mode the same day still sends.
+"""
+
+from datetime import datetime, timedelta
+
+from alert_dispatcher import AlertDispatcher, DEMO
+
+CHANNEL      = 'whatsapp'
+BATCH_SIZE   = 50
+MAX_ATTEMPTS = 5
+RETRY_DELAY  = 60      # seconds before the 2nd attempt, doubled after each
+
+
+class OutboxWorker:
+    def __init__(self, db, dispatcher=None, batch_size=BATCH_SIZE, channel=CHANNEL):
+        self.db         = db
+        self.dispatcher = dispatcher or AlertDispatcher()
+        self.batch_size = batch_size
+        self.channel    = channel
+
+    def _record(self, row, status, detail):
+        if status == 'sent' and detail == DEMO:
+            self.db.delete_notification(row['id'])   # nothing went out — don't block a real send
+        elif status == 'sent':
+            self.db.finish_notification(row['id'], 'sent')
+        elif status == 'deferred' and row['attempts'] < MAX_ATTEMPTS:
+            retry_at = datetime.now() + timedelta(seconds=RETRY_DELAY * 2 ** (row['attempts'] - 1))
+            self.db.finish_notification(row['id'], 'pending', detail, retry_at)
+        else:
+            self.db.finish_notification(row['id'], 'failed', detail)
+
+    def run_once(self, on_result=None):
+        """Claim and send one batch. Returns the dispatcher summary (None if idle)."""
+        rows = self.db.claim_notifications(self.batch_size, self.channel)
+        if not rows:
+            return None
+
+        def done(row, status, detail):
+            try:
+                self._record(row, status, detail)
+            except Exception as e:
+                print(f"[OUTBOX ERROR] Could not record {row['id']}: {e}")
+            if on_result:
+                on_result(row, status, detail)
+
+        return self.dispatcher.send_messages(rows, on_result=done)
+
+    def drain(self, on_result=None):
+        """Send everything currently due. Returns a combined summary."""
+        total = {'total': 0, 'sent': 0, 'failed': 0, 'deferred': 0, 'skipped': 0,
+                 'retries': 0, 'elapsed': 0.0, 'errors': []}
+        while True:
+            summary = self.run_once(on_result)
+            if summary is None:
+                break
+            for key in ('total', 'sent', 'failed', 'deferred', 'skipped', 'retries', 'elapsed'):
+                total[key] += summary[key]
+            total['errors'].extend(summary['errors'])
+        total['elapsed'] = round(total['elapsed'], 2)
+        return total
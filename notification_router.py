@@ -0,0 +1,272 @@
+"""
+Notification Router — WhatsApp, SMS and Email
+=============================================
+Picks a channel per student for each absent alert and sends every channel
+at once:
+
+  • Channels     — WhatsAppChannel / SMSChannel / EmailChannel share one
+                   interface (address, render, send, is_transient, describe).
+                   Add a channel by subclassing Channel and registering it
+                   in CHANNELS.
+  • Preferences  — `contact_preferences` table: ordered channel list and
+                   parent email per student (Students → Edit). Students
+                   without a row, or whose list names no known channel,
+                   use DEFAULT_ORDER.
+  • Fallback     — the first channel the student can be reached on is
+                   queued; if it fails permanently the next one is queued.
+  • Parallel     — drain() runs one outbox worker per channel concurrently,
+                   each with its own rate limit and worker pool.
+
+Everything goes through notification_outbox, so reruns never double-send.
+
+Usage:
+    router = NotificationRouter(db)
+    router.enqueue_absent_alerts(absent_students, date.today())
+    summary = router.drain()
+"""
+
+import json
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import notification_service as ns
+from absence_digest import plan_absent_alerts
+from alert_dispatcher import AlertDispatcher
+from notification_outbox import OutboxWorker, MAX_ATTEMPTS
+
+DEFAULT_ORDER = ('whatsapp', 'sms', 'email')
+
+
+class Channel:
+    name    = ''
+    rate    = 10      # messages / second
+    burst   = 10
+    workers = 4
+
+    def available(self):
+        """False if the channel is not configured at all (skipped by the router)."""
+        return True
+
+    def enabled(self):
+        """False → demo mode: log instead of sending."""
+        return True
+
+    def address(self, student, prefs):
+        """Recipient for this student, or None if they can't be reached here."""
+        raise NotImplementedError
+
+    def render(self, student, day):
+        """Message body stored in the outbox row."""
+        raise NotImplementedError
+
+    def send(self, recipient, body):
+        """Deliver one message; raise on failure."""
+        raise NotImplementedError
+
+    def is_transient(self, exc):
+        return False
+
+    def describe(self, exc, recipient):
+        return f"❌ {self.name} error: {exc}"
+
+    def dispatcher(self):
+        return AlertDispatcher(send=self.send, rate=self.rate, burst=self.burst,
+                               workers=self.workers, transient=self.is_transient,
+                               describe=self.describe, enabled=self.enabled)
+
+
+class WhatsAppChannel(Channel):
+    name = 'whatsapp'
+
+    def enabled(self):
+        return ns.ENABLED
+
+    def address(self, student, prefs):
+        phone, _ = ns.check_recipient(student.get('phone'))
+        return phone
+
+    def render(self, student, day):
+        return ns.absent_message(student['full_name'], student['student_id'],
+                                 student.get('class_name', ''), day.strftime('%d-%m-%Y'),
+                                 student.get('digest'))
+
+    def send(self, recipient, body):
+        return ns.send_whatsapp(recipient, body)
+
+    def is_transient(self, exc):
+        return ns.is_transient(exc)
+
+    def describe(self, exc, recipient):
+        return ns.friendly_error(exc, recipient)
+
+
+class SMSChannel(WhatsAppChannel):
+    name = 'sms'
+    rate = 1          # a single long-code number sends ~1 SMS/second
+    burst = 1
+
+    def available(self):
+        return bool(ns.FROM_SMS)
+
+    def render(self, student, day):
+        return ns.absent_sms_message(student['full_name'], student['student_id'],
+                                     student.get('class_name', ''), day.strftime('%d-%m-%Y'),
+                                     student.get('digest'))
+
+    def send(self, recipient, body):
+        return ns.send_sms(recipient, body)
+
+    def describe(self, exc, recipient):
+        return f"❌ SMS Error ({recipient}): {exc}"
+
+
+class EmailChannel(Channel):
+    name    = 'email'
+    rate    = 20
+    burst   = 20
+    workers = 3       # matches email_alerts.SMTP_POOL_SIZE
+
+    def enabled(self):
+        import email_alerts
+        return email_alerts.ENABLED
+
+    def address(self, student, prefs):
+        email = ((prefs or {}).get('parent_email') or student.get('email') or '').strip()
+        return email if '@' in email else None
+
+    def render(self, student, day):
+        return json.dumps({'student_name': student['full_name'],
+                           'student_id':   student['student_id'],
+                           'class_name':   student.get('class_name') or '',
+                           'date_str':     day.strftime('%d %B %Y'),
+                           'digest':       student.get('digest')}, default=str)
+
+    def send(self, recipient, body):
+        import email_alerts as ea
+        fields = json.loads(body)
+        digest = fields.pop('digest', None)
+        if digest:
+            digest['streak_start'] = date.fromisoformat(digest['streak_start'])
+        msg = ea._absent_mail().build(recipient, **ea._absent_fields(**fields, digest=digest))
+        ea.get_pool().send(msg, [recipient] + ea.CC_EMAILS)
+        print(f"[✅ EMAIL SENT] Absent alert → {recipient}")
+
+    def is_transient(self, exc):
+        if isinstance(exc, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError,
+                            ConnectionError, TimeoutError)):
+            return True
+        code = getattr(exc, 'smtp_code', None)
+        return isinstance(code, int) and 400 <= code < 500
+
+    def describe(self, exc, recipient):
+        return f"❌ Email Error ({recipient}): {exc}"
+
+
+CHANNELS = {c.name: c for c in (WhatsAppChannel(), SMSChannel(), EmailChannel())}
+
+
+class NotificationRouter:
+    def __init__(self, db, channels=None):
+        self.db       = db
+        self.channels = channels or CHANNELS
+        self._lock    = threading.Lock()
+
+    def _order(self, prefs):
+        wanted = [c for c in (prefs or {}).get('channels') or () if c in self.channels]
+        return [c for c in wanted or DEFAULT_ORDER
+                if c in self.channels and self.channels[c].available()]
+
+    def _item(self, student, prefs, day, after=None):
+        """Outbox row for the first usable channel (after `after`, for fallback)."""
+        order = self._order(prefs)
+        if after in order:
+            order = order[order.index(after) + 1:]
+        for name in order:
+            channel   = self.channels[name]
+            recipient = channel.address(student, prefs)
+            if recipient:
+                return {'student_id': student['student_id'], 'date': day, 'channel': name,
+                        'recipient': recipient, 'body': channel.render(student, day)}
+        return None
+
+    def enqueue_absent_alerts(self, students, day):
+        """
+        Queue one alert per student on their preferred reachable channel.
+        Repeat absentees get a digest or nothing (see absence_digest).
+        Returns {'queued', 'duplicates', 'skipped', 'digests', 'suppressed',
+        'by_channel'}.
+        """
+        already = self.db.get_notified_students(day)
+        fresh   = [s for s in students if s['student_id'] not in already]
+        fresh, suppressed = plan_absent_alerts(self.db, fresh, day) if fresh else ([], [])
+        prefs   = self.db.get_contact_preferences([s['student_id'] for s in fresh])
+
+        items, skipped = [], 0
+        for s in fresh:
+            item = self._item(s, prefs.get(s['student_id']), day)
+            if item:
+                items.append(item)
+            else:
+                skipped += 1
+
+        queued = self.db.enqueue_notifications(items) if items else 0
+        by_channel = {}
+        for item in items:
+            by_channel[item['channel']] = by_channel.get(item['channel'], 0) + 1
+        return {'queued': queued,
+                'duplicates': len(students) - len(fresh) - len(suppressed) + len(items) - queued,
+                'skipped': skipped, 'digests': sum(1 for s in fresh if s['digest']),
+                'suppressed': len(suppressed), 'by_channel': by_channel}
+
+    def _fallback(self, row):
+        """Queue the next channel after a permanent failure. True if one was queued."""
+        student = self.db.get_student_by_id(row['student_id'])
+        if not student:
+            return False
+        prefs = self.db.get_contact_preferences([row['student_id']]).get(row['student_id'])
+        item  = self._item(student, prefs, row['date'], after=row['channel'])
+        return bool(item) and self.db.enqueue_notifications([item]) > 0
+
+    def drain(self, on_result=None):
+        """
+        Send everything due on every channel in parallel; keeps going while
+        fallbacks queue more. Returns a summary with a 'by_channel' breakdown.
+        """
+        started = time.perf_counter()
+        total = {'total': 0, 'sent': 0, 'failed': 0, 'deferred': 0, 'skipped': 0,
+                 'retries': 0, 'elapsed': 0.0, 'errors': [], 'fallbacks': 0, 'by_channel': {}}
+        keys  = ('total', 'sent', 'failed', 'deferred', 'retries')
+
+        def done(row, status, detail):
+            exhausted = status == 'failed' or (status == 'deferred' and row['attempts'] >= MAX_ATTEMPTS)
+            if exhausted:
+                try:
+                    if self._fallback(row):
+                        with self._lock:
+                            total['fallbacks'] += 1
+                except Exception as e:
+                    print(f"[ROUTER ERROR] Fallback for {row['student_id']}: {e}")
+            if on_result:
+                on_result(row, status, detail)
+
+        def run(name):
+            worker = OutboxWorker(self.db, self.channels[name].dispatcher(), channel=name)
+            return name, worker.drain(done)
+
+        while True:
+            before = total['fallbacks']
+            with ThreadPoolExecutor(max_workers=len(self.channels),
+                                    thread_name_prefix='router') as ex:
+                results = list(ex.map(run, self.channels))
+            for name, summary in results:
+                per = total['by_channel'].setdefault(name, dict.fromkeys(keys, 0))
+                for key in keys:
+                    per[key]   += summary[key]
+                    total[key] += summary[key]
+                total['errors'].extend(summary['errors'])
+            if total['fallbacks'] == before:
+                total['elapsed'] = round(time.perf_counter() - started, 2)
+                return total
@@ -1,4 +1,8 @@
  
+import threading
+
+from absence_digest import digest_text
+
 # ══════════════════════════════════════════════════════════
 #  ✏️  YOUR TWILIO CONFIG
 # ══════════════════════════════════════════════════════════
@@ -8,7 +12,14 @@ AUTH_TOKEN    = 'eb954e38b4af88702ed9f0f1ff25e353'
 # ✅ This is ALWAYS Twilio's sandbox number — do NOT change this
 FROM_WHATSAPP = 'whatsapp:+14155238886'
 
+# Twilio phone number for plain SMS (leave blank to disable the SMS channel)
+FROM_SMS      = ''
+
 ENABLED       = True   # Set False to run in demo/test mode
+
+# Point the client at a local stub server for load tests, e.g. 'http://127.0.0.1:8099'
+API_BASE_URL  = None
+HTTP_TIMEOUT  = 15     # seconds per request
 # ══════════════════════════════════════════════════════════
 
 
@@ -26,11 +37,149 @@ def _clean_phone(phone):
     return '+' + p              # fallback
 
 
+_client      = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Shared Twilio client — one HTTP session (keep-alive, connection pool)
+    for every message instead of a new Client per student.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from twilio.rest import Client
+                from twilio.http.http_client import TwilioHttpClient
+                client = Client(ACCOUNT_SID, AUTH_TOKEN,
+                                http_client=TwilioHttpClient(timeout=HTTP_TIMEOUT))
+                if API_BASE_URL:
+                    client.api.base_url = API_BASE_URL
+                _client = client
+    return _client
+
+
+def reset_client():
+    """Drop the shared client (after changing credentials or API_BASE_URL)."""
+    global _client
+    with _client_lock:
+        _client = None
+
+
+def absent_message(student_name, student_id, class_name, date_str, digest=None):
+    if digest:
+        status = (f"was marked *ABSENT* on {date_str} and has been "
+                  f"{digest_text(digest)}.\n\n")
+    else:
+        status = f"was marked *ABSENT* on {date_str}.\n\n"
+    return (
+        f"Attendance Alert\n"
+        f"Dear Parent,\n\n"
+        f"Your ward *{student_name}*\n"
+        f"ID: {student_id} | Class: {class_name}\n\n"
+        f"{status}"
+        f"Please contact the college if needed.\n"
+        f"- Vanita Vishram Women's University"
+    )
+
+
+def absent_sms_message(student_name, student_id, class_name, date_str, digest=None):
+    """Single-segment SMS version of the absent alert (no WhatsApp markup)."""
+    if digest:
+        return (f"VVWU Attendance: {student_name} ({student_id}) was ABSENT on {date_str}, "
+                f"{digest['streak']} days in a row; attendance {digest['attendance']}%. "
+                f"Please contact the college.")
+    return (f"VVWU Attendance: {student_name} ({student_id}, {class_name}) "
+            f"was ABSENT on {date_str}. Please contact the college if needed.")
+
+
+def send_sms(phone, body):
+    """Send one SMS from FROM_SMS. Raises on failure."""
+    msg = get_client().messages.create(body=body, from_=FROM_SMS, to=phone)
+    print(f"[✅ SMS SENT] {msg.sid} -> {phone}")
+    return msg.sid
+
+
+def send_whatsapp(phone, body):
+    """Send one WhatsApp message to a cleaned +91 number. Raises on failure."""
+    msg = get_client().messages.create(
+        body=body,
+        from_=FROM_WHATSAPP,
+        to=f'whatsapp:{phone}'
+    )
+    print(f"[✅ WHATSAPP SENT] {msg.sid} -> {phone}")
+    return msg.sid
+
+
+def is_transient(exc):
+    """True for errors worth retrying: throttling, Twilio 5xx, network failures."""
+    status = getattr(exc, 'status', None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    if '20429' in str(exc):
+        return True
+    try:
+        import requests
+        if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+            return True
+    except ImportError:
+        pass
+    return isinstance(exc, (ConnectionError, TimeoutError))
+
+
+def friendly_error(err, phone):
+    """Clear error text based on the Twilio error code."""
+    err = str(err)
+    if '20003' in err:
+        return (
+            "❌ Wrong Twilio credentials!\n"
+            "Check ACCOUNT_SID and AUTH_TOKEN in notification_service.py"
+        )
+    if '63031' in err:
+        return (
+            "❌ From and To are same number!\n"
+            "Student phone cannot be same as Twilio sandbox number."
+        )
+    if '63007' in err or 'not opted in' in err.lower():
+        return (
+            f"❌ {phone} has NOT joined the WhatsApp sandbox!\n\n"
+            f"Parent must do this ONCE:\n"
+            f"1. Open WhatsApp\n"
+            f"2. Send your join code to +14155238886\n"
+            f"   (find code at console.twilio.com -> Messaging -> Try WhatsApp)"
+        )
+    if '21608' in err or 'unverified' in err.lower():
+        return (
+            f"❌ {phone} is not verified in your Twilio trial!\n\n"
+            f"To verify:\n"
+            f"Console -> Phone Numbers -> Verified Caller IDs -> Add number"
+        )
+    return f"❌ WhatsApp Error: {err}"
+
+
+def check_recipient(parent_phone):
+    """
+    Validate a parent phone before sending.
+    Returns (phone, None) or (None, reason).
+    """
+    if not parent_phone:
+        return None, "No phone number"
+    phone = _clean_phone(parent_phone)
+    if not phone:
+        return None, f"Invalid phone number: {parent_phone}"
+    # Safety check — from and to must be different
+    if phone == '+14155238886':
+        return None, "Cannot send to Twilio's own sandbox number!"
+    return phone, None
+
+
 def notify_absent(student_name, student_id, class_name, parent_phone, date_str):
     """
     Send WhatsApp absent alert to parent.
     Called automatically when student is marked absent.
     Skips silently if no phone number saved for student.
+    For many students at once use alert_dispatcher.AlertDispatcher.
     """
     # No phone saved → skip silently
     if not parent_phone:
@@ -43,71 +192,19 @@ def notify_absent(student_name, student_id, class_name, parent_phone, date_str):
         print(f"[WHATSAPP DEMO] Set ENABLED=True to send real messages")
         return True, "Demo mode"
 
-    phone = _clean_phone(parent_phone)
+    phone, reason = check_recipient(parent_phone)
     if not phone:
-        return False, f"Invalid phone number: {parent_phone}"
-
-    # Safety check — from and to must be different
-    if phone == '+14155238886':
-        return False, "Cannot send to Twilio's own sandbox number!"
+        return False, reason
 
     try:
-        from twilio.rest import Client
+        import twilio  # noqa: F401
     except ImportError:
         return False, "Twilio not installed!\nRun: pip install twilio"
 
     try:
-        client = Client(ACCOUNT_SID, AUTH_TOKEN)
-
-        message_body = (
-            f"Attendance Alert\n"
-            f"Dear Parent,\n\n"
-            f"Your ward *{student_name}*\n"
-            f"ID: {student_id} | Class: {class_name}\n\n"
-            f"was marked *ABSENT* on {date_str}.\n\n"
-            f"Please contact the college if needed.\n"
-            f"- Vanita Vishram Women's University"
-        )
-
-        msg = client.messages.create(
-            body=message_body,
-            from_=FROM_WHATSAPP,
-            to=f'whatsapp:{phone}'
-        )
-
-        print(f"[✅ WHATSAPP SENT] {msg.sid} -> {phone}")
+        send_whatsapp(phone, absent_message(student_name, student_id, class_name, date_str))
         return True, f"WhatsApp sent to {phone}"
-
     except Exception as e:
-        err = str(e)
-
-        # Show clear friendly error based on Twilio error code
-        if '20003' in err:
-            friendly = (
-                "❌ Wrong Twilio credentials!\n"
-                "Check ACCOUNT_SID and AUTH_TOKEN in notification_service.py"
-            )
-        elif '63031' in err:
-            friendly = (
-                "❌ From and To are same number!\n"
-                "Student phone cannot be same as Twilio sandbox number."
-            )
-        elif '63007' in err or 'not opted in' in err.lower():
-            friendly = (
-                f"❌ {phone} has NOT joined the WhatsApp sandbox!\n\n"
-                f"Parent must do this ONCE:\n"
-                f"1. Open WhatsApp\n"
-                f"2. Send your join code to +14155238886\n"
-                f"   (find code at console.twilio.com -> Messaging -> Try WhatsApp)"
-            )
-        elif '21608' in err or 'unverified' in err.lower():
-            friendly = (
-                f"❌ {phone} is not verified in your Twilio trial!\n\n"
-                f"To verify:\n"
-                f"Console -> Phone Numbers -> Verified Caller IDs -> Add number"
-            )
-        else:
-            friendly = f"❌ WhatsApp Error: {err}"
-
+        friendly = friendly_error(e, phone)
         print(f"[WHATSAPP ERROR] {friendly}")
-        return False, friendly
\ No newline at end of file
+        return False, friendly
@@ -7,11 +7,11 @@ Generates college-grade attendance PDFs with:
   • Student Individual Report
   • Defaulter List (below 75%)
   • Class Summary Report
+  • All Student Reports in one ZIP (report_batch.py)
 
 Dependencies: pip install reportlab
 """
 
-import os
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from datetime import date, datetime, timedelta
@@ -29,6 +29,8 @@ from reportlab.platypus.flowables import HRFlowable
 from reportlab.graphics.shapes import Drawing, Rect, String
 from reportlab.graphics import renderPDF
 
+import report_queries
+
 # ── Brand Colors (matching Vanita Vishram theme) ────────────────────────────
 BROWN       = colors.HexColor('#8B4513')
 DARK_BROWN  = colors.HexColor('#654321')
@@ -48,6 +50,14 @@ UNIVERSITY  = "Vanita Vishram Women's University"
 DEPARTMENT  = "Department of Computer Science"
 SYSTEM_NAME = "Face Recognition Attendance System"
 
+# Set by report_jobs in its worker process: fn('rows' | 'pages', count)
+_on_progress = None
+
+
+def _progress(event, value):
+    if _on_progress:
+        _on_progress(event, value)
+
 
 # ═══════════════════════════════════════════════════════════════════
 #  Helper: Header / Footer builders
@@ -106,9 +116,19 @@ def _make_doc(path, title, landscape_mode=False):
         author=UNIVERSITY,
         subject=SYSTEM_NAME,
     )
+    doc.setProgressCallBack(lambda kind, value: kind == 'PAGE' and _progress('pages', value))
     return doc
 
 
+def _chart(db, kind, **params):
+    """chart_service PNG path for a report, or None without matplotlib."""
+    try:
+        import chart_service
+        return chart_service.chart(db, kind, **params)
+    except ImportError:
+        return None
+
+
 def _styles():
     s = getSampleStyleSheet()
     base = dict(fontName='Helvetica', spaceAfter=4)
@@ -155,18 +175,18 @@ def generate_daily_report(db, output_path, report_date=None, class_filter=None):
 
     date_str  = str(report_date)
     title     = f"Daily Attendance Report — {report_date.strftime('%d %B %Y')}"
-    records   = db.get_attendance(date_filter=date_str, class_filter=class_filter)
+    records   = report_queries.daily_roster(db, date_str, class_filter)
+    _progress('rows', len(records))
 
     doc   = _make_doc(output_path, title)
     story = []
     S     = _styles()
 
     # ── Summary bar ──────────────────────────────────────────
-    total   = len(records)
-    present = sum(1 for r in records if r.get('status') == 'present')
-    late    = sum(1 for r in records if r.get('status') == 'late')
-    absent  = sum(1 for r in records if r.get('status') == 'absent')
-    pct     = round((present + late) / total * 100, 1) if total else 0
+    totals  = report_queries.grand_total(
+        report_queries.class_totals(db, date_str, class_filter))
+    total, present, late, absent = totals.total, totals.present, totals.late, totals.absent
+    pct     = totals.pct
 
     story.append(Paragraph(f"Date: <b>{report_date.strftime('%A, %d %B %Y')}</b>" +
                            (f"   |   Class: <b>{class_filter}</b>" if class_filter else ""),
@@ -206,16 +226,16 @@ def generate_daily_report(db, output_path, report_date=None, class_filter=None):
     headers = ['#', 'Student ID', 'Full Name', 'Class', 'Time In', 'Time Out', 'Status', 'Marked By']
     rows    = [headers]
     for i, r in enumerate(records, 1):
-        status = (r.get('status') or '').upper()
+        status = (r.status or '').upper()
         rows.append([
             str(i),
-            str(r.get('student_id', '')),
-            str(r.get('full_name', '')),
-            str(r.get('class_name', '')),
-            str(r.get('time_in', '') or '—'),
-            str(r.get('time_out', '') or '—'),
+            str(r.student_id),
+            str(r.full_name or ''),
+            str(r.class_name or ''),
+            str(r.time_in or '—'),
+            str(r.time_out or '—'),
             status,
-            str(r.get('marked_by', '') or 'System'),
+            str(r.marked_by or 'System'),
         ])
 
     col_w = [0.8*cm, 2.2*cm, 4.5*cm, 2.5*cm, 2.2*cm, 2.2*cm, 1.8*cm, 2.8*cm]
@@ -243,7 +263,7 @@ def generate_daily_report(db, output_path, report_date=None, class_filter=None):
     ])
     # Colour status column
     for row_idx, r in enumerate(records, 1):
-        s = (r.get('status') or '').lower()
+        s = (r.status or '').lower()
         if s == 'present':
             ts.add('TEXTCOLOR', (6, row_idx), (6, row_idx), GREEN)
         elif s == 'late':
@@ -267,8 +287,79 @@ def generate_daily_report(db, output_path, report_date=None, class_filter=None):
 #  2. MONTHLY ATTENDANCE REGISTER
 # ═══════════════════════════════════════════════════════════════════
 
+class _LazyStory:
+    """
+    List-like story for doc.build() that pulls flowables from a generator
+    only as ReportLab consumes them, so a long register is never held in
+    memory at once. Supports what build() uses: len, indexing, slicing,
+    del, slice assignment and insert at the front.
+    """
+
+    def __init__(self, flowables):
+        self._it     = iter(flowables)
+        self._buf    = []
+        self._more   = True
+
+    def _fill(self, n):
+        while self._more and len(self._buf) < n:
+            try:
+                self._buf.append(next(self._it))
+            except StopIteration:
+                self._more = False
+
+    def __len__(self):
+        self._fill(1)
+        return len(self._buf) + (1 if self._more else 0)
+
+    def _fill_to(self, i):
+        stop = i.stop if isinstance(i, slice) else i
+        self._fill((stop or 0) + 1)
+
+    def __getitem__(self, i):
+        self._fill_to(i)
+        return self._buf[i]
+
+    def __delitem__(self, i):
+        self._fill_to(i)
+        del self._buf[i]
+
+    def __setitem__(self, i, value):
+        self._buf[i] = value
+
+    def insert(self, i, value):
+        self._buf.insert(i, value)
+
+
+def _register_style(n_fixed, num_days):
+    ts = TableStyle([
+        ('BACKGROUND', (0,0), (-1,0),  BROWN),
+        ('TEXTCOLOR',  (0,0), (-1,0),  WHITE),
+        ('FONTNAME',   (0,0), (-1,0),  'Helvetica-Bold'),
+        ('FONTSIZE',   (0,0), (-1,-1), 6.5),
+        ('ALIGN',      (0,0), (-1,-1), 'CENTER'),
+        ('ALIGN',      (2,1), (2,-1),  'LEFT'),
+        ('ROWBACKGROUNDS', (0,1), (-1,-1), [WHITE, LIGHT_CREAM]),
+        ('GRID',       (0,0), (-1,-1), 0.3, LIGHT_GREY),
+        ('BOX',        (0,0), (-1,-1), 1,   BROWN),
+        ('TOPPADDING',    (0,0), (-1,-1), 3),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 3),
+    ])
+    # Highlight summary cols
+    n = n_fixed + num_days
+    ts.add('BACKGROUND', (n, 0),   (-1, 0),   GOLD)
+    ts.add('BACKGROUND', (n, 1),   (-1, -1),  colors.HexColor('#FFF5E0'))
+    ts.add('FONTNAME',   (n, 1),   (-1, -1),  'Helvetica-Bold')
+    return ts
+
+
 def generate_monthly_register(db, output_path, year=None, month=None, class_filter=None):
-    """Generate a monthly register in landscape format."""
+    """
+    Generate a monthly register in landscape format.
+
+    Streams: the student × day grid is pivoted in SQL
+    (DatabaseManager.iter_monthly_register) and turned into one
+    page-sized table at a time, so memory stays flat for any roster size.
+    """
     import calendar
 
     today = date.today()
@@ -284,36 +375,8 @@ def generate_monthly_register(db, output_path, year=None, month=None, class_filt
     num_days = calendar.monthrange(year, month)[1]
     day_range = list(range(1, num_days + 1))
 
-    # Fetch all records for month
-    all_records = db.get_attendance()
-    month_recs  = [r for r in all_records
-                   if r.get('date') and
-                   r['date'].year == year and r['date'].month == month]
-
-    if class_filter and class_filter != 'All':
-        month_recs = [r for r in month_recs if r.get('class_name') == class_filter]
-
-    # Build student × day grid
-    students = {}
-    for r in month_recs:
-        sid  = r.get('student_id', '')
-        name = r.get('full_name', '')
-        cls  = r.get('class_name', '')
-        if sid not in students:
-            students[sid] = {'name': name, 'class': cls, 'days': {}}
-        d = r['date'].day if r.get('date') else None
-        if d:
-            students[sid]['days'][d] = (r.get('status') or 'absent')[0].upper()
-
-    doc   = _make_doc(output_path, title, landscape_mode=True)
-    story = []
-    S     = _styles()
-
-    story.append(Paragraph(
-        f"Month: <b>{month_name} {year}</b>" +
-        (f"   |   Class: <b>{class_filter}</b>" if class_filter else ""),
-        S['BodySmall']))
-    story.append(Spacer(1, 8))
+    doc = _make_doc(output_path, title, landscape_mode=True)
+    S   = _styles()
 
     # Header row: Sr | Student ID | Name | Class | 1..31 | P | A | L | %
     hdr_fixed = ['Sr', 'Std ID', 'Full Name', 'Class']
@@ -321,52 +384,64 @@ def generate_monthly_register(db, output_path, year=None, month=None, class_filt
     hdr_stats = ['P', 'A', 'L', '%']
     header    = hdr_fixed + hdr_days + hdr_stats
 
-    rows = [header]
-    for i, (sid, info) in enumerate(sorted(students.items()), 1):
-        p = sum(1 for v in info['days'].values() if v == 'P')
-        a = sum(1 for v in info['days'].values() if v == 'A')
-        l = sum(1 for v in info['days'].values() if v == 'L')
-        pct = round((p + l) / num_days * 100, 0) if num_days else 0
-
-        day_cells = [info['days'].get(d, '-') for d in day_range]
-        row = [str(i), sid, info['name'], info['class']] + day_cells + \
-              [str(p), str(a), str(l), f"{pct:.0f}%"]
-        rows.append(row)
-
     # Column widths
     fixed_w = [0.7*cm, 1.8*cm, 4.0*cm, 2.0*cm]
     day_w   = [0.55*cm] * num_days
     stat_w  = [0.7*cm, 0.7*cm, 0.7*cm, 1.0*cm]
     col_w   = fixed_w + day_w + stat_w
 
-    tbl = Table(rows, colWidths=col_w, repeatRows=1)
-    ts  = TableStyle([
-        ('BACKGROUND', (0,0), (-1,0),  BROWN),
-        ('TEXTCOLOR',  (0,0), (-1,0),  WHITE),
-        ('FONTNAME',   (0,0), (-1,0),  'Helvetica-Bold'),
-        ('FONTSIZE',   (0,0), (-1,-1), 6.5),
-        ('ALIGN',      (0,0), (-1,-1), 'CENTER'),
-        ('ALIGN',      (2,1), (2,-1),  'LEFT'),
-        ('ROWBACKGROUNDS', (0,1), (-1,-1), [WHITE, LIGHT_CREAM]),
-        ('GRID',       (0,0), (-1,-1), 0.3, LIGHT_GREY),
-        ('BOX',        (0,0), (-1,-1), 1,   BROWN),
-        ('TOPPADDING',    (0,0), (-1,-1), 3),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 3),
-    ])
-    # Highlight summary cols
-    n = len(fixed_w) + num_days
-    ts.add('BACKGROUND', (n, 0),   (-1, 0),   GOLD)
-    ts.add('BACKGROUND', (n, 1),   (-1, -1),  colors.HexColor('#FFF5E0'))
-    ts.add('FONTNAME',   (n, 1),   (-1, -1),  'Helvetica-Bold')
-    tbl.setStyle(ts)
-
-    story.append(tbl)
-    story.append(Spacer(1, 10))
-    story.append(Paragraph(
-        "Legend:  P = Present   A = Absent   L = Late   - = No Record",
-        S['MetaInfo']))
-
-    doc.build(story,
+    # One style shared by every page table. Rows per page come from a
+    # measured sample row, keeping one spare so no table has to be split.
+    ts    = _register_style(len(fixed_w), num_days)
+    probe = Table([header], colWidths=col_w)
+    probe.setStyle(ts)
+    row_h      = probe.wrap(doc.width, doc.height)[1]
+    page_rows  = int(doc.height // row_h) - 2
+    first_rows = page_rows - 2          # room for the month line on page 1
+
+    students = db.iter_monthly_register(
+        year, month, class_filter if class_filter and class_filter != 'All' else None)
+
+    def rows():
+        for i, rec in enumerate(students, 1):
+            if i % 100 == 0:
+                _progress('rows', i)
+            p, a, l = int(rec['p'] or 0), int(rec['a'] or 0), int(rec['l'] or 0)
+            pct = round((p + l) / num_days * 100, 0) if num_days else 0
+            day_cells = [rec[f'd{d}'] or '-' for d in day_range]
+            yield ([str(i), rec['student_id'], rec['full_name'] or '', rec['class_name'] or '']
+                   + day_cells + [str(p), str(a), str(l), f"{pct:.0f}%"])
+
+    def story():
+        yield Paragraph(
+            f"Month: <b>{month_name} {year}</b>" +
+            (f"   |   Class: <b>{class_filter}</b>" if class_filter else ""),
+            S['BodySmall'])
+        yield Spacer(1, 8)
+
+        chunk, limit, first = [header], first_rows, True
+        for row in rows():
+            chunk.append(row)
+            if len(chunk) > limit:
+                if not first:
+                    yield PageBreak()
+                tbl = Table(chunk, colWidths=col_w)
+                tbl.setStyle(ts)
+                yield tbl
+                chunk, limit, first = [header], page_rows, False
+        if len(chunk) > 1 or first:
+            if not first:
+                yield PageBreak()
+            tbl = Table(chunk, colWidths=col_w)
+            tbl.setStyle(ts)
+            yield tbl
+
+        yield Spacer(1, 10)
+        yield Paragraph(
+            "Legend:  P = Present   A = Absent   L = Late   - = No Record",
+            S['MetaInfo'])
+
+    doc.build(_LazyStory(story()),
               onFirstPage=lambda c, d: _header_footer(c, d, title),
               onLaterPages=lambda c, d: _header_footer(c, d, title))
     return output_path
@@ -379,33 +454,9 @@ def generate_monthly_register(db, output_path, year=None, month=None, class_filt
 def generate_defaulter_list(db, output_path, threshold=75):
     """Generate list of students with attendance below threshold%."""
 
-    title   = f"Attendance Defaulter List  (Below {threshold}%)"
-    records = db.get_attendance()
-
-    # Aggregate per student
-    students = {}
-    for r in records:
-        sid  = r.get('student_id', '')
-        if not sid:
-            continue
-        if sid not in students:
-            students[sid] = {
-                'name': r.get('full_name', ''),
-                'class': r.get('class_name', ''),
-                'total': 0, 'present': 0, 'late': 0, 'absent': 0
-            }
-        students[sid]['total'] += 1
-        s = (r.get('status') or '').lower()
-        if s == 'present': students[sid]['present'] += 1
-        elif s == 'late':  students[sid]['late']    += 1
-        else:              students[sid]['absent']   += 1
-
-    defaulters = []
-    for sid, info in students.items():
-        pct = (info['present'] + info['late']) / info['total'] * 100 if info['total'] else 0
-        if pct < threshold:
-            defaulters.append({**info, 'student_id': sid, 'pct': round(pct, 1)})
-    defaulters.sort(key=lambda x: x['pct'])
+    title      = f"Attendance Defaulter List  (Below {threshold}%)"
+    defaulters = report_queries.defaulters(db, threshold)
+    _progress('rows', len(defaulters))
 
     doc   = _make_doc(output_path, title)
     story = []
@@ -438,11 +489,11 @@ def generate_defaulter_list(db, output_path, threshold=75):
                'Total Days', 'Present', 'Late', 'Absent', 'Attendance %', 'Shortfall']
     rows    = [headers]
     for i, d in enumerate(defaulters, 1):
-        shortfall = max(0, round(threshold - d['pct'], 1))
+        shortfall = max(0, round(threshold - d.pct, 1))
         rows.append([
-            str(i), d['student_id'], d['name'], d['class'],
-            str(d['total']), str(d['present']), str(d['late']), str(d['absent']),
-            f"{d['pct']}%", f"{shortfall}%"
+            str(i), d.student_id, d.full_name or '', d.class_name or '',
+            str(d.total), str(d.present), str(d.late), str(d.absent),
+            f"{d.pct}%", f"{shortfall}%"
         ])
 
     col_w = [0.7*cm, 2.2*cm, 4.2*cm, 2.2*cm, 2*cm, 1.8*cm, 1.5*cm, 1.8*cm, 2.4*cm, 2*cm]
@@ -474,12 +525,62 @@ def generate_defaulter_list(db, output_path, threshold=75):
             ParagraphStyle('Good', fontName='Helvetica-Bold', fontSize=11,
                            textColor=GREEN, alignment=TA_CENTER)))
 
+    story.extend(_early_warnings(db, threshold, S))
+
     doc.build(story,
               onFirstPage=lambda c, d: _header_footer(c, d, title),
               onLaterPages=lambda c, d: _header_footer(c, d, title))
     return output_path
 
 
+def _early_warnings(db, threshold, S):
+    """Students above the threshold now but projected under it (attendance_forecast table)."""
+    from attendance_forecast import THRESHOLD
+    if threshold != THRESHOLD:
+        return []
+    try:
+        at_risk = db.get_attendance_forecast(risks=['at_risk'])
+    except Exception:
+        return []           # table not created yet
+    if not at_risk:
+        return []
+
+    rows = [['#', 'Student ID', 'Full Name', 'Class', 'Term %', 'Last 30 Days',
+             'Trend / Week', 'Projected %']]
+    for i, r in enumerate(at_risk, 1):
+        trend = r.get('trend')
+        rows.append([str(i), r['student_id'], r.get('full_name') or '', r.get('class_name') or '',
+                     f"{r['pct']}%", f"{r['pct_30d']}%" if r.get('pct_30d') is not None else '—',
+                     f"{trend:+.1f}" if trend is not None else '—', f"{r['projected_pct']}%"])
+    tbl = Table(rows, colWidths=[0.7*cm, 2.2*cm, 4.4*cm, 2.2*cm, 1.8*cm, 2.2*cm, 2.2*cm, 2.4*cm],
+                repeatRows=1)
+    tbl.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,0),  ORANGE),
+        ('TEXTCOLOR',  (0,0), (-1,0),  WHITE),
+        ('FONTNAME',   (0,0), (-1,0),  'Helvetica-Bold'),
+        ('FONTSIZE',   (0,0), (-1,-1), 8),
+        ('ALIGN',      (0,0), (-1,-1), 'CENTER'),
+        ('ALIGN',      (2,1), (2,-1),  'LEFT'),
+        ('ROWBACKGROUNDS', (0,1), (-1,-1), [WHITE, colors.HexColor('#FFF8EC')]),
+        ('GRID',       (0,0), (-1,-1), 0.4, LIGHT_GREY),
+        ('BOX',        (0,0), (-1,-1), 1, ORANGE),
+        ('TEXTCOLOR',  (7,1), (7,-1),  RED),
+        ('FONTNAME',   (7,1), (7,-1),  'Helvetica-Bold'),
+        ('TOPPADDING',    (0,0), (-1,-1), 5),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 5),
+    ]))
+    return [
+        Spacer(1, 16),
+        Paragraph("Early Warning — Projected to Fall Below "
+                  f"{threshold}% by Term End", S['SectionTitle']),
+        Paragraph(f"{len(at_risk)} student(s) are above {threshold}% this term but, at their "
+                  "last-30-day rate, will finish below it. "
+                  f"Forecast of {str(at_risk[0]['computed_at'])[:16]}.", S['BodySmall']),
+        Spacer(1, 6),
+        tbl,
+    ]
+
+
 # ═══════════════════════════════════════════════════════════════════
 #  4. CLASS SUMMARY REPORT
 # ═══════════════════════════════════════════════════════════════════
@@ -491,16 +592,8 @@ def generate_class_summary(db, output_path, report_date=None):
         report_date = date.today()
 
     title   = f"Class-Wise Attendance Summary — {report_date.strftime('%d %B %Y')}"
-    records = db.get_attendance(date_filter=str(report_date))
-
-    # Group by class
-    classes = {}
-    for r in records:
-        cls = r.get('class_name', 'Unknown')
-        if cls not in classes:
-            classes[cls] = {'present': 0, 'absent': 0, 'late': 0}
-        s = (r.get('status') or '').lower()
-        classes[cls][s if s in ('present','absent','late') else 'absent'] += 1
+    classes = report_queries.class_totals(db, str(report_date))
+    _progress('rows', len(classes))
 
     doc   = _make_doc(output_path, title)
     story = []
@@ -514,23 +607,17 @@ def generate_class_summary(db, output_path, report_date=None):
 
     headers = ['#', 'Class', 'Total Students', 'Present', 'Late', 'Absent', 'Attendance %']
     rows    = [headers]
-    grand   = {'total': 0, 'present': 0, 'late': 0, 'absent': 0}
 
-    for i, (cls, data) in enumerate(sorted(classes.items()), 1):
-        total = data['present'] + data['absent'] + data['late']
-        pct   = round((data['present'] + data['late']) / total * 100, 1) if total else 0
-        rows.append([str(i), cls, str(total),
-                     str(data['present']), str(data['late']), str(data['absent']),
-                     f"{pct}%"])
-        for k in grand:
-            grand[k] += data.get(k, 0) if k != 'total' else total
+    for i, c in enumerate(classes, 1):
+        rows.append([str(i), c.class_name, str(c.total),
+                     str(c.present), str(c.late), str(c.absent),
+                     f"{c.pct}%"])
 
     # Grand total row
-    grand_pct = round((grand['present'] + grand['late']) / grand['total'] * 100, 1) \
-                if grand['total'] else 0
-    rows.append(['', 'TOTAL', str(grand['total']),
-                 str(grand['present']), str(grand['late']), str(grand['absent']),
-                 f"{grand_pct}%"])
+    grand = report_queries.grand_total(classes)
+    rows.append(['', 'TOTAL', str(grand.total),
+                 str(grand.present), str(grand.late), str(grand.absent),
+                 f"{grand.pct}%"])
 
     col_w = [0.8*cm, 4*cm, 3.2*cm, 2.5*cm, 2*cm, 2*cm, 3*cm]
     tbl   = Table(rows, colWidths=col_w, repeatRows=1)
@@ -558,6 +645,13 @@ def generate_class_summary(db, output_path, report_date=None):
     tbl.setStyle(ts)
     story.append(tbl)
 
+    chart = _chart(db, 'class_heatmap', end=report_date)
+    if chart:
+        from chart_service import pdf_image
+        story.append(Spacer(1, 14))
+        story.append(KeepTogether([Paragraph("Recent Trend", S['SectionTitle']),
+                                   pdf_image(chart, doc.width)]))
+
     doc.build(story,
               onFirstPage=lambda c, d: _header_footer(c, d, title),
               onLaterPages=lambda c, d: _header_footer(c, d, title))
@@ -571,17 +665,29 @@ def generate_class_summary(db, output_path, report_date=None):
 def generate_student_report(db, output_path, student_id):
     """Generate individual attendance report for a single student."""
 
-    records = db.get_attendance(student_filter=student_id)
+    records = report_queries.student_history(db, student_id)
+    _progress('rows', len(records))
     if not records:
         raise ValueError(f"No attendance records found for student ID: {student_id}")
+    build_student_report(output_path, student_id, [r._asdict() for r in records],
+                         chart=_chart(db, 'student_trend', student_id=student_id))
+    return output_path
+
 
-    student_name = records[0].get('full_name', student_id)
-    class_name   = records[0].get('class_name', '')
+def build_student_report(output_path, student_id, records, S=None, chart=None):
+    """
+    Render one student's report from their attendance rows. output_path may
+    be a file object; S lets batch runs share one style sheet; chart is a
+    chart_service PNG to show above the details. Returns the page count.
+    """
+    records      = sorted(records, key=lambda x: x.get('date') or date.min)
+    student_name = records[-1].get('full_name', student_id)
+    class_name   = records[-1].get('class_name', '')
     title        = f"Student Attendance Report — {student_name}"
 
     doc   = _make_doc(output_path, title)
     story = []
-    S     = _styles()
+    S     = S or _styles()
 
     # Student info box
     total   = len(records)
@@ -651,12 +757,17 @@ def generate_student_report(db, output_path, student_id):
                                            textColor=note_color)))
     story.append(Spacer(1, 10))
 
+    if chart:
+        from chart_service import pdf_image
+        story.append(pdf_image(chart, doc.width))
+        story.append(Spacer(1, 10))
+
     # Detailed records
     story.append(Paragraph("Attendance Details", S['SectionTitle']))
 
     headers = ['#', 'Date', 'Day', 'Time In', 'Time Out', 'Status', 'Marked By']
     rows    = [headers]
-    for i, r in enumerate(sorted(records, key=lambda x: x.get('date', date.min)), 1):
+    for i, r in enumerate(records, 1):
         d   = r.get('date')
         day = d.strftime('%A') if d else ''
         rows.append([
@@ -694,7 +805,7 @@ def generate_student_report(db, output_path, student_id):
     doc.build(story,
               onFirstPage=lambda c, d: _header_footer(c, d, title),
               onLaterPages=lambda c, d: _header_footer(c, d, title))
-    return output_path
+    return doc.page
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -715,7 +826,7 @@ class PDFReportGenerator:
     def show_dialog(self, parent):
         win = tk.Toplevel(parent)
         win.title("Generate PDF Report")
-        win.geometry("500x540")
+        win.geometry("500x570")
         win.configure(bg=self.COLORS['bg'])
         win.resizable(False, False)
         win.grab_set()
@@ -742,6 +853,7 @@ class PDFReportGenerator:
             ("⚠️   Defaulter List (< 75%)",    'defaulter'),
             ("🏫  Class-Wise Summary",         'class_summary'),
             ("👤  Student Individual Report",  'student'),
+            ("👥  All Student Reports (ZIP)",  'student_batch'),
         ]
         for label, val in types:
             tk.Radiobutton(body, text=label, variable=self.report_type,
@@ -821,6 +933,12 @@ class PDFReportGenerator:
             tk.Entry(self.fields_frame, textvariable=self.date_var, width=18,
                      font=('Segoe UI', 10)).pack(anchor='w', padx=10)
 
+        elif rt == 'student_batch':
+            self._lbl("Class (leave blank for All):")
+            self.class_var = tk.StringVar()
+            tk.Entry(self.fields_frame, textvariable=self.class_var, width=18,
+                     font=('Segoe UI', 10)).pack(anchor='w', padx=10)
+
         elif rt == 'student':
             self._lbl("Student ID:")
             self.student_id_var = tk.StringVar()
@@ -840,11 +958,13 @@ class PDFReportGenerator:
             'defaulter':    f"defaulter_list_{date.today()}.pdf",
             'class_summary':f"class_summary_{date.today()}.pdf",
             'student':      f"student_report.pdf",
+            'student_batch':f"student_reports_{date.today()}.zip",
         }.get(rt, "report.pdf")
+        ext = '.zip' if rt == 'student_batch' else '.pdf'
 
         path = filedialog.asksaveasfilename(
-            defaultextension='.pdf',
-            filetypes=[('PDF Files', '*.pdf')],
+            defaultextension=ext,
+            filetypes=[('ZIP Archives', '*.zip')] if ext == '.zip' else [('PDF Files', '*.pdf')],
             initialfile=default_name,
             title="Save PDF Report As")
 
@@ -856,45 +976,46 @@ class PDFReportGenerator:
                 d_str = getattr(self, 'date_var', tk.StringVar()).get()
                 d = datetime.strptime(d_str, '%Y-%m-%d').date() if d_str else date.today()
                 cls = getattr(self, 'class_var', tk.StringVar()).get().strip() or None
-                generate_daily_report(self.db, path, d, cls)
+                kind, params = 'daily', dict(report_date=d, class_filter=cls)
+                label = f"Daily report — {d}" + (f" ({cls})" if cls else "")
 
             elif rt == 'monthly':
                 y   = int(self.year_var.get() or date.today().year)
                 m   = int(self.month_var.get() or date.today().month)
                 cls = self.class_var.get().strip() or None
-                generate_monthly_register(self.db, path, y, m, cls)
+                kind, params = 'register', dict(year=y, month=m, class_filter=cls)
+                label = f"Monthly register — {y}-{m:02d}" + (f" ({cls})" if cls else "")
 
             elif rt == 'defaulter':
                 thr = int(self.threshold_var.get() or 75)
-                generate_defaulter_list(self.db, path, thr)
+                kind, params = 'defaulters', dict(threshold=thr)
+                label = f"Defaulter list (< {thr}%)"
 
             elif rt == 'class_summary':
                 d_str = self.date_var.get()
                 d = datetime.strptime(d_str, '%Y-%m-%d').date() if d_str else date.today()
-                generate_class_summary(self.db, path, d)
+                kind, params = 'classes', dict(report_date=d)
+                label = f"Class summary — {d}"
 
             elif rt == 'student':
                 sid = self.student_id_var.get().strip()
                 if not sid:
                     messagebox.showerror("Error", "Please enter a Student ID.", parent=win)
                     return
-                generate_student_report(self.db, path, sid)
+                kind, params = 'student', dict(student_id=sid)
+                label = f"Student report — {sid}"
+
+            elif rt == 'student_batch':
+                cls = self.class_var.get().strip() or None
+                kind, params = 'student_batch', dict(class_filter=cls)
+                label = "All student reports" + (f" ({cls})" if cls else "")
 
-            messagebox.showinfo("Success",
-                f"PDF report saved successfully!\n\n{path}", parent=win)
-            win.destroy()
+        except ValueError as e:
+            messagebox.showerror("Invalid Input", str(e), parent=win)
+            return
 
-            # Try to open the PDF
-            try:
-                import subprocess, sys
-                if sys.platform == 'win32':
-                    os.startfile(path)
-                elif sys.platform == 'darwin':
-                    subprocess.call(['open', path])
-                else:
-                    subprocess.call(['xdg-open', path])
-            except Exception:
-                pass
-
-        except Exception as e:
-            messagebox.showerror("PDF Generation Error", str(e), parent=win)
+        # Rendered in a background process; the Report Jobs window shows progress
+        import report_jobs
+        report_jobs.submit(self.db, kind, path, label, parent=win.master,
+                           open_when_done=(kind != 'student_batch'), **params)
+        win.destroy()
@@ -0,0 +1,139 @@
+"""
+Report Batch — Every Student's PDF in One Run
+=============================================
+Semester-end reports used to mean one generate_student_report() call per
+student — 5,000 separate attendance queries, each PDF rendered in turn.
+generate_student_reports() instead:
+
+  • reads all the attendance it needs in ONE ordered query, streamed
+    student by student (DatabaseManager.iter_attendance_by_student)
+  • renders PDFs across a process pool; each worker builds the ReportLab
+    style sheet once and reuses it for every student it gets, and draws
+    the same weekly-trend chart as generate_student_report() from the rows
+    it was handed (chart_service.student_trend_file)
+  • writes into a folder (one PDF per student) or a single .zip
+  • reports progress(done, total, pages_per_sec) as PDFs finish
+
+Only a few students are in flight at a time (workers × IN_FLIGHT), so
+memory stays flat however many students there are.
+
+Usage:
+    from report_batch import generate_student_reports
+    result = generate_student_reports(db, 'reports_2026.zip', class_filter='BCA-1')
+    print(result['pages_per_sec'])
+"""
+
+import io
+import os
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+BATCH_WORKERS = min(4, os.cpu_count() or 1)
+IN_FLIGHT     = 4       # queued students per worker
+ROW_FIELDS    = ('full_name', 'class_name', 'date', 'time_in', 'time_out', 'status', 'marked_by')
+
+_styles = None
+
+
+def _render(student_id, records):
+    """Worker: one student's PDF as bytes. Returns (student_id, pdf_bytes, pages)."""
+    global _styles
+    import pdf_reports
+    if _styles is None:
+        _styles = pdf_reports._styles()
+    buf = io.BytesIO()
+    with tempfile.TemporaryDirectory(prefix='report_batch_') as tmp:
+        try:
+            import chart_service
+            chart = chart_service.student_trend_file(records, os.path.join(tmp, 'trend.png'))
+        except ImportError:
+            chart = None        # no matplotlib — same as generate_student_report()
+        pages = pdf_reports.build_student_report(buf, student_id, records, _styles, chart=chart)
+    return student_id, buf.getvalue(), pages
+
+
+def _file_name(student_id):
+    safe = ''.join(c if c.isalnum() or c in '-_' else '_' for c in str(student_id))
+    return f"student_report_{safe}.pdf"
+
+
+class _Writer:
+    """Puts finished PDFs into a folder or a zip archive."""
+
+    def __init__(self, output):
+        self.output = output
+        if output.lower().endswith('.zip'):
+            os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+            # PDFs are already compressed — store them as-is
+            self._zip = zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED)
+        else:
+            os.makedirs(output, exist_ok=True)
+            self._zip = None
+
+    def write(self, student_id, data):
+        name = _file_name(student_id)
+        if self._zip:
+            self._zip.writestr(name, data)
+        else:
+            with open(os.path.join(self.output, name), 'wb') as f:
+                f.write(data)
+
+    def close(self):
+        if self._zip:
+            self._zip.close()
+
+
+def generate_student_reports(db, output, student_ids=None, class_filter=None,
+                             date_from=None, date_to=None, workers=None, progress=None):
+    """
+    Render a report for every student with attendance (optionally only
+    `student_ids` / `class_filter` / a date range) into `output` — a folder,
+    or a .zip file. progress(done, total, pages_per_sec) is called from this
+    thread after each PDF.
+
+    Returns {'students', 'pages', 'elapsed', 'pages_per_sec', 'errors', 'output'}.
+    """
+    started = time.perf_counter()
+    total   = db.count_students_with_attendance(student_ids, class_filter, date_from, date_to)
+    result  = {'students': 0, 'pages': 0, 'elapsed': 0.0, 'pages_per_sec': 0.0,
+               'errors': [], 'output': output}
+    writer  = _Writer(output)
+    workers = workers or BATCH_WORKERS
+
+    def collect(done_futures):
+        for future in done_futures:
+            student_id = pending.pop(future)
+            try:
+                sid, data, pages = future.result()
+                writer.write(sid, data)
+                result['students'] += 1
+                result['pages']    += pages
+            except Exception as e:
+                result['errors'].append((student_id, str(e)))
+                print(f"[REPORT ERROR] {student_id}: {e}")
+            if progress:
+                elapsed = time.perf_counter() - started
+                progress(result['students'] + len(result['errors']), total,
+                         round(result['pages'] / elapsed, 1) if elapsed else 0.0)
+
+    pending = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = db.iter_attendance_by_student(student_ids, class_filter, date_from, date_to)
+            for student_id, records in rows:
+                slim = [{k: r.get(k) for k in ROW_FIELDS} for r in records]
+                pending[pool.submit(_render, student_id, slim)] = student_id
+                if len(pending) >= workers * IN_FLIGHT:
+                    collect(wait(pending, return_when=FIRST_COMPLETED).done)
+            while pending:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+    finally:
+        writer.close()
+
+    result['elapsed']       = round(time.perf_counter() - started, 2)
+    result['pages_per_sec'] = round(result['pages'] / result['elapsed'], 1) if result['elapsed'] else 0.0
+    print(f"[REPORT] {result['students']} student reports, {result['pages']} pages "
+          f"in {result['elapsed']}s ({result['pages_per_sec']} pages/s) → {output}")
+    return result
@@ -0,0 +1,140 @@
+"""
+Report Cache — Reuse PDFs Whose Data Hasn't Changed
+===================================================
+Teachers regenerate the same daily report or monthly register over and
+over. render() keeps every PDF it builds under report_cache/, keyed by
+
+  • report kind and parameters (defaults filled in, so "today" is a date)
+  • the attendance watermark of the report's date range
+    (DatabaseManager.get_attendance_watermark: COUNT / MAX(id) /
+    MAX(updated_at)), so any insert, edit or delete in range is a miss
+  • today's date — every page footer says when it was generated, so a
+    PDF is reused on the day it was built only
+  • for the defaulter list, when attendance_forecast last ran
+
+A hit is a file copy. The folder is trimmed to CACHE_MAX_MB, least
+recently used first (hits refresh a file's mtime). Files are written to a
+temp name and renamed, so the scheduler's worker processes and the UI can
+share one cache.
+
+Usage:
+    from report_cache import render
+    hit = render(db, 'register', 'out.pdf', year=2026, month=3, class_filter='BCA-1')
+"""
+
+import calendar
+import hashlib
+import os
+import shutil
+import threading
+import time
+from datetime import date, timedelta
+
+from chart_service import CLASS_TREND_DAYS
+
+REPORT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'report_cache')
+CACHE_MAX_MB     = 200
+
+
+def _generator(kind):
+    import pdf_reports
+    return {
+        'daily':      pdf_reports.generate_daily_report,
+        'register':   pdf_reports.generate_monthly_register,
+        'defaulters': pdf_reports.generate_defaulter_list,
+        'classes':    pdf_reports.generate_class_summary,
+        'student':    pdf_reports.generate_student_report,
+    }[kind]
+
+
+def _with_defaults(kind, params):
+    params = dict(params)
+    today  = date.today()
+    if kind in ('daily', 'classes'):
+        params['report_date'] = params.get('report_date') or today
+    elif kind == 'register':
+        params['year']  = params.get('year')  or today.year
+        params['month'] = params.get('month') or today.month
+    return params
+
+
+def _scope(kind, params):
+    """Date range whose attendance the report reads (None = whole table)."""
+    if kind == 'daily':
+        return params['report_date'], params['report_date']
+    if kind == 'classes':           # includes the trend chart
+        return params['report_date'] - timedelta(days=CLASS_TREND_DAYS - 1), params['report_date']
+    if kind == 'register':
+        y, m = params['year'], params['month']
+        return date(y, m, 1), date(y, m, calendar.monthrange(y, m)[1])
+    return None, None
+
+
+def _cache_path(db, kind, params):
+    key = repr((
+        db.backend.name, kind,
+        sorted((k, str(v)) for k, v in params.items() if v is not None),
+        db.get_attendance_watermark(*_scope(kind, params)),
+        str(date.today()),
+        str(db.get_forecast_computed_at()) if kind == 'defaulters' else None,
+    ))
+    return os.path.join(REPORT_CACHE_DIR, hashlib.sha1(key.encode()).hexdigest() + '.pdf')
+
+
+def render(db, kind, output_path, **params):
+    """
+    Write report `kind` ('daily', 'register', 'defaulters', 'classes',
+    'student') with pdf_reports' keyword params to output_path.
+    Returns True if it came from the cache.
+    """
+    params = _with_defaults(kind, params)
+    path   = _cache_path(db, kind, params)
+    try:
+        shutil.copyfile(path, output_path)
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        pass
+
+    os.makedirs(REPORT_CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        _generator(kind)(db, tmp, **params)
+        shutil.copyfile(tmp, output_path)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    _evict()
+    return False
+
+
+def _evict(folder=REPORT_CACHE_DIR, suffix='.pdf', max_mb=CACHE_MAX_MB):
+    """Drop least recently used files until the folder fits max_mb."""
+    files, stale = [], time.time() - 3600
+    for entry in os.scandir(folder):
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        if entry.name.endswith(suffix):
+            files.append((st.st_mtime, st.st_size, entry.path))
+        elif entry.name.endswith('.tmp') and st.st_mtime < stale:
+            try:
+                os.remove(entry.path)   # left by a report job that was terminated
+            except OSError:
+                pass
+    total = sum(size for _, size, _ in files)
+    limit = max_mb * 1024 * 1024
+    for _, size, path in sorted(files):
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+
+def clear():
+    shutil.rmtree(REPORT_CACHE_DIR, ignore_errors=True)
@@ -0,0 +1,401 @@
+"""
+Report Jobs — Background Report Generation
+==========================================
+PDFs and attendance exports used to be built on the Tk thread, freezing the
+whole window for large reports. submit() queues them instead:
+
+  • each job runs in its own spawned process (ReportLab and the exporters are
+    CPU-bound, and a process can be stopped), one job at a time in
+    submission order
+  • the worker streams progress back — rows fetched, pages rendered,
+    students done — over a multiprocessing queue
+  • cancel() drops a queued job; a running one is asked to stop at its
+    next progress tick and terminated if it hasn't within CANCEL_GRACE
+    seconds. Partial output is deleted.
+  • the Report Jobs window lists queued / running / finished jobs with a
+    progress bar, Cancel and Open; submit() brings it up, and finished
+    PDFs open by themselves as before
+
+Usage:
+    import report_jobs
+    report_jobs.submit(db, 'register', path, "Register — Mar 2026",
+                       parent=win, year=2026, month=3)
+"""
+
+import atexit
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import tkinter as tk
+from tkinter import ttk
+
+CANCEL_GRACE  = 3       # seconds a cancelled job gets to stop by itself
+KEEP_FINISHED = 20      # finished jobs listed in the window
+
+# Spawn, not fork: forking a process that runs Tk (and threads) is unsafe
+_ctx = multiprocessing.get_context('spawn')
+
+
+class ReportCancelled(Exception):
+    pass
+
+
+# ══════════════════════════════════════════════════════════
+#  WORKER PROCESS
+# ══════════════════════════════════════════════════════════
+def _end_children(cancel):
+    """
+    Job process: once cancelled, give the job half of CANCEL_GRACE to stop
+    by itself, then end the processes it started (report_batch's pool
+    workers) — terminating the job process alone would leave them running.
+    """
+    cancel.wait()
+    time.sleep(CANCEL_GRACE / 2)
+    for child in multiprocessing.active_children():
+        child.terminate()
+
+
+def _worker(backend, kind, output, params, events, cancel):
+    threading.Thread(target=_end_children, args=(cancel,), daemon=True).start()
+
+    def progress(event, value):
+        if cancel.is_set():
+            raise ReportCancelled()
+        events.put((event, value))
+
+    try:
+        import pdf_reports
+        from database import DatabaseManager
+        pdf_reports._on_progress = progress
+        db     = DatabaseManager(backend)
+        result = {}
+
+        if kind == 'export':
+            import attendance_export
+            on_rows = lambda n: progress('rows', n)
+            if 'records' in params:
+                rows = attendance_export.export_records(params['records'], output, progress=on_rows)
+            else:
+                rows = attendance_export.export_attendance(db, output, progress=on_rows, **params)
+            result['message'] = f"{rows} rows exported"
+
+        elif kind == 'student_batch':
+            from report_batch import generate_student_reports
+            res = generate_student_reports(
+                db, output, progress=lambda done, total, _: progress('students', (done, total)),
+                **params)
+            result['message'] = (f"{res['students']} reports, {res['pages']} pages "
+                                 f"({res['pages_per_sec']} pages/s)")
+            if res['errors']:
+                result['message'] += f", {len(res['errors'])} failed"
+
+        else:
+            import report_cache
+            result['cached']  = report_cache.render(db, kind, output, **params)
+            result['message'] = "Unchanged — from report cache" if result['cached'] else "Saved"
+
+        events.put(('done', result))
+    except ReportCancelled:
+        events.put(('cancelled', None))
+    except Exception as e:
+        events.put(('error', str(e)))
+
+
+# ══════════════════════════════════════════════════════════
+#  RUNNER (UI process)
+# ══════════════════════════════════════════════════════════
+class ReportJobRunner:
+    def __init__(self):
+        self.jobs    = []
+        self._lock   = threading.Lock()
+        self._wake   = threading.Event()
+        self._ids    = itertools.count(1)
+        self._proc   = None
+        threading.Thread(target=self._loop, name='report-jobs', daemon=True).start()
+        atexit.register(self.shutdown)
+
+    def submit(self, db, kind, output, label, open_when_done=False, **params):
+        job = {
+            'id': next(self._ids), 'label': label, 'kind': kind, 'output': output,
+            'backend': db.backend.name, 'params': params, 'status': 'queued',
+            'rows': 0, 'pages': 0, 'students': None, 'message': '', 'cached': False,
+            'elapsed': None, 'open_when_done': open_when_done, 'cancel': None,
+        }
+        with self._lock:
+            self.jobs.append(job)
+            finished = [j for j in self.jobs if j['status'] not in ('queued', 'running')]
+            for old in finished[:-KEEP_FINISHED]:
+                self.jobs.remove(old)
+        self._wake.set()
+        return job['id']
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = next((j for j in self.jobs if j['id'] == job_id), None)
+            if not job:
+                return
+            if job['status'] == 'queued':
+                job.update(status='cancelled', params=None)
+            elif job['status'] == 'running':
+                job['cancel'].set()
+                job['message'] = "Cancelling…"
+
+    def snapshot(self):
+        with self._lock:
+            return [{k: v for k, v in j.items() if k not in ('params', 'cancel')}
+                    for j in self.jobs]
+
+    def shutdown(self):
+        """At exit: stop the running job, its pool workers included, and delete its partial output."""
+        proc = self._proc
+        with self._lock:
+            job = next((j for j in self.jobs if j['status'] == 'running'), None)
+        if proc is None or job is None:
+            return
+        if job['cancel'] is not None:
+            job['cancel'].set()               # the job process ends its own children
+        proc.join(CANCEL_GRACE)
+        if proc.is_alive():
+            proc.terminate()
+            proc.join(1)
+        deadline = time.monotonic() + 1      # let _run record a job that just finished
+        while job['status'] == 'running' and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if job['status'] != 'done' and os.path.isfile(job['output']):
+            try:
+                os.remove(job['output'])
+            except OSError:
+                pass
+
+    def _loop(self):
+        while True:
+            with self._lock:
+                job = next((j for j in self.jobs if j['status'] == 'queued'), None)
+            if job is None:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            self._run(job)
+
+    def _run(self, job):
+        events, cancel = _ctx.Queue(), _ctx.Event()
+        proc = _ctx.Process(target=_worker, name=f"report-job-{job['id']}",
+                            args=(job['backend'], job['kind'], job['output'],
+                                  job['params'], events, cancel))
+        with self._lock:
+            job.update(status='running', cancel=cancel, params=None)
+        started = time.perf_counter()
+        proc.start()
+        self._proc = proc
+
+        outcome, cancelled_at = None, None
+        while outcome is None:
+            try:
+                event, value = events.get(timeout=0.2)
+            except queue.Empty:
+                if cancel.is_set():
+                    cancelled_at = cancelled_at or time.monotonic()
+                    if time.monotonic() - cancelled_at > CANCEL_GRACE:
+                        proc.terminate()
+                        outcome = ('cancelled', None)
+                    continue
+                if proc.is_alive():
+                    continue
+                try:
+                    event, value = events.get(timeout=0.5)   # sent just before exiting
+                except queue.Empty:
+                    outcome = ('error', f"Report process exited (code {proc.exitcode})")
+                    continue
+            if event in ('done', 'error', 'cancelled'):
+                # a batch whose pool workers were ended on cancel fails — still a cancel
+                outcome = ('cancelled', None) if event == 'error' and cancel.is_set() else (event, value)
+            else:
+                with self._lock:
+                    job[event] = value
+
+        proc.join(5)
+        self._proc = None
+        status, value = outcome
+        if status != 'done' and os.path.exists(job['output']):
+            try:
+                os.remove(job['output'])      # partial file
+            except OSError:
+                pass
+        with self._lock:
+            job.update(status=status, elapsed=round(time.perf_counter() - started, 1),
+                       cancel=None)
+            if status == 'done':
+                job.update(message=value.get('message', ''), cached=value.get('cached', False))
+            elif status == 'error':
+                job['message'] = value
+            else:
+                job['message'] = "Cancelled"
+        print(f"[REPORT JOB] {job['label']}: {status} in {job['elapsed']}s {job['message']}")
+
+
+_runner = None
+
+
+def runner():
+    global _runner
+    if _runner is None:
+        _runner = ReportJobRunner()
+    return _runner
+
+
+def submit(db, kind, output, label, parent=None, open_when_done=False, **params):
+    """
+    Queue a report. kind is a report_cache kind ('daily', 'register',
+    'defaulters', 'classes', 'student'), 'student_batch', or 'export'
+    (attendance_export; format from the file extension, params are its
+    filters or records=[...]). With `parent` the jobs window opens.
+    """
+    job_id = runner().submit(db, kind, output, label, open_when_done, **params)
+    if parent is not None:
+        show_jobs_window(parent)
+    return job_id
+
+
+def _open_file(path):
+    try:
+        import subprocess, sys
+        if sys.platform == 'win32':
+            os.startfile(path)
+        elif sys.platform == 'darwin':
+            subprocess.call(['open', path])
+        else:
+            subprocess.call(['xdg-open', path])
+    except Exception:
+        pass
+
+
+# ══════════════════════════════════════════════════════════
+#  JOBS WINDOW
+# ══════════════════════════════════════════════════════════
+class ReportJobsWindow:
+    COLORS = {
+        'bg': '#f5f5f0', 'card': '#ffffff', 'sidebar': '#8B4513',
+        'accent': '#654321', 'text': '#333333', 'muted': '#666666',
+    }
+    STATUS = {
+        'queued': '⏳ Queued', 'running': '🔄 Running', 'done': '✅ Done',
+        'error': '❌ Failed', 'cancelled': '⛔ Cancelled',
+    }
+
+    def __init__(self, parent):
+        C = self.COLORS
+        self.win = tk.Toplevel(parent)
+        self.win.title("Report Jobs")
+        self.win.geometry("620x340")
+        self.win.configure(bg=C['bg'])
+        self.win.protocol("WM_DELETE_WINDOW", self.win.withdraw)   # keeps polling
+        self._opened = set()
+
+        tk.Frame(self.win, bg=C['sidebar'], height=45).pack(fill='x')
+        tk.Label(self.win, text="🗂  Report Jobs", font=('Segoe UI', 12, 'bold'),
+                 bg=C['sidebar'], fg='white').place(x=15, y=10)
+
+        cols = ('Report', 'Status', 'Progress')
+        self.tree = ttk.Treeview(self.win, columns=cols, show='headings', height=8)
+        for col, w in zip(cols, (260, 100, 220)):
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=w, anchor='w' if col != 'Status' else 'center')
+        self.tree.pack(fill='both', expand=True, padx=10, pady=(10, 4))
+
+        self.bar = ttk.Progressbar(self.win, mode='determinate')
+        self.bar.pack(fill='x', padx=10, pady=4)
+
+        btns = tk.Frame(self.win, bg=C['bg'])
+        btns.pack(fill='x', padx=10, pady=(2, 10))
+        for text, cmd, color in (("Close", self.win.withdraw, '#cccccc'),
+                                 ("📂  Open", self._open_selected, C['sidebar']),
+                                 ("✖  Cancel", self._cancel_selected, '#c0392b')):
+            tk.Button(btns, text=text, command=cmd, bg=color,
+                      fg='white' if color != '#cccccc' else C['text'],
+                      font=('Segoe UI', 10), relief='flat', padx=14, pady=4,
+                      cursor='hand2').pack(side='right', padx=4)
+        self._refresh()
+
+    def show(self):
+        self.win.deiconify()
+        self.win.lift()
+
+    def _progress_text(self, job):
+        if job['status'] != 'running':
+            text = job['message'] or ('Waiting…' if job['status'] == 'queued' else '')
+            return f"{text}  ({job['elapsed']}s)" if job['elapsed'] is not None else text
+        if job['message']:
+            return job['message']
+        if job['students']:
+            return f"{job['students'][0]} / {job['students'][1]} students"
+        parts = [f"{job['rows']} rows" if job['rows'] else '',
+                 f"page {job['pages']}" if job['pages'] else '']
+        return ' · '.join(p for p in parts if p) or 'Starting…'
+
+    def _refresh(self):
+        if not self.win.winfo_exists():
+            return
+        jobs    = runner().snapshot()
+        current = set()
+        running = None
+        for job in reversed(jobs):
+            iid = str(job['id'])
+            current.add(iid)
+            values = (job['label'], self.STATUS.get(job['status'], job['status']),
+                      self._progress_text(job))
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=values)
+            else:
+                self.tree.insert('', 'end', iid=iid, values=values)
+            if job['status'] == 'running':
+                running = job
+            if (job['status'] == 'done' and job['open_when_done']
+                    and job['id'] not in self._opened):
+                self._opened.add(job['id'])
+                _open_file(job['output'])
+        for iid in self.tree.get_children():
+            if iid not in current:
+                self.tree.delete(iid)
+
+        if running and running['students']:
+            done, total = running['students']
+            self.bar.stop()
+            self.bar.configure(mode='determinate', maximum=max(total, 1), value=done)
+        elif running:
+            if str(self.bar.cget('mode')) != 'indeterminate':
+                self.bar.configure(mode='indeterminate')
+                self.bar.start(15)
+        else:
+            self.bar.stop()
+            self.bar.configure(mode='determinate', value=0)
+        self.win.after(300, self._refresh)
+
+    def _selected(self):
+        sel = self.tree.selection()
+        return int(sel[0]) if sel else None
+
+    def _cancel_selected(self):
+        job_id = self._selected()
+        if job_id is not None:
+            runner().cancel(job_id)
+
+    def _open_selected(self):
+        job_id = self._selected()
+        job = next((j for j in runner().snapshot() if j['id'] == job_id), None)
+        if job and job['status'] == 'done':
+            _open_file(job['output'])
+
+
+_window = None
+
+
+def show_jobs_window(parent):
+    global _window
+    if _window is not None and _window.win.winfo_exists():
+        _window.show()
+    else:
+        _window = ReportJobsWindow(parent)
+    return _window
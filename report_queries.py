@@ -0,0 +1,192 @@
+"""
+Report Queries — Shared Report Datasets
+=======================================
+The PDF generators, the Reports page and the scheduled report emails all
+read their data from here instead of pulling raw attendance and counting
+in Python:
+
+  • daily_roster(db, day, class_filter)   → [RosterRow]    one day's rows
+  • class_totals(db, day, class_filter)   → [ClassTotals]  counted in SQL
+  • daily_class_totals(db, from, to)      → [ClassDay]     the same, per day
+  • defaulters(db, threshold)             → [Defaulter]    filtered in SQL
+  • student_history(db, student_id)       → [StudentDay]
+  • daily_summary(db, day)                — the dict email_alerts' summary
+                                            templates take
+
+Results are tuples of NamedTuples, cached per (report, params, watermark).
+The watermark is COUNT / MAX(id) / MAX(updated_at) of the attendance rows
+in the report's date range, so any insert, edit or delete in that range
+makes the next call re-query, and a repeated report costs one cheap query.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import NamedTuple, Optional
+
+CACHE_SIZE = 64      # cached datasets kept (least recently used dropped first)
+
+_cache = OrderedDict()
+_lock  = threading.Lock()
+
+
+class RosterRow(NamedTuple):
+    id:         int
+    student_id: str
+    full_name:  Optional[str]
+    class_name: Optional[str]
+    date:       date
+    time_in:    object
+    time_out:   object
+    status:     Optional[str]
+    marked_by:  Optional[str]
+
+
+class ClassTotals(NamedTuple):
+    class_name: str
+    total:      int
+    present:    int
+    late:       int
+    absent:     int
+
+    @property
+    def pct(self):
+        return round((self.present + self.late) / self.total * 100, 1) if self.total else 0
+
+
+class ClassDay(NamedTuple):
+    date:       date
+    class_name: str
+    total:      int
+    present:    int
+    late:       int
+    absent:     int
+
+    @property
+    def pct(self):
+        return round((self.present + self.late) / self.total * 100, 1) if self.total else 0
+
+
+class Defaulter(NamedTuple):
+    student_id: str
+    full_name:  Optional[str]
+    class_name: Optional[str]
+    total:      int
+    present:    int
+    late:       int
+    absent:     int
+    pct:        float
+
+
+class StudentDay(NamedTuple):
+    full_name:  Optional[str]
+    class_name: Optional[str]
+    date:       date
+    time_in:    object
+    time_out:   object
+    status:     Optional[str]
+    marked_by:  Optional[str]
+
+
+# ══════════════════════════════════════════════════════════
+#  CACHE
+# ══════════════════════════════════════════════════════════
+def _cached(db, kind, params, load, date_from=None, date_to=None):
+    """load() once per (kind, params, watermark of date_from..date_to)."""
+    key = (db.backend.name, kind, params,
+           db.get_attendance_watermark(date_from, date_to))
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    value = load()
+    with _lock:
+        _cache[key] = value
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return value
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+
+
+def _pick(cls, row):
+    return cls(*(row.get(f) for f in cls._fields))
+
+
+def _counts(row):
+    total, present, late = int(row['total']), int(row['present'] or 0), int(row['late'] or 0)
+    return total, present, late, total - present - late
+
+
+# ══════════════════════════════════════════════════════════
+#  DATASETS
+# ══════════════════════════════════════════════════════════
+def daily_roster(db, day, class_filter=None):
+    """Every attendance row of one day, latest check-in first."""
+    return _cached(db, 'roster', (str(day), class_filter), lambda: tuple(
+        _pick(RosterRow, r) for r in db.get_attendance(filter_date=day, filter_class=class_filter)
+    ), day, day)
+
+
+def class_totals(db, day=None, class_filter=None, date_from=None, date_to=None):
+    """Present / late / absent per class for one day (or a date range), by class name."""
+    date_from, date_to = (day, day) if day else (date_from, date_to)
+
+    def load():
+        return tuple(ClassTotals(r['class_name'], *_counts(r))
+                     for r in db.get_class_totals(class_filter, date_from, date_to))
+
+    return _cached(db, 'class_totals', (str(date_from), str(date_to), class_filter),
+                   load, date_from, date_to)
+
+
+def daily_class_totals(db, date_from, date_to, class_filter=None):
+    """class_totals() for every day of a range, as [ClassDay] oldest first."""
+    def load():
+        return tuple(ClassDay(r['date'], r['class_name'], *_counts(r))
+                     for r in db.get_daily_class_totals(class_filter, date_from, date_to))
+
+    return _cached(db, 'daily_class_totals', (str(date_from), str(date_to), class_filter),
+                   load, date_from, date_to)
+
+
+def grand_total(totals, label='TOTAL'):
+    """Sum of class_totals() rows as one ClassTotals."""
+    return ClassTotals(label, *(sum(getattr(t, f) for t in totals)
+                                for f in ('total', 'present', 'late', 'absent')))
+
+
+def defaulters(db, threshold=75, class_filter=None, date_from=None, date_to=None):
+    """Students under `threshold`% (present + late), lowest first."""
+    def load():
+        rows = []
+        for r in db.get_student_totals(class_filter, date_from, date_to, below_pct=threshold):
+            total, present, late, absent = _counts(r)
+            rows.append(Defaulter(r['student_id'], r['full_name'], r['class_name'],
+                                  total, present, late, absent,
+                                  round((present + late) / total * 100, 1)))
+        return tuple(rows)
+
+    return _cached(db, 'defaulters', (threshold, class_filter, str(date_from), str(date_to)),
+                   load, date_from, date_to)
+
+
+def student_history(db, student_id):
+    """All of one student's attendance days."""
+    return _cached(db, 'student', (student_id,), lambda: tuple(
+        _pick(StudentDay, r) for r in db.get_attendance(filter_student=student_id)))
+
+
+def daily_summary(db, day):
+    """{'total', 'present', 'absent', 'late', 'classes': {class: counts}} for one day."""
+    totals = class_totals(db, day)
+    grand  = grand_total(totals)
+    return {
+        'total': grand.total, 'present': grand.present,
+        'absent': grand.absent, 'late': grand.late,
+        'classes': {t.class_name: {'present': t.present, 'absent': t.absent, 'late': t.late}
+                    for t in totals},
+    }
@@ -1,11 +1,13 @@
 """
 Reports Module - Attendance Reports with Filters & Export
 """
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import pandas as pd
 from datetime import date, datetime, timedelta
 from database import DatabaseManager
+import report_jobs
+import report_queries
 
 COLORS = {
     'bg_dark': '#f5f5f0', 'bg_card': '#ffffff', 'bg_sidebar': '#8B4513',
@@ -15,9 +17,13 @@ COLORS = {
 
 
 class ReportsPage:
+    PAGE_SIZE = 200
+
     def __init__(self, parent, db: DatabaseManager):
         self.parent = parent
         self.db = db
+        self._search = None
+        self._filters = {}      # get_attendance() filters behind the rows shown
         self.build_ui()
         self.load_report()
 
@@ -120,8 +126,35 @@ class ReportsPage:
             except ValueError:
                 messagebox.showerror("Error", "Date format: YYYY-MM-DD")
                 return
-            records = self.db.get_attendance(date_filter, class_filter, student_filter)
+            self._search = None
+            if student_filter and not self.db.get_student_by_id(student_filter):
+                self._search = (student_filter, date_filter, class_filter)
+                self._filters = None
+                self._load_search_page(1)
+                return
+            self._filters = dict(filter_date=date_filter, filter_class=class_filter,
+                                 filter_student=student_filter, include_archive=True)
+            if date_filter and not student_filter:
+                # Cached until that day's attendance changes
+                records = [r._asdict() for r in
+                           report_queries.daily_roster(self.db, date_filter, class_filter)]
+            if not records:
+                records = self.db.get_attendance(date_filter, class_filter, student_filter,
+                                                 include_archive=True)
+        else:
+            self._search = None
+
+        self._show_records(records)
 
+    def _load_search_page(self, page):
+        """Name search results are paged instead of pulled in one go."""
+        name, date_filter, class_filter = self._search
+        res = self.db.search_attendance(name, date_filter, class_filter,
+                                        page=page, per_page=self.PAGE_SIZE)
+        self._page, self._total = res['page'], res['total']
+        self._show_records(res['results'])
+
+    def _show_records(self, records):
         self.records = records
         self.tree.delete(*self.tree.get_children())
         present = late = absent = 0
@@ -160,6 +193,22 @@ class ReportsPage:
             tk.Label(c, text=title, font=('Segoe UI', 9),
                      bg=COLORS['bg_card'], fg=COLORS['text_muted']).pack(padx=25, pady=(0, 8))
 
+        if self._search:
+            pages = max(1, -(-self._total // self.PAGE_SIZE))
+            pager = tk.Frame(self.summary_frame, bg=COLORS['bg_dark'])
+            pager.pack(side='right', padx=8)
+            tk.Button(pager, text="◀", state='normal' if self._page > 1 else 'disabled',
+                      command=lambda: self._load_search_page(self._page - 1),
+                      bg=COLORS['bg_sidebar'], fg='white', relief='flat',
+                      padx=8, cursor='hand2').pack(side='left')
+            tk.Label(pager, text=f"Page {self._page} / {pages}  ({self._total} matches)",
+                     bg=COLORS['bg_dark'], fg=COLORS['text_muted'],
+                     font=('Segoe UI', 9)).pack(side='left', padx=8)
+            tk.Button(pager, text="▶", state='normal' if self._page < pages else 'disabled',
+                      command=lambda: self._load_search_page(self._page + 1),
+                      bg=COLORS['bg_sidebar'], fg='white', relief='flat',
+                      padx=8, cursor='hand2').pack(side='left')
+
     def load_today(self):
         self.date_var.set(str(date.today()))
         self.class_var.set('All')
@@ -169,14 +218,14 @@ class ReportsPage:
     def load_week(self):
         self.date_var.set('')
         week_ago = date.today() - timedelta(days=7)
-        records = self.db.get_attendance()
-        week_records = [r for r in records if r.get('date') and r['date'] >= week_ago]
-        self.load_report(week_records)
+        self._filters = dict(date_from=week_ago)
+        self.load_report(self.db.get_attendance(date_from=week_ago))
 
     def load_all(self):
         self.date_var.set('')
         self.class_var.set('All')
         self.student_var.set('')
+        self._filters = {}
         self.load_report(self.db.get_attendance())
 
     def sort_column(self, col):
@@ -198,21 +247,29 @@ class ReportsPage:
             messagebox.showerror("Error", str(e))
 
     def export_csv(self):
-        if not self.records:
-            messagebox.showwarning("No Data", "No records to export.")
-            return
-        path = filedialog.asksaveasfilename(defaultextension='.csv', filetypes=[('CSV', '*.csv')],
-                                             initialfile=f"attendance_{date.today()}.csv")
-        if path:
-            pd.DataFrame(self.records).to_csv(path, index=False)
-            messagebox.showinfo("Exported", f"CSV saved to:\n{path}")
+        self._export([('CSV', '*.csv'), ('CSV (gzip)', '*.csv.gz'), ('Parquet', '*.parquet')],
+                     '.csv')
 
     def export_excel(self):
+        self._export([('Excel', '*.xlsx')], '.xlsx')
+
+    def _export(self, filetypes, ext):
+        """
+        Streamed to disk by a background job (attendance_export). Filtered
+        views are re-read from the database in chunks; a name-search page
+        exports the rows on screen.
+        """
         if not self.records:
             messagebox.showwarning("No Data", "No records to export.")
             return
-        path = filedialog.asksaveasfilename(defaultextension='.xlsx', filetypes=[('Excel', '*.xlsx')],
-                                             initialfile=f"attendance_{date.today()}.xlsx")
-        if path:
-            pd.DataFrame(self.records).to_excel(path, index=False)
-            messagebox.showinfo("Exported", f"Excel saved to:\n{path}")
\ No newline at end of file
+        path = filedialog.asksaveasfilename(defaultextension=ext, filetypes=filetypes,
+                                             initialfile=f"attendance_{date.today()}{ext}")
+        if not path:
+            return
+        label = f"Export — {os.path.basename(path)}"
+        if self._filters is None:
+            report_jobs.submit(self.db, 'export', path, label, parent=self.parent,
+                               records=list(self.records))
+        else:
+            report_jobs.submit(self.db, 'export', path, label, parent=self.parent,
+                               **self._filters)
@@ -49,7 +49,17 @@ class SettingsPage:
         nb.add(tab3, text="🗄️  Database Config")
         self._build_db_config(tab3)
 
-        # Tab 4: About
+        # Tab 4: Query diagnostics
+        tab_diag = tk.Frame(nb, bg=COLORS['bg_dark'])
+        nb.add(tab_diag, text="📈  Diagnostics")
+        self._build_diagnostics(tab_diag)
+
+        # Tab 5: Scheduler
+        tab_sched = tk.Frame(nb, bg=COLORS['bg_dark'])
+        nb.add(tab_sched, text="⏰  Scheduler")
+        self._build_scheduler(tab_sched)
+
+        # Tab 6: About
         tab4 = tk.Frame(nb, bg=COLORS['bg_dark'])
         nb.add(tab4, text="ℹ️  About")
         self._build_about(tab4)
@@ -312,7 +322,10 @@ class SettingsPage:
         card.pack(pady=30, padx=80, fill='x')
 
         tk.Label(card, text="MySQL Database Configuration", font=('Segoe UI', 14, 'bold'),
-                 bg=COLORS['bg_dark'], fg=COLORS['text_light']).pack(pady=(0, 20))
+                 bg=COLORS['bg_dark'], fg=COLORS['text_light']).pack(pady=(0, 5))
+        tk.Label(card, text=f"Active backend: {self.db.backend.name}",
+                 font=('Segoe UI', 10), bg=COLORS['bg_dark'],
+                 fg=COLORS['text_muted']).pack(pady=(0, 15))
 
         cfg   = db_module.DB_CONFIG
         vars_ = {}
@@ -342,7 +355,73 @@ class SettingsPage:
                  bg=COLORS['bg_dark'], fg=COLORS['warning'], font=('Segoe UI', 9)).pack()
 
     # ══════════════════════════════════════════════════════════
-    #  TAB 4 — ABOUT
+    #  TAB 4 — QUERY DIAGNOSTICS
+    # ══════════════════════════════════════════════════════════
+    def _build_diagnostics(self, parent):
+        from db_metrics import query_metrics
+        from tkinter import filedialog
+
+        bar = tk.Frame(parent, bg=COLORS['bg_dark'])
+        bar.pack(fill='x', padx=20, pady=(15, 8))
+        tk.Label(bar, text="Database query latency (since start / last reset)",
+                 font=('Segoe UI', 12, 'bold'),
+                 bg=COLORS['bg_dark'], fg=COLORS['text_light']).pack(side='left')
+
+        cols   = ('Query', 'Calls', 'Total ms', 'Mean ms', 'p50', 'p95', 'p99', 'Max ms', 'Rows', 'KB')
+        widths = [230, 60, 90, 80, 70, 70, 70, 80, 80, 80]
+        frame = tk.Frame(parent, bg=COLORS['bg_dark'])
+        frame.pack(fill='both', expand=True, padx=20)
+        tree = ttk.Treeview(frame, columns=cols, show='headings', height=16)
+        for col, w in zip(cols, widths):
+            tree.heading(col, text=col)
+            tree.column(col, width=w, anchor='w' if col == 'Query' else 'e')
+        sy = ttk.Scrollbar(frame, orient='vertical', command=tree.yview)
+        tree.configure(yscrollcommand=sy.set)
+        sy.pack(side='right', fill='y')
+        tree.pack(fill='both', expand=True)
+
+        def refresh():
+            tree.delete(*tree.get_children())
+            for q in query_metrics.snapshot():
+                tree.insert('', 'end', values=(
+                    q['query'], q['calls'], q['total_ms'], q['mean_ms'],
+                    q['p50_ms'], q['p95_ms'], q['p99_ms'], q['max_ms'],
+                    q['rows'], round(q['bytes'] / 1024, 1)))
+
+        def reset():
+            query_metrics.reset()
+            refresh()
+
+        def export():
+            path = filedialog.asksaveasfilename(
+                defaultextension='.json', filetypes=[('JSON', '*.json')],
+                initialfile='query_metrics.json')
+            if path:
+                query_metrics.dump_json(path)
+                messagebox.showinfo("Exported", f"Query metrics saved to:\n{path}")
+
+        for text, cmd, color in [("🔄  Refresh", refresh, COLORS['info']),
+                                 ("🧹  Reset", reset, COLORS['warning']),
+                                 ("💾  Export JSON", export, COLORS['success'])]:
+            tk.Button(bar, text=text, command=cmd, bg=color, fg='white',
+                      font=('Segoe UI', 10, 'bold'), relief='flat',
+                      padx=12, pady=4, cursor='hand2').pack(side='right', padx=4)
+        refresh()
+
+    # ══════════════════════════════════════════════════════════
+    #  TAB 5 — SCHEDULER
+    # ══════════════════════════════════════════════════════════
+    def _build_scheduler(self, parent):
+        try:
+            from auto_scheduler import SchedulerPanel, current_scheduler
+            SchedulerPanel(parent, self.db, scheduler=current_scheduler())
+        except Exception as e:
+            tk.Label(parent, text=f"Scheduler unavailable: {e}",
+                     bg=COLORS['bg_dark'], fg=COLORS['warning'],
+                     font=('Segoe UI', 10)).pack(pady=30)
+
+    # ══════════════════════════════════════════════════════════
+    #  TAB 6 — ABOUT
     # ══════════════════════════════════════════════════════════
     def _build_about(self, parent):
         card = tk.Frame(parent, bg=COLORS['bg_dark'])
@@ -4,8 +4,8 @@ Student Dashboard — Vanita Vishram Women's University
 Student self-service portal:
   🏠  Home Dashboard  — summary cards + today's status
   📅  Daily           — search any single day
-  📆  Weekly          — 7-day calendar strip with nav
-  🗓️  Monthly         — full calendar grid with nav
+  📆  Weekly          — 7-day calendar strip with nav + weekly trend chart
+  🗓️  Monthly         — full calendar grid with nav + attendance heatmap
   📝  My Results      — subject marks, grades, GPA
   👤  My Profile      — personal info + all summaries
   💰  Fee Details     — fee status, payment history
@@ -18,6 +18,7 @@ import calendar
 from datetime import datetime, date, timedelta
 from PIL import Image, ImageTk
 from database import DatabaseManager
+import chart_service
 
 BG       = '#FDFAF6'
 BROWN    = '#6B2D0E'
@@ -59,6 +60,10 @@ class StudentDashboard:
             self._summary = self.db.get_student_attendance_summary(self.sid)
         except Exception:
             self._summary = {'records':[], 'total':0, 'present':0, 'absent':0, 'percentage':0.0}
+        try:
+            self._forecast = self.db.get_student_forecast(self.sid)
+        except Exception:
+            self._forecast = None
 
     def setup_window(self):
         name = self.student.get('full_name', 'Student')
@@ -107,6 +112,12 @@ class StudentDashboard:
             tk.Label(wf, text=f"⚠  Below 75% — {round(75-pct,1)}% shortage",
                      font=(FONT, 8, 'bold'), bg='#7B3F00', fg='#FFD54F', wraplength=200).pack(pady=4)
 
+        fc = self._forecast
+        if fc and fc.get('projected_pct') is not None and fc.get('risk') != 'ok':
+            tk.Label(self.sidebar, text=f"📈  Term-end projection: {fc['projected_pct']}%",
+                     font=(FONT, 8, 'bold'), bg=BROWN,
+                     fg='#FFD54F' if fc['projected_pct'] < 75 else GOLD).pack(pady=(2, 0))
+
         tk.Frame(self.sidebar, bg=GOLD, height=1).pack(fill='x', padx=12, pady=5)
 
         self.nav_buttons = {}
@@ -220,6 +231,21 @@ class StudentDashboard:
         b.pack(side=side, padx=padx)
         return b
 
+    def _chart(self, kind, width=640, **params):
+        """chart_service image, rendered (or read from its cache) off the Tk thread."""
+        holder = tk.Label(self.content, text="📈  Loading chart…", font=(FONT, 9),
+                          bg=BG, fg=MUTED)
+        holder.pack(pady=(0, 8))
+
+        def show(path):
+            if not path:                    # matplotlib missing or render failed
+                holder.destroy()
+                return
+            holder.image = chart_service.tk_image(path, width)
+            holder.config(image=holder.image, text='')
+
+        chart_service.chart_async(holder, self.db, kind, show, student_id=self.sid, **params)
+
     def _grade(self, marks, max_marks):
         pct = (marks / max_marks * 100) if max_marks > 0 else 0
         if pct >= 90: return 'A+'
@@ -513,6 +539,8 @@ class StudentDashboard:
             tk.Label(sum_box, text=f"   Week: ✅ Present: {wp2}   ⏰ Late: {wl2}   ❌ Absent: {wa2}   📊 Rate: {wpct}%",
                      font=(FONT, 11, 'bold'), bg=WHITE, fg=DARK).pack(anchor='w', pady=8)
 
+            self._chart('student_trend', end=min(week_end, today))
+
             if week_recs:
                 self._section_hdr("Detailed Records", STUDENT)
                 cols = ('Date','Day','Time In','Time Out','Status','Marked By')
@@ -631,6 +659,8 @@ class StudentDashboard:
             for lbl, color in [("● Present",SUCCESS),("● Late",WARNING),("● Absent",DANGER),("  No Record/Future",MUTED)]:
                 tk.Label(leg, text=lbl, font=(FONT,9,'bold'), bg=BG, fg=color).pack(side='left', padx=10)
 
+            self._chart('student_heatmap', end=min(date(year, month, days_in), today))
+
         render(self._month_year, self._month_month)
 
     # ══════════════════════════════════════════════════════
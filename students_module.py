@@ -13,6 +13,7 @@ from database import DatabaseManager
 from datetime import datetime
 from face_engine import (detect_faces, extract_face_roi,
                           encode_face, capture_face_encoding)
+from notification_router import CHANNELS, DEFAULT_ORDER
 
 BG       = '#FDFAF6'
 BROWN    = '#6B2D0E'
@@ -175,6 +176,11 @@ class StudentsPage:
     def _student_form_dialog(self, student=None, face_only=False):
         win = tk.Toplevel()
         is_edit = student is not None
+        if is_edit and not face_only:
+            prefs = self.db.get_contact_preferences([student['student_id']]).get(student['student_id'])
+            if prefs:
+                student = {**student, 'parent_email': prefs['parent_email'],
+                           'notify_channels': ', '.join(prefs['channels'])}
         win.title("Edit Student" if is_edit else "Add New Student")
         win.configure(bg=BG)
         win.grab_set()
@@ -258,6 +264,10 @@ class StudentsPage:
             make_field(inner, "Section",      'section')
             make_field(inner, "Email",        'email')
             make_field(inner, "Phone",        'phone')
+            make_field(inner, "Parent Email", 'parent_email')
+            make_field(inner, "Alert via",    'notify_channels')
+            tk.Label(inner, text="Order to try, e.g.  whatsapp, sms, email  (blank = default)",
+                     font=(FONT, 8), bg=BG, fg=MUTED).pack(anchor='e')
 
         # Face capture section
         tk.Frame(inner, bg=BROWN_LT, height=1).pack(fill='x', pady=10)
@@ -439,6 +449,12 @@ class StudentsPage:
                 if not sid or not fname:
                     messagebox.showerror("Error", "Student ID and Full Name are required!", parent=win)
                     return
+                unknown = [c for c in self._channels(entries) if c not in CHANNELS]
+                if unknown:
+                    messagebox.showerror(
+                        "Error", f"Unknown alert channel: {', '.join(unknown)}\n"
+                                 f"Use any of: {', '.join(CHANNELS)}", parent=win)
+                    return
 
             enc = face_data.get('encoding')
 
@@ -457,6 +473,7 @@ class StudentsPage:
                         entries['email'].get().strip(),
                         entries['phone'].get().strip(),
                         enc, face_data.get('photo_path'))
+                    self._save_contact_preferences(entries['student_id'].get().strip(), entries)
                     self.db.log_activity("ADD_STUDENT", self.admin_user,
                                           f"Added {entries['student_id'].get().strip()}")
                     messagebox.showinfo("✅ Saved", "Student registered successfully!", parent=win)
@@ -486,6 +503,7 @@ class StudentsPage:
                         entries['phone'].get().strip())
                     if enc:
                         self.db.update_student_face(student['student_id'], enc, face_data.get('photo_path'))
+                    self._save_contact_preferences(student['student_id'], entries)
                     self.db.log_activity("EDIT_STUDENT", self.admin_user,
                                           f"Edited {student['student_id']}")
                     messagebox.showinfo("✅ Updated", "Student updated successfully!", parent=win)
@@ -507,6 +525,15 @@ class StudentsPage:
 
         win.protocol("WM_DELETE_WINDOW", on_close)
 
+    @staticmethod
+    def _channels(entries):
+        return [c.strip().lower() for c in entries['notify_channels'].get().replace(';', ',').split(',')
+                if c.strip()]
+
+    def _save_contact_preferences(self, student_id, entries):
+        self.db.set_contact_preferences(student_id, self._channels(entries) or DEFAULT_ORDER,
+                                        entries['parent_email'].get().strip())
+
     def delete_selected(self):
         sid = self.get_selected_id()
         if not sid: return
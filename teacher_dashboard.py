@@ -930,7 +930,7 @@ class TeacherDashboard:
                 db_enc = self.db.get_all_face_encodings()
             except Exception as dbe:
                 db_enc = []
-                self.root.after(0, lambda: self._live_log(f'[ERROR] DB load failed: {dbe}\n'))
+                self.root.after(0, lambda msg=str(dbe): self._live_log(f'[ERROR] DB load failed: {msg}\n'))
 
             self.root.after(0, lambda: self.live_status.set('🟢  Camera Active — Scanning...'))
             self.root.after(0, lambda: self._live_log(
@@ -2015,45 +2015,80 @@ class TeacherDashboard:
         action_btn(ctrl, '📊 Analyze', analyze, C['brown'], padx=18, pady=7).pack(side='left', padx=8)
 
     def _report_low(self, parent):
-        res_f = tk.Frame(parent, bg=C['bg']); res_f.pack(fill='both', expand=True, padx=10, pady=10)
-        def check():
-            for w in res_f.winfo_children(): w.destroy()
-            tk.Label(res_f, text='Checking...', font=FT['body'], bg=C['bg'], fg=C['text3']).pack(pady=10)
-            res_f.update()
+        # Read from the nightly attendance_forecast table — no per-student queries
+        RISK = {'critical':   ('⛔ Below 75%',  C['red']),
+                'recovering': ('↗ Recovering',  C['orange']),
+                'at_risk':    ('📉 At risk',     C['orange']),
+                'watch':      ('👀 Watch',       C['text2'])}
+        ctrl = tk.Frame(parent, bg=C['bg']); ctrl.pack(fill='x', padx=10, pady=10)
+        info_v = tk.StringVar(value='Loading...')
+        tk.Label(ctrl, textvariable=info_v, font=FT['body_b'], bg=C['bg'],
+                 fg=C['red']).pack(side='left')
+        cols = ('Student ID','Name','Class','Term %','Last 30d %','Trend /wk','Term-end %','Risk')
+        tf, tree = make_tree(parent, cols, [100,170,130,80,90,90,90,120], height=16)
+        tf.pack(fill='both', expand=True, padx=10)
+        for key, (_, color) in RISK.items():
+            tree.tag_configure(key, foreground=color)
+
+        def fmt(v, suffix='%'):
+            return '—' if v is None else f"{v}{suffix}"
+
+        def load():
+            tree.delete(*tree.get_children())
             try:
-                students = self.db.get_all_students()
-                low = []
-                for s in students:
-                    try:
-                        summ = self.db.get_student_attendance_summary(s['student_id'])
-                        if summ['total'] > 0 and summ['percentage'] < 75:
-                            low.append((s, summ))
-                    except: pass
-                for w in res_f.winfo_children(): w.destroy()
-                if not low:
-                    tk.Label(res_f, text='✅  All students above 75% attendance threshold!',
-                             font=FT['body_b'], bg=C['green_bg'], fg=C['green'],
-                             pady=20).pack(fill='x', padx=10)
-                    return
-                tk.Label(res_f, text=f'⚠️  {len(low)} students below 75% attendance:',
-                         font=FT['body_b'], bg=C['red_bg'], fg=C['red'], pady=8
-                         ).pack(fill='x', padx=0)
-                for s, summ in sorted(low, key=lambda x: x[1]['percentage']):
-                    r = tk.Frame(res_f, bg=C['card'], pady=8); r.pack(fill='x', pady=2)
-                    tk.Label(r, text=f"⚠️  {s['full_name']} ({s['student_id']})",
-                             font=FT['body_b'], bg=C['card'], fg=C['red']).pack(side='left', padx=15)
-                    tk.Label(r, text=f"{summ['percentage']}%",
-                             font=('Georgia',18,'bold'), bg=C['card'], fg=C['red']).pack(side='left', padx=10)
-                    tk.Label(r, text=s.get('class_name',''),
-                             font=FT['body'], bg=C['card'], fg=C['text3']).pack(side='left', padx=10)
-                    action_btn(r,'📱 Alert',
-                               lambda st=s: messagebox.showinfo('Alert',
-                                   f'Alert for {st["full_name"]} — Phone: {st.get("phone","N/A")}'),
-                               C['red'], padx=10, pady=5).pack(side='right', padx=10)
+                rows = self.db.get_attendance_forecast(risks=list(RISK))
+                for i, r in enumerate(rows):
+                    trend = r.get('trend')
+                    tree.insert('', 'end', iid=r['student_id'], values=(
+                        r['student_id'], r.get('full_name') or '', r.get('class_name') or '',
+                        fmt(r.get('pct')), fmt(r.get('pct_30d')),
+                        '—' if trend is None else f"{trend:+.1f}",
+                        fmt(r.get('projected_pct')), RISK[r['risk']][0]
+                    ), tags=(r['risk'], 'odd' if i%2 else 'even'))
+                below = sum(r['risk'] in ('critical', 'recovering') for r in rows)
+                soon  = sum(r['risk'] == 'at_risk' for r in rows)
+                when  = self.db.get_forecast_computed_at()
+                info_v.set(f"⚠️  {below} below 75% this term   📉  {soon} projected to fall below by "
+                           f"term end" + (f"   (updated {str(when)[:16]})" if when else ''))
             except Exception as ex:
-                tk.Label(res_f, text=str(ex), bg=C['bg'], fg=C['red']).pack()
-        action_btn(parent, '🔍 Check Now', check, C['red'], padx=22, pady=10).pack(pady=10)
-        check()
+                info_v.set(str(ex))
+
+        def recompute():
+            # Scans two academic years — keep it off the Tk thread
+            if str(recompute_btn['state']) == 'disabled': return
+            recompute_btn.config(state='disabled')
+            info_v.set('⏳ Computing attendance forecast...')
+
+            def run():
+                try:
+                    import attendance_forecast
+                    attendance_forecast.run(self.db)
+                    err = None
+                except Exception as ex:
+                    err = str(ex)
+                try:
+                    self.root.after(0, lambda: done(err))
+                except Exception:
+                    pass        # window closed
+
+            def done(err):
+                if not tree.winfo_exists(): return      # page closed meanwhile
+                recompute_btn.config(state='normal')
+                if err: info_v.set(f'Forecast failed: {err}')
+                else:   load()
+            threading.Thread(target=run, daemon=True).start()
+
+        def alert():
+            sel = tree.selection()
+            if not sel: return
+            st = self.db.get_student_by_id(sel[0]) or {}
+            messagebox.showinfo('Alert', f'Alert for {st.get("full_name", sel[0])} — '
+                                         f'Phone: {st.get("phone") or "N/A"}')
+        action_btn(ctrl, '📱 Alert', alert, C['red'], padx=14, pady=7).pack(side='right', padx=4)
+        recompute_btn = action_btn(ctrl, '🔄 Recompute', recompute, C['brown'], padx=14, pady=7)
+        recompute_btn.pack(side='right', padx=4)
+        if self.db.get_forecast_computed_at() is None: recompute()
+        else: load()
 
     def _report_export(self, parent):
         outer, ec = card_frame(parent)
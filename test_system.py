@@ -38,6 +38,12 @@ required_modules = {
     'openpyxl': 'openpyxl',
     'numpy': 'numpy',
 }
+try:
+    from database import DB_BACKEND
+    if DB_BACKEND == 'sqlite':
+        del required_modules['mysql.connector']   # sqlite3 is built in
+except ImportError:
+    pass
 
 all_modules_ok = True
 for module, package in required_modules.items():
@@ -108,12 +114,16 @@ print()
 print("Test 5: Database Connection")
 print("-" * 40)
 try:
-    from database import DatabaseManager, DB_CONFIG
+    from database import DatabaseManager, DB_CONFIG, DB_BACKEND, SQLITE_PATH
     
     print(f"Database config:")
-    print(f"   Host: {DB_CONFIG['host']}")
-    print(f"   User: {DB_CONFIG['user']}")
-    print(f"   Database: {DB_CONFIG['database']}")
+    print(f"   Backend: {DB_BACKEND}")
+    if DB_BACKEND == 'sqlite':
+        print(f"   File: {SQLITE_PATH}")
+    else:
+        print(f"   Host: {DB_CONFIG['host']}")
+        print(f"   User: {DB_CONFIG['user']}")
+        print(f"   Database: {DB_CONFIG['database']}")
     
     db = DatabaseManager()
     conn = db.get_connection()
@@ -192,6 +202,39 @@ for dirname in required_dirs:
         print(f"⚠️  {dirname:30s} - Will be created automatically")
 print()
 
+# Test 8: CSV Mirror
+print("Test 8: Attendance CSV Mirror")
+print("-" * 40)
+try:
+    import tempfile
+    import time
+    from datetime import date
+    from csv_mirror import CsvMirror
+
+    class _CountingMirror(CsvMirror):
+        opens = 0
+
+        def _open_file(self, day):
+            self.opens += 1
+            super()._open_file(day)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        m = _CountingMirror(tmp, interval=0.05)
+        for sid in ('T1', 'T2', 'T1', 'T3'):       # T1 twice — a repeat mark
+            m.record(sid, 'Test', 'TEST', date.today(), '09:00:00', 'present')
+            m._wake.set()
+            time.sleep(0.2)                       # let the flusher run each time
+        m.close()
+        with open(m.path(date.today()), encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    if m.opens == 1 and len(lines) == 4:
+        print("✅ Day file opened once, repeat marks skipped")
+    else:
+        print(f"❌ CSV mirror: file opened {m.opens}x, {len(lines) - 1} rows (want 1x, 3)")
+except Exception as e:
+    print(f"❌ CSV mirror test failed: {e}")
+print()
+
 # Final Summary
 print("=" * 60)
 print("VALIDATION SUMMARY")